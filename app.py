@@ -1,5 +1,6 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 import os
+import threading
 from werkzeug.utils import secure_filename
 from config import Config
 from database import DatabaseManager
@@ -8,7 +9,12 @@ from content_analyzer import ContentAnalyzer
 from semantic_search import SemanticSearchEngine
 from visual_synthesis import VisualSynthesisEngine
 from translation_processor import TranslationProcessor
+from vector_index import IVFIndex
+from shard_search import ShardedIndex
+from embedding_cache import QueryEmbeddingCache, ChunkEmbeddingStore
+from local_embeddings import LocalEmbeddingProvider
 import json
+from datetime import datetime
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -23,16 +29,136 @@ def nl2br_filter(text):
 
 # Initialize components
 db = DatabaseManager()
+db.start_background_migrations()
+query_cache = QueryEmbeddingCache(
+    db,
+    max_memory_entries=Config.QUERY_CACHE_MEMORY_SIZE,
+    max_disk_entries=Config.QUERY_CACHE_DISK_SIZE
+)
+chunk_store = ChunkEmbeddingStore(db)
+if Config.SEARCH_SHARDS and not Config.SEARCH_SHARD_AUTHKEY:
+    raise RuntimeError("SEARCH_SHARDS is set but SEARCH_SHARD_AUTHKEY is not")
+sharded_index = ShardedIndex(Config.SEARCH_SHARDS, Config.SEARCH_SHARD_AUTHKEY) if Config.SEARCH_SHARDS else None
+local_provider = None  # Latest fitted local embedding model, reloaded when another worker refits
+local_provider_generation = None  # Embedding generation at which the stored model was last checked
+local_provider_lock = threading.Lock()
+local_refit_thread = None
+
+def local_embeddings_enabled():
+    return app.config['EMBEDDING_PROVIDER'] == 'local' or app.config['EMBEDDING_FALLBACK']
+
+def semantic_search_available():
+    if app.config['EMBEDDING_PROVIDER'] == 'local':
+        return get_local_provider() is not None
+    return bool(app.config['OPENAI_API_KEY'])
+
+def semantic_search_unavailable_message():
+    if app.config['EMBEDDING_PROVIDER'] == 'local':
+        return 'Local embedding model not available yet, please try again shortly'
+    return 'OpenAI API key not configured'
+
+def refit_local_embeddings():
+    """Fit a new local model on all meetings and store its vectors, unless another worker is fitting one
+    
+    A model another worker stored while this one waited is used instead, if it is still current.
+    """
+    global local_provider
+    prefix = LocalEmbeddingProvider.MODEL_PREFIX
+    if not db.claim_embedding_model_fit(prefix):
+        return None
+    try:
+        name = db.get_latest_embedding_model_name(prefix)
+        provider = LocalEmbeddingProvider.load(db, name) if name else None
+        if provider is None or db.count_embeddings(name) >= 2 * provider.document_count:
+            provider = SemanticSearchEngine(
+                app.config['OPENAI_API_KEY'], provider=app.config['EMBEDDING_PROVIDER']
+            ).fit_local_embeddings(db)
+    finally:
+        db.release_embedding_model_fit(prefix)
+    if provider is not None:
+        with local_provider_lock:
+            local_provider = provider
+    return provider
+
+def start_local_refit():
+    """Fit the local model in the background unless a fit is already running (call with the lock held)"""
+    global local_refit_thread
+    if local_refit_thread is None or not local_refit_thread.is_alive():
+        local_refit_thread = threading.Thread(target=refit_local_embeddings, daemon=True)
+        local_refit_thread.start()
+
+def get_local_provider():
+    """Get the local embedding model, or None until the first one has been fitted
+    
+    Fits run in the background: the first one as soon as meetings exist, later ones once the
+    corpus has grown to twice the fitting size. The stored model and its vector count are only
+    looked up again when the embeddings have changed.
+    """
+    global local_provider, local_provider_generation
+    if not local_embeddings_enabled():
+        return None
+    
+    generation = db.get_embedding_generation()
+    with local_provider_lock:
+        if generation == local_provider_generation:
+            return local_provider
+        
+        name = db.get_latest_embedding_model_name(LocalEmbeddingProvider.MODEL_PREFIX)
+        if name is None:
+            start_local_refit()  # Checked again next time, as meetings get transcribed
+            return local_provider
+        
+        if local_provider is None or local_provider.model_name != name:
+            if local_provider is not None:
+                db.drop_embedding_index(local_provider.model_name)  # Superseded by another worker's fit
+            local_provider = LocalEmbeddingProvider.load(db, name)
+        if local_provider is not None and db.count_embeddings(name) >= 2 * local_provider.document_count:
+            start_local_refit()
+        local_provider_generation = generation
+        return local_provider
+
+def get_search_engine():
+    """Create a search engine that shares this process's embedding caches"""
+    return SemanticSearchEngine(app.config['OPENAI_API_KEY'], query_cache=query_cache, chunk_store=chunk_store,
+                                provider=app.config['EMBEDDING_PROVIDER'], local_provider=get_local_provider())
+
+def get_embedding_index(model):
+    """Get the shared embedding index of a model, with coarse search and the ANN index when enabled
+    
+    The model served by search shards is searched through them instead.
+    """
+    if sharded_index is not None and model == app.config['SEARCH_SHARD_MODEL']:
+        return sharded_index
+    index = db.get_embedding_index(quantization=app.config['INDEX_QUANTIZATION'],
+                                   dimensions=app.config['INDEX_DIMENSIONS'], model=model,
+                                   snapshot_dir=app.config['INDEX_SNAPSHOT_DIR'])
+    index.coarse_meetings = app.config['COARSE_SEARCH_MEETINGS'] or None
+    if app.config['ANN_ENABLED'] and index.ann is None:
+        index.enable_ann(IVFIndex(
+            n_lists=app.config['ANN_N_LISTS'],
+            n_probe=app.config['ANN_N_PROBE'],
+            min_rows=app.config['ANN_MIN_ROWS']
+        ))
+    return index
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+MEETINGS_PAGE_SIZE = 24
+API_MEETINGS_DEFAULT_LIMIT = 100
+API_MEETINGS_MAX_LIMIT = 1000
+
 @app.route('/')
 def index():
-    """Main dashboard showing all meetings"""
-    meetings = db.get_all_meetings()
-    return render_template('index.html', meetings=meetings)
+    """Main dashboard showing one page of meetings, newest first, and totals over all of them"""
+    after = request.args.get('after')
+    try:
+        meetings, next_cursor = db.get_meetings_page(MEETINGS_PAGE_SIZE, after=after)
+    except ValueError:
+        return redirect(url_for('index'))
+    return render_template('index.html', meetings=meetings, next_cursor=next_cursor, paged=bool(after),
+                           stats=db.get_meeting_stats())
 
 @app.route('/upload', methods=['GET', 'POST'])
 def upload_meeting():
@@ -75,17 +201,11 @@ def upload_meeting():
 @app.route('/meeting/<int:meeting_id>')
 def view_meeting(meeting_id):
     """View meeting details and transcription"""
-    meeting = db.get_meeting(meeting_id)
-    if not meeting:
+    bundle = db.get_meeting_bundle(meeting_id)
+    if not bundle:
         flash('Meeting not found')
         return redirect(url_for('index'))
     
-    transcription = db.get_transcription(meeting_id)
-    summary = db.get_meeting_summary(meeting_id)
-    insights = db.get_meeting_insights(meeting_id)
-    visuals = db.get_meeting_visuals(meeting_id)
-    translations = db.get_available_translation_languages(meeting_id)
-    
     # Get supported languages for translation
     if app.config['OPENAI_API_KEY']:
         translator = TranslationProcessor(app.config['OPENAI_API_KEY'])
@@ -94,12 +214,12 @@ def view_meeting(meeting_id):
         supported_languages = {}
     
     return render_template('meeting_detail.html', 
-                         meeting=meeting, 
-                         transcription=transcription,
-                         summary=summary,
-                         insights=insights,
-                         visuals=visuals,
-                         translations=translations,
+                         meeting=bundle['meeting'], 
+                         transcription=bundle['transcription'],
+                         summary=bundle['summary'],
+                         insights=bundle['insights'],
+                         visuals=bundle['visuals'],
+                         translations=bundle['translations'],
                          supported_languages=supported_languages)
 
 @app.route('/transcribe/<int:meeting_id>', methods=['POST'])
@@ -181,36 +301,35 @@ def analyze_meeting(meeting_id):
             meeting['uploaded_at'][:10]  # Use upload date as meeting date
         )
         
-        # Save results to database
-        db.save_meeting_summary(
-            meeting_id,
-            analysis['summary'],
-            enhanced_action_items,
-            analysis.get('decisions', []),
-            analysis.get('key_topics', [])
-        )
-        
-        db.save_meeting_insights(meeting_id, insights)
-        
-        # Generate embeddings for semantic search (auto-trigger)
+        # Generate embeddings for semantic search (auto-trigger) before writing anything
+        search_engine, embedded = None, {}
         try:
-            search_engine = SemanticSearchEngine(app.config['OPENAI_API_KEY'])
-            summary = db.get_meeting_summary(meeting_id)
-            summary_text = summary['summary'] if summary else ""
-            
-            embeddings_data = search_engine.process_meeting_for_search(
-                meeting_id, 
+            search_engine = get_search_engine()
+            embedded = search_engine.embed_meeting(
+                meeting_id,
                 transcription['full_text'],
                 meeting['title'],
-                summary_text
+                analysis['summary']
             )
-            
-            if embeddings_data:
-                db.save_embeddings(meeting_id, embeddings_data)
         
         except Exception as e:
             print(f"Warning: Could not generate embeddings for meeting {meeting_id}: {e}")
         
+        # Save results to database, all or nothing
+        with db.transaction():
+            db.save_meeting_summary(
+                meeting_id,
+                analysis['summary'],
+                enhanced_action_items,
+                analysis.get('decisions', []),
+                analysis.get('key_topics', [])
+            )
+            
+            db.save_meeting_insights(meeting_id, insights)
+            
+            if embedded:
+                search_engine.store_meeting_embeddings(db, meeting_id, embedded)
+        
         return jsonify({
             'success': True,
             'message': 'Meeting analysis completed successfully',
@@ -228,9 +347,112 @@ def analyze_meeting(meeting_id):
 
 @app.route('/api/meetings')
 def api_meetings():
-    """API endpoint to get all meetings"""
-    meetings = db.get_all_meetings()
-    return jsonify(meetings)
+    """API endpoint to list meetings, newest first, one page at a time
+    
+    Query: limit (default 100, at most 1000), after (next_cursor of the previous page),
+    fields (comma-separated columns, default all). Returns {"meetings": [...], "next_cursor": ...}.
+    """
+    try:
+        limit = int(request.args.get('limit', API_MEETINGS_DEFAULT_LIMIT))
+        if not 1 <= limit <= API_MEETINGS_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {API_MEETINGS_MAX_LIMIT}")
+        fields = None
+        if request.args.get('fields'):
+            fields = tuple(field.strip() for field in request.args['fields'].split(',') if field.strip())
+        meetings, next_cursor = db.get_meetings_page(limit, after=request.args.get('after'), fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'meetings': meetings, 'next_cursor': next_cursor})
+
+@app.route('/api/search/cache_stats')
+def api_search_cache_stats():
+    """API endpoint to get query embedding cache hit/miss counters"""
+    return jsonify(query_cache.stats())
+
+SEARCH_CHUNK_TYPES = ('transcription', 'summary')
+API_SEARCH_MAX_QUERIES = 100
+API_SEARCH_MAX_TOP_K = 100
+
+def search_filters(args) -> dict:
+    """Read the chunk type and meeting date range filters of a search request
+    
+    Raises ValueError for an unknown chunk type or a date that is not YYYY-MM-DD.
+    """
+    filters = {}
+    chunk_type = args.get('type', '').strip()
+    if chunk_type:
+        if chunk_type not in SEARCH_CHUNK_TYPES:
+            raise ValueError(f'Invalid type: {chunk_type}')
+        filters['chunk_types'] = [chunk_type]
+    for key, name in (('date_from', 'from'), ('date_to', 'to')):
+        value = args.get(name, '').strip()
+        if not value:
+            continue
+        try:
+            filters[key] = datetime.strptime(value, '%Y-%m-%d').date().isoformat()
+        except ValueError:
+            raise ValueError(f'Invalid date: {value}')
+    return filters
+
+@app.route('/api/search', methods=['POST'])
+def api_search():
+    """API endpoint to run a batch of semantic searches with one embedding call
+    
+    JSON body: {"queries": [...], "top_k": 10, "threshold": 0.7, "type": ..., "from": ..., "to": ...}
+    """
+    payload = request.get_json(silent=True) or {}
+    queries = payload.get('queries')
+    if not isinstance(queries, list) or not queries or not all(isinstance(q, str) and q.strip() for q in queries):
+        return jsonify({'error': 'queries must be a non-empty list of strings'}), 400
+    if len(queries) > API_SEARCH_MAX_QUERIES:
+        return jsonify({'error': f'At most {API_SEARCH_MAX_QUERIES} queries per request'}), 400
+    
+    try:
+        filters = search_filters({key: str(payload.get(key) or '') for key in ('type', 'from', 'to')})
+        top_k = int(payload.get('top_k', 10))
+        if not 1 <= top_k <= API_SEARCH_MAX_TOP_K:
+            raise ValueError(f"top_k must be between 1 and {API_SEARCH_MAX_TOP_K}")
+        threshold = float(payload.get('threshold', 0.7))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not semantic_search_available():
+        return jsonify({'error': semantic_search_unavailable_message()}), 400
+    
+    try:
+        search_engine = get_search_engine()
+        embedding_index = get_embedding_index(search_engine.embedding_model)
+        fallback_index = None
+        if search_engine.local_fallback_available:
+            fallback_index = get_embedding_index(search_engine.local_provider.model_name)
+        
+        results = search_engine.search_many([q.strip() for q in queries], embedding_index, top_k=top_k,
+                                            similarity_threshold=threshold,
+                                            fallback_embeddings=fallback_index, filters=filters)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({'results': [
+        {'query': query, 'matches': [
+            {
+                'meeting_id': match['meeting_id'],
+                'title': match['metadata'].get('title', ''),
+                'meeting_date': match.get('meeting_date'),
+                'chunk_type': match['chunk_type'],
+                'chunk_index': match['chunk_index'],
+                'text': match['text'],
+                'similarity': match['similarity']
+            }
+            for match in matches
+        ]}
+        for query, matches in zip(queries, results)
+    ]})
+
+@app.route('/api/topics')
+def api_topics():
+    """API endpoint to list the topic clusters and their meetings"""
+    return jsonify(db.get_topics(get_search_engine().embedding_model))
 
 @app.route('/api/meeting/<int:meeting_id>/transcription')
 def api_transcription(meeting_id):
@@ -249,27 +471,37 @@ def search_meetings():
             flash('Please enter a search query')
             return redirect(url_for('search_meetings'))
         
-        return redirect(url_for('search_meetings', q=search_query))
+        params = {name: request.form.get(name, '').strip() for name in ('type', 'from', 'to')}
+        return redirect(url_for('search_meetings', q=search_query,
+                                **{name: value for name, value in params.items() if value}))
     
     # GET request with query parameter
     search_query = request.args.get('q', '').strip()
+    try:
+        filters = search_filters(request.args)
+    except ValueError as e:
+        flash(f'{e}, searching without filters')
+        filters = {}
     results = []
     similar_meetings = []
     cross_insights = {}
     
     if search_query:
         try:
-            if not app.config['OPENAI_API_KEY']:
-                flash('OpenAI API key not configured')
+            if not semantic_search_available():
+                flash(semantic_search_unavailable_message())
                 return render_template('search_results.html', 
                                      query=search_query, 
                                      results=[], 
                                      fallback_results=db.search_meetings_by_text(search_query))
             
-            search_engine = SemanticSearchEngine(app.config['OPENAI_API_KEY'])
-            all_embeddings = db.get_all_embeddings()
+            search_engine = get_search_engine()
+            embedding_index = get_embedding_index(search_engine.embedding_model)
+            fallback_index = None
+            if search_engine.local_fallback_available:
+                fallback_index = get_embedding_index(search_engine.local_provider.model_name)
             
-            if not all_embeddings:
+            if not embedding_index and not fallback_index:
                 flash('No embeddings found. Please analyze meetings first to enable semantic search.')
                 return render_template('search_results.html', 
                                      query=search_query, 
@@ -277,10 +509,13 @@ def search_meetings():
                                      fallback_results=db.search_meetings_by_text(search_query))
             
             # Perform semantic search
-            results = search_engine.search_meetings(search_query, all_embeddings, top_k=15)
+            results = search_engine.search_meetings(search_query, embedding_index, top_k=15,
+                                                    hybrid=app.config['HYBRID_SEARCH'],
+                                                    fallback_embeddings=fallback_index,
+                                                    filters=filters)
             
             # Get cross-meeting insights
-            cross_insights = search_engine.discover_cross_meeting_insights(all_embeddings)
+            cross_insights = search_engine.get_materialized_insights(db)
             
         except Exception as e:
             flash(f'Search error: {str(e)}')
@@ -306,23 +541,28 @@ def similar_meetings(meeting_id):
         return redirect(url_for('index'))
     
     try:
-        if not app.config['OPENAI_API_KEY']:
-            flash('OpenAI API key not configured')
+        if not semantic_search_available():
+            flash(semantic_search_unavailable_message())
             return redirect(url_for('view_meeting', meeting_id=meeting_id))
         
-        search_engine = SemanticSearchEngine(app.config['OPENAI_API_KEY'])
-        all_embeddings = db.get_all_embeddings()
-        meeting_embeddings = db.get_meeting_embeddings(meeting_id)
-        
-        if not all_embeddings or not meeting_embeddings:
-            flash('Embeddings not found. Please analyze meetings first.')
-            return redirect(url_for('view_meeting', meeting_id=meeting_id))
+        search_engine = get_search_engine()
         
-        # Find similar meetings
-        similar = search_engine.find_similar_meetings(meeting_id, meeting_embeddings, all_embeddings)
+        if db.get_meeting_centroid(meeting_id):
+            # Look up the precomputed neighbour list
+            similar = db.get_similar_meetings(meeting_id)
+        else:
+            # Not backfilled yet: score against the full index
+            embedding_index = get_embedding_index(search_engine.embedding_model)
+            meeting_embeddings = db.get_meeting_embeddings(meeting_id, search_engine.embedding_model)
+            
+            if not embedding_index or not meeting_embeddings:
+                flash('Embeddings not found. Please analyze meetings first.')
+                return redirect(url_for('view_meeting', meeting_id=meeting_id))
+            
+            similar = search_engine.find_similar_meetings(meeting_id, meeting_embeddings, embedding_index)
         
         # Get cross-meeting insights
-        cross_insights = search_engine.discover_cross_meeting_insights(all_embeddings)
+        cross_insights = search_engine.get_materialized_insights(db)
         
         # Generate recommendations
         recommendations = search_engine.generate_meeting_recommendations(
@@ -343,19 +583,19 @@ def similar_meetings(meeting_id):
 def cross_meeting_insights():
     """View cross-meeting insights dashboard"""
     try:
-        if not app.config['OPENAI_API_KEY']:
-            flash('OpenAI API key not configured')
+        if not semantic_search_available():
+            flash(semantic_search_unavailable_message())
             return redirect(url_for('index'))
         
-        search_engine = SemanticSearchEngine(app.config['OPENAI_API_KEY'])
-        all_embeddings = db.get_all_embeddings()
+        search_engine = get_search_engine()
+        embedding_index = get_embedding_index(search_engine.embedding_model)
         
-        if not all_embeddings:
+        if not embedding_index:
             flash('No embeddings found. Please analyze meetings first.')
             return redirect(url_for('index'))
         
         # Get cross-meeting insights
-        insights = search_engine.discover_cross_meeting_insights(all_embeddings)
+        insights = search_engine.get_materialized_insights(db)
         
         # Get meeting titles for display
         meetings = {m['id']: m for m in db.get_all_meetings()}
@@ -371,8 +611,8 @@ def cross_meeting_insights():
 @app.route('/generate_embeddings/<int:meeting_id>', methods=['POST'])
 def generate_embeddings(meeting_id):
     """Generate embeddings for a specific meeting"""
-    if not app.config['OPENAI_API_KEY']:
-        return jsonify({'error': 'OpenAI API key not configured'}), 400
+    if not semantic_search_available():
+        return jsonify({'error': semantic_search_unavailable_message()}), 400
     
     meeting = db.get_meeting(meeting_id)
     if not meeting:
@@ -383,23 +623,23 @@ def generate_embeddings(meeting_id):
         return jsonify({'error': 'Meeting must be transcribed first'}), 400
     
     try:
-        search_engine = SemanticSearchEngine(app.config['OPENAI_API_KEY'])
+        search_engine = get_search_engine()
         summary = db.get_meeting_summary(meeting_id)
         summary_text = summary['summary'] if summary else ""
         
-        embeddings_data = search_engine.process_meeting_for_search(
+        embeddings_count = search_engine.save_meeting_embeddings(
+            db,
             meeting_id,
             transcription['full_text'],
             meeting['title'],
             summary_text
         )
         
-        if embeddings_data:
-            db.save_embeddings(meeting_id, embeddings_data)
+        if embeddings_count:
             return jsonify({
                 'success': True,
                 'message': 'Embeddings generated successfully',
-                'embeddings_count': len(embeddings_data)
+                'embeddings_count': embeddings_count
             })
         else:
             return jsonify({'error': 'Failed to generate embeddings'}), 500
@@ -794,14 +1034,8 @@ def delete_translation(translation_id):
         return jsonify({'error': 'Translation not found'}), 404
     
     try:
-        # For now, we'll delete from database directly
         # In production, you might want to implement soft delete
-        import sqlite3
-        conn = sqlite3.connect(db.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM translations WHERE id = ?', (translation_id,))
-        conn.commit()
-        conn.close()
+        db.delete_translation(translation_id)
         
         return jsonify({'success': True, 'message': 'Translation deleted successfully'})
     except Exception as e:
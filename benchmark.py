@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the search index on synthetic embeddings, and for database round trips
+Usage: python benchmark.py [n_chunks] [n_queries]
+"""
+
+import os
+import sys
+import contextlib
+import time
+import shutil
+import sqlite3
+import tempfile
+import numpy as np
+from database import DatabaseManager
+from vector_index import VectorIndex
+
+
+def make_corpus(n_chunks: int, n_queries: int, dims: int = 1536, n_topics: int = 50,
+                chunks_per_meeting: int = 20, seed: int = 0, topical_meetings: bool = False):
+    """Clustered random vectors grouped into meetings, roughly like real chunk embeddings
+
+    Leading dimensions get more variance, as in Matryoshka-trained models such as
+    text-embedding-3, so that truncated vectors keep most of the signal. With topical_meetings
+    each meeting draws its chunks from a few topics of its own instead of from all of them.
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.sqrt(1 + np.arange(dims) / 64)
+    topics = rng.normal(size=(n_topics, dims))
+
+    def sample(topic_ids):
+        return (topics[topic_ids] + rng.normal(scale=0.8, size=(len(topic_ids), dims))) * weights
+
+    if topical_meetings:
+        meeting_topics = rng.integers(n_topics, size=(n_chunks // chunks_per_meeting + 1, 3))
+        chunk_topics = meeting_topics[np.arange(n_chunks) // chunks_per_meeting, rng.integers(3, size=n_chunks)]
+    else:
+        chunk_topics = rng.integers(n_topics, size=n_chunks)
+    vectors = sample(chunk_topics).astype(np.float32)
+    rows = [
+        {'meeting_id': i // chunks_per_meeting + 1, 'chunk_index': i % chunks_per_meeting,
+         'text': '', 'embedding': vectors[i], 'metadata': {'title': ''}}
+        for i in range(n_chunks)
+    ]
+
+    # Full-precision vectors by chunk key, standing in for the database BLOBs
+    chunks = {(row['meeting_id'], 'transcription', row['chunk_index']): row['embedding'] for row in rows}
+    return rows, sample(rng.integers(n_topics, size=n_queries)), lambda keys: [chunks.get(key) for key in keys]
+
+
+@contextlib.contextmanager
+def corpus_database(rows):
+    """A temporary database holding the corpus embeddings, for re-ranking against real BLOB reads"""
+    directory = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(directory, 'corpus.db'))
+        by_meeting = {}
+        for row in rows:
+            by_meeting.setdefault(row['meeting_id'], []).append(row)
+        with db.transaction():
+            for meeting_id, meeting_rows in sorted(by_meeting.items()):
+                # Meeting ids count up from 1 in both the corpus and a fresh database
+                assert db.create_meeting('Benchmark', 'benchmark.wav', '/tmp/benchmark.wav') == meeting_id
+                db.save_embeddings(meeting_id, meeting_rows, update_derived=False)
+        yield db
+        db.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+def compare_indexes(title: str, rows, queries, configs, top_k: int = 10):
+    """Print matrix size, latency and recall@k of each index config against exact float32 search"""
+    def keys(results):
+        return {(r['meeting_id'], r['chunk_index']) for r in results}
+
+    print(f"📏 {title}: {len(rows)} chunks, {len(queries)} queries, recall@{top_k} vs float32\n")
+    baseline = VectorIndex(rows)
+    expected = [keys(baseline.search(q, top_k=top_k)) for q in queries]
+
+    print(f"{'index':<22}{'matrix MB':>10}{'ms/query':>10}{'recall':>9}")
+    for name, options in configs:
+        index = VectorIndex(rows, **options)
+        matrix = index.matrix
+
+        start = time.perf_counter()
+        found = [keys(index.search(q, top_k=top_k)) for q in queries]
+        elapsed = (time.perf_counter() - start) / len(queries) * 1000
+
+        recall = np.mean([len(f & e) / top_k for f, e in zip(found, expected)])
+        print(f"{name:<22}{matrix.nbytes / 2 ** 20:>10.1f}{elapsed:>10.2f}{recall:>9.4f}")
+    print()
+
+
+def benchmark_quantization(rows, queries, full_vectors):
+    """Quantized indexes, with and without full-precision re-ranking (in memory and from SQLite)"""
+    with corpus_database(rows) as db:
+        compare_indexes("Quantization", rows, queries, [
+            ('float32', {}),
+            ('float16', {'quantization': 'float16'}),
+            ('float16 + rerank', {'quantization': 'float16', 'full_vectors': full_vectors}),
+            ('int8', {'quantization': 'int8'}),
+            ('int8 + rerank', {'quantization': 'int8', 'full_vectors': full_vectors}),
+            ('int8 + rerank (db)', {'quantization': 'int8', 'full_vectors': db.get_chunk_vectors}),
+        ])
+
+
+def benchmark_dimensions(rows, queries, full_vectors):
+    """Truncated (Matryoshka) first-pass vectors, with and without full-vector re-ranking"""
+    configs = [('1536 dims', {})]
+    for dimensions in (512, 256, 128):
+        configs.append((f'{dimensions} dims', {'dimensions': dimensions}))
+        configs.append((f'{dimensions} dims + rerank', {'dimensions': dimensions, 'full_vectors': full_vectors}))
+    configs.append(('256 dims int8 + rerank', {'dimensions': 256, 'quantization': 'int8',
+                                               'full_vectors': full_vectors}))
+    compare_indexes("Prefix dimensions", rows, queries, configs)
+
+
+def benchmark_coarse(n_chunks: int, n_queries: int):
+    """Coarse-to-fine search: meeting centroids first, then the chunks of the top M meetings"""
+    rows, queries, _ = make_corpus(n_chunks, n_queries, topical_meetings=True)
+    configs = [('all chunks', {})]
+    for meetings in (100, 50, 20):
+        configs.append((f'top {meetings} meetings', {'coarse_meetings': meetings}))
+    compare_indexes("Coarse-to-fine (topical meetings)", rows, queries, configs)
+
+
+def benchmark_batch(rows, queries, full_vectors):
+    """Many queries at once: one search per query versus search_many's single matrix-matrix product"""
+    print(f"📏 Batch queries: {len(rows)} chunks, {len(queries)} queries\n")
+    index = VectorIndex(rows)
+    index.search(queries[0])
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query)
+    looped = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.search_many(queries)
+    batched = time.perf_counter() - start
+
+    print(f"{'method':<22}{'queries/s':>10}")
+    print(f"{'search per query':<22}{len(queries) / looped:>10.0f}")
+    print(f"{'search_many':<22}{len(queries) / batched:>10.0f}")
+    print()
+
+
+def benchmark_snapshot(rows, queries, full_vectors):
+    """Cold start of a worker: building the index from rows versus opening the memory-mapped snapshot"""
+    print(f"📏 Snapshot: {len(rows)} chunks\n")
+    start = time.perf_counter()
+    index = VectorIndex(rows)
+    index.search(queries[0])
+    built = time.perf_counter() - start
+
+    directory = tempfile.mkdtemp()
+    try:
+        index.save_snapshot(os.path.join(directory, 'index'))
+        start = time.perf_counter()
+        loaded = VectorIndex.load_snapshot(os.path.join(directory, 'index'))
+        loaded.search(queries[0])
+        opened = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory)
+
+    print(f"{'start':<22}{'seconds':>10}{'private MB':>12}")
+    print(f"{'build from rows':<22}{built:>10.3f}{index.matrix.nbytes / 2 ** 20:>12.1f}")
+    print(f"{'open snapshot':<22}{opened:>10.3f}{0.0:>12.1f}")
+    print()
+
+
+def benchmark_connections(n_calls: int = 2000):
+    """Per-call overhead of DatabaseManager: a new connection per call versus the persistent per-thread one"""
+
+    class ConnectPerCall(DatabaseManager):
+        def _connect(self):
+            return sqlite3.connect(self.db_path)
+
+    print(f"📏 Database calls: {n_calls} reads, {n_calls // 10} writes\n")
+    print(f"{'connections':<22}{'reads/s':>10}{'writes/s':>10}")
+    directory = tempfile.mkdtemp()
+    try:
+        for name, cls in (('connect per call', ConnectPerCall), ('persistent', DatabaseManager)):
+            db = cls(os.path.join(directory, f'{cls.__name__}.db'))
+            meeting_id = db.create_meeting('Benchmark', 'benchmark.wav', '/tmp/benchmark.wav', 60.0)
+
+            start = time.perf_counter()
+            for _ in range(n_calls):
+                db.get_meeting(meeting_id)
+            reads = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(n_calls // 10):
+                db.update_meeting_status(meeting_id, f'status {i}')
+            writes = time.perf_counter() - start
+
+            db.close()
+            print(f"{name:<22}{n_calls / reads:>10.0f}{n_calls // 10 / writes:>10.0f}")
+    finally:
+        shutil.rmtree(directory)
+    print()
+
+
+def benchmark_transactions(n_meetings: int = 100, n_chunks: int = 20, dims: int = 1536):
+    """Saving a meeting's analysis: a commit per call versus one DatabaseManager.transaction()"""
+    print(f"📏 Analysis writes: {n_meetings} meetings, {n_chunks} chunks each\n")
+    print(f"{'writes':<22}{'ms/meeting':>10}")
+    rng = np.random.default_rng(0)
+    embeddings = [{'text': f'chunk {i}', 'embedding': rng.standard_normal(dims).astype(np.float32), 'chunk_index': i}
+                  for i in range(n_chunks)]
+    directory = tempfile.mkdtemp()
+    try:
+        for name, grouped in (('commit per call', False), ('one transaction', True)):
+            db = DatabaseManager(os.path.join(directory, f'{name}.db'))
+            meeting_ids = [db.create_meeting(f'Meeting {i}', 'm.wav', '/tmp/m.wav') for i in range(n_meetings)]
+
+            start = time.perf_counter()
+            for meeting_id in meeting_ids:
+                with db.transaction() if grouped else contextlib.nullcontext():
+                    db.save_meeting_summary(meeting_id, 'Summary', [], [], [])
+                    db.save_meeting_insights(meeting_id, {'effectiveness_score': 7})
+                    db.save_embeddings(meeting_id, embeddings, update_derived=False)
+            elapsed = time.perf_counter() - start
+
+            db.close()
+            print(f"{name:<22}{elapsed / n_meetings * 1000:>10.2f}")
+    finally:
+        shutil.rmtree(directory)
+    print()
+
+
+def main():
+    n_chunks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    corpus = make_corpus(n_chunks, n_queries)
+    benchmark_quantization(*corpus)
+    benchmark_dimensions(*corpus)
+    benchmark_batch(*corpus)
+    benchmark_coarse(n_chunks, n_queries)
+    benchmark_snapshot(*corpus)
+    benchmark_connections()
+    benchmark_transactions()
+
+
+if __name__ == "__main__":
+    main()
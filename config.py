@@ -11,6 +11,40 @@ class Config:
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB max file size
     ALLOWED_EXTENSIONS = {'mp3', 'wav', 'm4a', 'mp4', 'mpeg', 'mpga', 'webm'}
     
+    # Approximate nearest-neighbour search (IVF over k-means centroids)
+    ANN_ENABLED = os.environ.get('ANN_ENABLED', 'false').lower() == 'true'
+    ANN_N_LISTS = int(os.environ.get('ANN_N_LISTS', 0))  # 0 = about sqrt(number of chunks)
+    ANN_N_PROBE = int(os.environ.get('ANN_N_PROBE', 8))  # Higher = better recall, slower queries
+    ANN_MIN_ROWS = int(os.environ.get('ANN_MIN_ROWS', 5000))  # Exact search below this size
+    
+    # Coarse-to-fine search: rank meeting centroids first, then score the chunks of this many meetings (0 = off)
+    COARSE_SEARCH_MEETINGS = int(os.environ.get('COARSE_SEARCH_MEETINGS', 0))
+    
+    # Sharded search: comma-separated host:port addresses of shard_search.py workers (empty = in-process index)
+    SEARCH_SHARDS = [a.strip() for a in os.environ.get('SEARCH_SHARDS', '').split(',') if a.strip()]
+    SEARCH_SHARD_MODEL = os.environ.get('SEARCH_SHARD_MODEL', 'text-embedding-3-small')  # Model the shards serve
+    # Shared secret between the app and its shards; required, since shards unpickle what clients send
+    SEARCH_SHARD_AUTHKEY = os.environ.get('SEARCH_SHARD_AUTHKEY', '').encode() or None
+    
+    # Memory-mapped index snapshots shared by all workers (empty to disable)
+    INDEX_SNAPSHOT_DIR = os.environ.get('INDEX_SNAPSHOT_DIR', 'index_snapshots')
+    
+    # Embedding backend: 'openai', or 'local' (TF-IDF + SVD fitted on our meetings, no API calls)
+    EMBEDDING_PROVIDER = os.environ.get('EMBEDDING_PROVIDER', 'openai').lower()
+    # Also store local vectors and search with them when the OpenAI API is unreachable
+    EMBEDDING_FALLBACK = os.environ.get('EMBEDDING_FALLBACK', 'false').lower() == 'true'
+    
+    # Reduced-precision index vectors ('float16' or 'int8'); shortlists are re-ranked at full precision
+    INDEX_QUANTIZATION = os.environ.get('INDEX_QUANTIZATION', '').lower() or None
+    INDEX_DIMENSIONS = int(os.environ.get('INDEX_DIMENSIONS', 0)) or None  # Leading dims scanned first (e.g. 256)
+    
+    # Fuse keyword (BM25) and vector rankings in /search
+    HYBRID_SEARCH = os.environ.get('HYBRID_SEARCH', 'true').lower() == 'true'
+    
+    # Query embedding cache (in-process LRU + SQLite table)
+    QUERY_CACHE_MEMORY_SIZE = int(os.environ.get('QUERY_CACHE_MEMORY_SIZE', 1024))
+    QUERY_CACHE_DISK_SIZE = int(os.environ.get('QUERY_CACHE_DISK_SIZE', 50000))
+    
     # Ensure upload directory exists
     if not os.path.exists(UPLOAD_FOLDER):
         os.makedirs(UPLOAD_FOLDER) 
\ No newline at end of file
@@ -1,16 +1,309 @@
 import sqlite3
+import base64
 import json
+import os
+import re
+import threading
+import time
+import weakref
+import numpy as np
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from vector_index import VectorIndex
+from topic_clusters import TopicModel
+
+# Chunks scoring at least this against a theme are kept for the cross-meeting insights
+THEME_SIMILARITY_THRESHOLD = 0.6
+THEME_CHUNKS_PER_MEETING = 15
+
+# Neighbours kept per meeting; more than the pages show so filtered-out meetings leave enough
+MEETING_NEIGHBORS = 20
+
+# Topic clusters over the primary model's chunks, labelled with this many terms
+TOPIC_CLUSTERS = 8
+TOPIC_LABEL_TERMS = 4
+
+# Model of embeddings stored before vectors were versioned by model
+DEFAULT_EMBEDDING_MODEL = 'text-embedding-3-small'
+
+# A model fit claimed longer ago than this is assumed to belong to a worker that died
+EMBEDDING_FIT_CLAIM_SECONDS = 3600
+
+# Chunk keys per re-ranking query, three bound variables each (older SQLite allows 999)
+CHUNK_VECTOR_BATCH = 300
+
+# Embedding indexes shared by every DatabaseManager in this process, keyed by database path and model
+_embedding_indexes: Dict[Tuple[str, str], VectorIndex] = {}
+_embedding_indexes_lock = threading.Lock()
+
+# Applied to every connection when it is opened
+SQLITE_PRAGMAS = (
+    'journal_mode=WAL',      # Readers no longer block the writer (or each other)
+    'synchronous=NORMAL',    # Durable at checkpoints; safe against corruption in WAL mode
+    'busy_timeout=5000',     # Wait up to 5 s for the write lock instead of failing
+    'mmap_size=268435456',   # Read pages through a 256 MB memory map
+    'cache_size=-16000',     # 16 MB page cache per connection
+)
+
+class _ThreadConnection:
+    """A thread's connection, how many handles and transaction blocks are open on it, and the
+    callbacks waiting for the block to commit; closed when the thread ends"""
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.depth = 0
+        self.transactions = 0
+        self.after_commit = []
+    
+    def __del__(self):
+        self.conn.close()
+
+class ConnectionManager:
+    """One persistent SQLite connection per thread, opened on first use with SQLITE_PRAGMAS"""
+    
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def _reset(self):
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+    
+    def acquire(self) -> _ThreadConnection:
+        if self._pid != os.getpid():
+            # A forked child must neither use nor close the parent's connections: keep them alive, open new ones
+            self._inherited = (self._local, list(self._connections))
+            self._reset()
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(f'PRAGMA {pragma}')
+            holder = self._local.holder = _ThreadConnection(conn)
+            with self._lock:
+                self._connections.add(holder)
+        holder.depth += 1
+        return holder
+    
+    def release(self, holder: _ThreadConnection):
+        holder.depth -= 1
+        if holder.depth == 0 and holder.conn.in_transaction:
+            holder.conn.rollback()  # What closing a connection with uncommitted changes did
+    
+    def close(self):
+        """Close the connections of every thread (call once no thread is using them)"""
+        with self._lock:
+            holders = list(self._connections)
+            self._reset()
+        for holder in holders:
+            holder.conn.close()
+
+class PooledConnection:
+    """A handle to the calling thread's persistent connection, used in place of sqlite3.connect()
+    
+    close() hands the connection back instead of closing it; changes left uncommitted by the
+    outermost handle are rolled back. row_factory applies only to cursors made through this handle.
+    """
+    
+    def __init__(self, manager: ConnectionManager):
+        self._manager = manager
+        self._holder = manager.acquire()
+        self.row_factory = None
+    
+    def cursor(self) -> sqlite3.Cursor:
+        cursor = self._holder.conn.cursor()
+        cursor.row_factory = self.row_factory
+        return cursor
+    
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+    
+    def commit(self):
+        """Commit, unless inside DatabaseManager.transaction(), whose end commits everything at once"""
+        if not self._holder.transactions:
+            self._holder.conn.commit()
+    
+    def rollback(self):
+        self._holder.conn.rollback()
+    
+    def after_commit(self, callback):
+        """Run callback once the changes made so far are committed: now, or at the end of the transaction"""
+        if self._holder.transactions:
+            self._holder.after_commit.append(callback)
+        else:
+            callback()
+    
+    def close(self):
+        if self._holder is not None:
+            self._manager.release(self._holder)
+            self._holder = None
+    
+    def __del__(self):
+        self.close()
+
+# Connection managers shared by every DatabaseManager in this process, keyed by database path
+_connection_managers: Dict[str, ConnectionManager] = {}
+_connection_managers_lock = threading.Lock()
+
+def _add_embedding_model(cursor):
+    """Version embeddings by model, so vectors of different models never mix"""
+    cursor.execute('PRAGMA table_info(embeddings)')
+    if 'model' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE embeddings ADD COLUMN model TEXT NOT NULL DEFAULT '{DEFAULT_EMBEDDING_MODEL}'")
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_embeddings_model_meeting
+        ON embeddings (model, meeting_id)
+    ''')
+
+def _add_embedding_chunk_type(cursor):
+    """Tag embeddings with their chunk type, for search filters"""
+    cursor.execute('PRAGMA table_info(embeddings)')
+    if 'chunk_type' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE embeddings ADD COLUMN chunk_type TEXT NOT NULL DEFAULT 'transcription'")
+        # Older rows did not record it; a meeting's summary chunk holds exactly its latest summary
+        cursor.execute('''
+            UPDATE embeddings SET chunk_type = 'summary'
+            WHERE text_chunk = (
+                SELECT summary FROM meeting_summaries s WHERE s.meeting_id = embeddings.meeting_id
+                ORDER BY created_at DESC, id DESC LIMIT 1
+            )
+        ''')
+
+def _add_meeting_lookup_indexes(cursor):
+    """Index the per-meeting tables, so fetching a meeting's latest rows is a seek instead of a scan"""
+    for name, definition in (
+        ('idx_transcriptions_meeting', 'transcriptions (meeting_id, created_at DESC)'),
+        ('idx_meeting_summaries_meeting', 'meeting_summaries (meeting_id, created_at DESC)'),
+        ('idx_meeting_insights_meeting', 'meeting_insights (meeting_id, created_at DESC)'),
+        ('idx_visual_assets_meeting', 'visual_assets (meeting_id, created_at DESC)'),
+        ('idx_visual_assets_type', 'visual_assets (visual_type, created_at DESC)'),
+        ('idx_translations_meeting', 'translations (meeting_id, target_language, content_type, created_at DESC)'),
+        ('idx_translations_language', 'translations (target_language, content_type)'),
+    ):
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {definition}')
+
+def _add_meeting_list_indexes(cursor):
+    """Index meetings for keyset pagination, newest first, and for the dashboard's status totals"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_uploaded ON meetings (uploaded_at DESC, id DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_meetings_status ON meetings (status, duration)')
+
+# Schema changes made after the tables were first created, oldest first. PRAGMA user_version
+# records how many a database has run; only ever append, never edit or reorder.
+SCHEMA_MIGRATIONS = (
+    _add_embedding_model,
+    _add_embedding_chunk_type,
+    _add_meeting_lookup_indexes,
+    _add_meeting_list_indexes,
+)
+
+# Columns of a meeting that listings can project
+MEETING_FIELDS = ('id', 'title', 'filename', 'file_path', 'duration', 'uploaded_at', 'transcribed_at', 'status')
+
+class LazyJSONDict(dict):
+    """A row whose JSON text columns are decoded on first access instead of up front
+    
+    Item access, get(), `in`, iteration and json.dumps all see the decoded values.
+    """
+    
+    def __init__(self, row: Dict, json_fields: Tuple[str, ...]):
+        pending = {field: row[field] for field in json_fields if row.get(field)}
+        super().__init__((key, value) for key, value in row.items() if key not in pending)
+        self._pending = pending
+    
+    def __missing__(self, key):
+        if key not in self._pending:
+            raise KeyError(key)
+        value = self[key] = json.loads(self._pending.pop(key))
+        return value
+    
+    def __contains__(self, key) -> bool:
+        return super().__contains__(key) or key in self._pending
+    
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+    
+    def _decode_all(self):
+        for key in list(self._pending):
+            self[key]
+    
+    def __iter__(self):
+        self._decode_all()
+        return super().__iter__()
+    
+    def __len__(self) -> int:
+        return super().__len__() + len(self._pending)
+    
+    def keys(self):
+        self._decode_all()
+        return super().keys()
+    
+    def values(self):
+        self._decode_all()
+        return super().values()
+    
+    def items(self):
+        self._decode_all()
+        return super().items()
+
+# Parts of get_meeting_bundle holding a meeting's latest row of a table: (table, JSON columns)
+MEETING_LATEST_PARTS = {
+    'transcription': ('transcriptions', ('segments',)),
+    'summary': ('meeting_summaries', ('action_items', 'decisions', 'key_topics')),
+    'insights': ('meeting_insights', ('engagement_analysis', 'communication_patterns', 'recommendations')),
+}
+MEETING_BUNDLE_PARTS = ('transcription', 'summary', 'insights', 'visuals', 'translations')
 
 class DatabaseManager:
     def __init__(self, db_path: str = 'meeting_assistant.db'):
         self.db_path = db_path
+        with _connection_managers_lock:
+            key = os.path.abspath(db_path)
+            if key not in _connection_managers:
+                _connection_managers[key] = ConnectionManager(db_path)
+            self.connections = _connection_managers[key]
         self.init_database()
     
+    def _connect(self) -> PooledConnection:
+        """The calling thread's persistent connection to the database"""
+        return PooledConnection(self.connections)
+    
+    def close(self):
+        """Close this database's connections in every thread (they reopen on the next call)"""
+        self.connections.close()
+    
+    @contextmanager
+    def transaction(self):
+        """Make the writes of every call inside the block one commit, all or nothing
+        
+        Methods called in the block (from this thread) leave their changes uncommitted; they are
+        committed together when the block ends, or all rolled back if it raises. Nested blocks
+        join the outermost one.
+        """
+        conn = self._connect()
+        holder = conn._holder
+        holder.transactions += 1
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            holder.transactions -= 1
+            if not holder.transactions:
+                callbacks, holder.after_commit = holder.after_commit, []
+                if completed:
+                    conn.commit()
+                    for callback in callbacks:
+                        callback()
+                else:
+                    conn.rollback()
+            conn.close()
+    
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Meetings table
@@ -56,17 +349,161 @@ class DatabaseManager:
         ''')
         
         # Embeddings table for semantic search
-        cursor.execute('''
+        cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS embeddings (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 meeting_id INTEGER NOT NULL,
                 text_chunk TEXT NOT NULL,
-                embedding TEXT NOT NULL,  -- JSON string of vector
+                embedding BLOB NOT NULL,  -- little-endian float32 vector (legacy rows: JSON string)
                 chunk_index INTEGER,
+                chunk_type TEXT NOT NULL DEFAULT 'transcription',  -- 'transcription' or 'summary'
+                model TEXT NOT NULL DEFAULT '{DEFAULT_EMBEDDING_MODEL}',  -- Vectors of different models never mix
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (meeting_id) REFERENCES meetings (id)
+            )
+        ''')
+        
+        # Fitted local embedding models; each fit is a separate model version
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS embedding_models (
+                name TEXT PRIMARY KEY,
+                state BLOB NOT NULL,  -- Serialized model parameters
+                document_count INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Model fits in progress, one per model name prefix, so only one worker fits at a time
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS embedding_model_fits (
+                prefix TEXT PRIMARY KEY,
+                claimed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Change log for embeddings; the latest generation tells workers when their index is stale
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS embedding_changes (
+                generation INTEGER PRIMARY KEY AUTOINCREMENT,
+                meeting_id INTEGER NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Cached query embeddings, keyed by model and normalized query text
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS query_embeddings (
+                model TEXT NOT NULL,
+                query TEXT NOT NULL,
+                embedding BLOB NOT NULL,  -- little-endian float32 vector
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (model, query)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_query_embeddings_last_used
+            ON query_embeddings (last_used_at)
+        ''')
+        
+        # Content-addressed chunk embeddings, so unchanged text is never re-embedded
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS chunk_embeddings (
+                model TEXT NOT NULL,
+                content_hash TEXT NOT NULL,  -- sha256 of the exact text sent to the API
+                embedding BLOB NOT NULL,     -- little-endian float32 vector
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (model, content_hash)
+            )
+        ''')
+        
+        # Theme vectors for the cross-meeting insights, embedded once in a single batch
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS theme_embeddings (
+                theme TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                embedding BLOB NOT NULL,  -- little-endian float32 vector
+                position INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Best matching chunks per meeting and theme, refreshed whenever a meeting's embeddings change
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS meeting_theme_chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                meeting_id INTEGER NOT NULL,
+                theme TEXT NOT NULL,
+                chunk_type TEXT,
+                chunk_index INTEGER,
+                text TEXT,  -- Snippet shown on the insights pages
+                similarity REAL NOT NULL,
                 FOREIGN KEY (meeting_id) REFERENCES meetings (id)
             )
         ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_meeting_theme_chunks_theme
+            ON meeting_theme_chunks (theme, similarity DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_meeting_theme_chunks_meeting
+            ON meeting_theme_chunks (meeting_id)
+        ''')
+        
+        # Meeting-level vectors, refreshed whenever a meeting's embeddings change
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS meeting_centroids (
+                meeting_id INTEGER PRIMARY KEY,
+                centroid BLOB NOT NULL,        -- normalized mean of the chunk vectors
+                mean_direction BLOB NOT NULL,  -- mean of the unit-length chunk vectors
+                chunk_count INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (meeting_id) REFERENCES meetings (id)
+            )
+        ''')
+        
+        # Top-N most similar meetings per meeting, maintained incrementally
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS meeting_neighbors (
+                meeting_id INTEGER NOT NULL,
+                neighbor_id INTEGER NOT NULL,
+                similarity REAL NOT NULL,
+                PRIMARY KEY (meeting_id, neighbor_id),
+                FOREIGN KEY (meeting_id) REFERENCES meetings (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_meeting_neighbors_neighbor
+            ON meeting_neighbors (neighbor_id)
+        ''')
+        
+        # Incremental topic clustering: k-means state per embedding model, meeting assignments and labels
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS topic_models (
+                model TEXT PRIMARY KEY,
+                state BLOB NOT NULL,              -- pickled MiniBatchKMeans
+                labels_stale INTEGER NOT NULL DEFAULT 1,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS meeting_topics (
+                meeting_id INTEGER NOT NULL,
+                model TEXT NOT NULL,
+                cluster INTEGER NOT NULL,
+                similarity REAL NOT NULL,         -- cosine similarity of the meeting to its cluster centroid
+                PRIMARY KEY (meeting_id, model),
+                FOREIGN KEY (meeting_id) REFERENCES meetings (id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS topic_labels (
+                model TEXT NOT NULL,
+                cluster INTEGER NOT NULL,
+                label TEXT NOT NULL,
+                PRIMARY KEY (model, cluster)
+            )
+        ''')
         
         # Meeting insights table
         cursor.execute('''
@@ -120,12 +557,102 @@ class DatabaseManager:
             )
         ''')
         
+        self._init_search_index(cursor)
         conn.commit()
+        
+        self._migrate_schema(conn)
         conn.close()
     
+    def _migrate_schema(self, conn):
+        """Apply the SCHEMA_MIGRATIONS this database has not run yet, holding the write lock so
+        that processes starting together run each migration once"""
+        conn.execute('BEGIN IMMEDIATE')
+        cursor = conn.cursor()
+        
+        cursor.execute('PRAGMA user_version')
+        version = cursor.fetchone()[0]
+        if version < len(SCHEMA_MIGRATIONS):
+            for migration in SCHEMA_MIGRATIONS[version:]:
+                migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {len(SCHEMA_MIGRATIONS)}')
+        
+        conn.commit()
+    
+    def _init_search_index(self, cursor):
+        """Create the FTS5 lexical index over meeting titles, transcripts and summaries"""
+        # One row per meeting (rowid = meeting id) holding its latest transcript and summary
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS meeting_search USING fts5(
+                title, transcript, summary,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        ''')
+        
+        latest_transcript = '''
+            COALESCE((SELECT full_text FROM transcriptions WHERE meeting_id = {id}
+                      ORDER BY created_at DESC, id DESC LIMIT 1), '')
+        '''
+        latest_summary = '''
+            COALESCE((SELECT summary FROM meeting_summaries WHERE meeting_id = {id}
+                      ORDER BY created_at DESC, id DESC LIMIT 1), '')
+        '''
+        
+        # Keep the index in sync with the source tables
+        triggers = {
+            'meeting_search_meeting_insert': '''
+                AFTER INSERT ON meetings BEGIN
+                    INSERT INTO meeting_search (rowid, title, transcript, summary)
+                    VALUES (new.id, new.title, '', '');
+                END
+            ''',
+            'meeting_search_meeting_title': '''
+                AFTER UPDATE OF title ON meetings BEGIN
+                    UPDATE meeting_search SET title = new.title WHERE rowid = new.id;
+                END
+            ''',
+            'meeting_search_meeting_delete': '''
+                AFTER DELETE ON meetings BEGIN
+                    DELETE FROM meeting_search WHERE rowid = old.id;
+                END
+            ''',
+            'meeting_search_transcript_insert': '''
+                AFTER INSERT ON transcriptions BEGIN
+                    UPDATE meeting_search SET transcript = new.full_text WHERE rowid = new.meeting_id;
+                END
+            ''',
+            'meeting_search_transcript_delete': f'''
+                AFTER DELETE ON transcriptions BEGIN
+                    UPDATE meeting_search SET transcript = {latest_transcript.format(id='old.meeting_id')}
+                    WHERE rowid = old.meeting_id;
+                END
+            ''',
+            'meeting_search_summary_insert': '''
+                AFTER INSERT ON meeting_summaries BEGIN
+                    UPDATE meeting_search SET summary = new.summary WHERE rowid = new.meeting_id;
+                END
+            ''',
+            'meeting_search_summary_delete': f'''
+                AFTER DELETE ON meeting_summaries BEGIN
+                    UPDATE meeting_search SET summary = {latest_summary.format(id='old.meeting_id')}
+                    WHERE rowid = old.meeting_id;
+                END
+            '''
+        }
+        for name, body in triggers.items():
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+        
+        # Index meetings created before the search index existed
+        cursor.execute(f'''
+            INSERT INTO meeting_search (rowid, title, transcript, summary)
+            SELECT m.id, m.title, {latest_transcript.format(id='m.id')}, {latest_summary.format(id='m.id')}
+            FROM meetings m
+            WHERE m.id NOT IN (SELECT rowid FROM meeting_search)
+        ''')
+    
     def create_meeting(self, title: str, filename: str, file_path: str, duration: float = None) -> int:
         """Create a new meeting record"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -141,20 +668,23 @@ class DatabaseManager:
     
     def update_meeting_status(self, meeting_id: int, status: str):
         """Update meeting status"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
             UPDATE meetings SET status = ? WHERE id = ?
         ''', (status, meeting_id))
         
+        # Only transcribed meetings are searchable, so a status change affects the index
+        self._record_embedding_change(cursor, meeting_id)
+        
         conn.commit()
         conn.close()
     
     def save_transcription(self, meeting_id: int, full_text: str, segments: List[Dict], 
                           language: str = None, confidence: float = None, duration: float = None):
         """Save transcription data"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -175,13 +705,14 @@ class DatabaseManager:
         update_query += ' WHERE id = ?'
         
         cursor.execute(update_query, params)
+        self._record_embedding_change(cursor, meeting_id)
         
         conn.commit()
         conn.close()
     
     def get_meeting(self, meeting_id: int) -> Optional[Dict]:
         """Get meeting by ID"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -196,7 +727,7 @@ class DatabaseManager:
     
     def get_all_meetings(self) -> List[Dict]:
         """Get all meetings"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -207,9 +738,73 @@ class DatabaseManager:
         
         return [dict(row) for row in results]
     
+    def get_meetings_page(self, limit: int = 50, after: Optional[str] = None,
+                          fields: Optional[Tuple[str, ...]] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Get a page of meetings, newest first, and the cursor of the next page (None after the last)
+        
+        Pages are keyed on (uploaded_at, id) instead of an offset, so any page is one index range
+        scan and pages do not shift as meetings are added. fields picks the columns returned
+        (default: all). Raises ValueError for an unknown field or a malformed cursor.
+        """
+        fields = tuple(fields or MEETING_FIELDS)
+        unknown = [field for field in fields if field not in MEETING_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown meeting fields: {', '.join(unknown)}")
+        columns = list(dict.fromkeys(fields + ('uploaded_at', 'id')))  # The cursor needs the key columns
+        
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        query = f'SELECT {", ".join(columns)} FROM meetings'
+        params = []
+        if after:
+            query += ' WHERE (uploaded_at, id) < (?, ?)'
+            params += self._decode_meeting_cursor(after)
+        cursor.execute(query + ' ORDER BY uploaded_at DESC, id DESC LIMIT ?', params + [limit + 1])
+        results = cursor.fetchall()
+        
+        conn.close()
+        
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = self._encode_meeting_cursor(results[-1]['uploaded_at'], results[-1]['id'])
+        return [{field: row[field] for field in fields} for row in results], next_cursor
+    
+    @staticmethod
+    def _encode_meeting_cursor(uploaded_at: str, meeting_id: int) -> str:
+        return base64.urlsafe_b64encode(json.dumps([uploaded_at, meeting_id]).encode()).decode()
+    
+    @staticmethod
+    def _decode_meeting_cursor(after: str) -> List:
+        try:
+            uploaded_at, meeting_id = json.loads(base64.urlsafe_b64decode(after.encode()))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if not isinstance(uploaded_at, str) or not isinstance(meeting_id, int):
+            raise ValueError("Invalid cursor")
+        return [uploaded_at, meeting_id]
+    
+    def get_meeting_stats(self) -> Dict:
+        """Count meetings by status and total their duration, from the (status, duration) index"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT status, COUNT(*), COALESCE(SUM(duration), 0) FROM meetings GROUP BY status')
+        results = cursor.fetchall()
+        
+        conn.close()
+        
+        return {
+            'total': sum(row[1] for row in results),
+            'by_status': {row[0]: row[1] for row in results},
+            'total_duration': sum(row[2] for row in results)
+        }
+    
     def save_visual_asset(self, meeting_id: int, visual_data: Dict):
         """Save a visual asset generated by DALL-E"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -236,24 +831,26 @@ class DatabaseManager:
     
     def get_meeting_visuals(self, meeting_id: int) -> List[Dict]:
         """Get all visual assets for a meeting"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
+        results = self._meeting_visuals(cursor, meeting_id)
+        conn.close()
+        
+        return results
+    
+    def _meeting_visuals(self, cursor, meeting_id: int) -> List[Dict]:
         cursor.execute('''
             SELECT * FROM visual_assets 
             WHERE meeting_id = ?
             ORDER BY created_at DESC
         ''', (meeting_id,))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in results]
+        return [dict(row) for row in cursor.fetchall()]
     
     def get_visual_asset(self, visual_id: int) -> Optional[Dict]:
         """Get a specific visual asset"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -270,7 +867,7 @@ class DatabaseManager:
     
     def delete_visual_asset(self, visual_id: int):
         """Delete a visual asset"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -282,7 +879,7 @@ class DatabaseManager:
     
     def get_all_visuals_by_type(self, visual_type: str) -> List[Dict]:
         """Get all visual assets of a specific type"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -301,13 +898,13 @@ class DatabaseManager:
     
     def get_transcription(self, meeting_id: int) -> Optional[Dict]:
         """Get transcription for a meeting"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         cursor.execute('''
             SELECT * FROM transcriptions WHERE meeting_id = ?
-            ORDER BY created_at DESC LIMIT 1
+            ORDER BY created_at DESC, id DESC LIMIT 1
         ''', (meeting_id,))
         
         result = cursor.fetchone()
@@ -323,7 +920,7 @@ class DatabaseManager:
     def save_meeting_summary(self, meeting_id: int, summary: str, action_items: List[Dict], 
                            decisions: List[Dict], key_topics: List[Dict]):
         """Save meeting analysis results"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -336,7 +933,7 @@ class DatabaseManager:
     
     def save_meeting_insights(self, meeting_id: int, insights: Dict):
         """Save meeting insights"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -357,13 +954,13 @@ class DatabaseManager:
     
     def get_meeting_summary(self, meeting_id: int) -> Optional[Dict]:
         """Get meeting summary"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         cursor.execute('''
             SELECT * FROM meeting_summaries WHERE meeting_id = ?
-            ORDER BY created_at DESC LIMIT 1
+            ORDER BY created_at DESC, id DESC LIMIT 1
         ''', (meeting_id,))
         
         result = cursor.fetchone()
@@ -380,13 +977,13 @@ class DatabaseManager:
     
     def get_meeting_insights(self, meeting_id: int) -> Optional[Dict]:
         """Get meeting insights"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         cursor.execute('''
             SELECT * FROM meeting_insights WHERE meeting_id = ?
-            ORDER BY created_at DESC LIMIT 1
+            ORDER BY created_at DESC, id DESC LIMIT 1
         ''', (meeting_id,))
         
         result = cursor.fetchone()
@@ -401,66 +998,481 @@ class DatabaseManager:
             return data
         return None
     
-    def save_embeddings(self, meeting_id: int, embeddings_data: List[Dict]):
-        """Save embeddings for a meeting"""
-        conn = sqlite3.connect(self.db_path)
+    def get_meeting_bundle(self, meeting_id: int, parts: Tuple[str, ...] = MEETING_BUNDLE_PARTS) -> Optional[Dict]:
+        """Get a meeting and the requested parts of its detail page on one connection
+        
+        Returns {'meeting': ..., part: ...} for each of parts, or None if there is no such meeting.
+        The meeting and its latest transcription, summary and insights come from a single query,
+        their JSON columns decoded only when read (see LazyJSONDict); visuals and translations (the
+        available languages) take one query each.
+        """
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        latest = [part for part in parts if part in MEETING_LATEST_PARTS]
+        columns, joins = ['m.*'], []
+        for part in latest:
+            table = MEETING_LATEST_PARTS[part][0]
+            # A marker column ends the previous part; the part's own columns follow it
+            columns += [f'NULL AS "_{part}"', f'{part}.*']
+            joins.append(f'''
+                LEFT JOIN {table} {part} ON {part}.id = (
+                    SELECT id FROM {table} WHERE meeting_id = m.id
+                    ORDER BY created_at DESC, id DESC LIMIT 1
+                )
+            ''')
+        cursor.execute(f'''
+            SELECT {', '.join(columns)} FROM meetings m {''.join(joins)} WHERE m.id = ?
+        ''', (meeting_id,))
+        row = cursor.fetchone()
+        if row is None:
+            conn.close()
+            return None
+        
+        rows, part = {'meeting': {}}, 'meeting'
+        for description, value in zip(cursor.description, row):
+            if description[0].startswith('_') and description[0][1:] in latest:
+                part = description[0][1:]
+                rows[part] = {}
+            else:
+                rows[part][description[0]] = value
+        
+        bundle = {'meeting': rows['meeting']}
+        for part in latest:
+            found = rows[part]['id'] is not None
+            bundle[part] = LazyJSONDict(rows[part], MEETING_LATEST_PARTS[part][1]) if found else None
+        if 'visuals' in parts:
+            bundle['visuals'] = self._meeting_visuals(cursor, meeting_id)
+        if 'translations' in parts:
+            bundle['translations'] = self._translation_languages(cursor, meeting_id)
+        
+        conn.close()
+        
+        return bundle
+    
+    def save_embeddings(self, meeting_id: int, embeddings_data: List[Dict],
+                        model: str = DEFAULT_EMBEDDING_MODEL, update_derived: bool = True):
+        """Save embeddings for a meeting
+        
+        Only rows of the given model are replaced. update_derived also refreshes the theme scores,
+        meeting centroids and topic clusters, which follow the deployment's primary model.
+        """
+        embeddings_data = [dict(item, meeting_id=meeting_id) for item in embeddings_data]
+        
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Delete existing embeddings for this meeting
-        cursor.execute('DELETE FROM embeddings WHERE meeting_id = ?', (meeting_id,))
+        cursor.execute('DELETE FROM embeddings WHERE meeting_id = ? AND model = ?', (meeting_id, model))
         
         # Insert new embeddings
-        for item in embeddings_data:
+        cursor.executemany('''
+            INSERT INTO embeddings (meeting_id, text_chunk, embedding, chunk_index, chunk_type, model)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(
+            meeting_id,
+            item['text'],
+            self._encode_embedding(item['embedding']),
+            item.get('chunk_index', 0),
+            VectorIndex.row_info(item)['chunk_type'],
+            model
+        ) for item in embeddings_data])
+        
+        if update_derived:
+            self._save_meeting_theme_chunks(cursor, meeting_id, embeddings_data, model)
+            self._save_meeting_centroid(cursor, meeting_id, embeddings_data)
+            self._update_meeting_topic(cursor, meeting_id, embeddings_data, model)
+        
+        generation = self._record_embedding_change(cursor, meeting_id)
+        cursor.execute('SELECT status, uploaded_at FROM meetings WHERE id = ?', (meeting_id,))
+        row = cursor.fetchone()
+        searchable = row is not None and row[0] == 'transcribed'
+        if row is not None:
+            embeddings_data = [dict(item, meeting_date=row[1]) for item in embeddings_data]
+        
+        conn.commit()
+        # Write through to this process's indexes instead of reloading them, once the rows are committed
+        conn.after_commit(lambda: self._write_through(meeting_id, embeddings_data, model, generation, searchable))
+        conn.close()
+    
+    def _write_through(self, meeting_id: int, embeddings_data: List[Dict], model: str, generation: int,
+                       searchable: bool):
+        key = self._index_key(model)
+        with _embedding_indexes_lock:
+            for index_key, index in _embedding_indexes.items():
+                if index_key[0] != key[0]:
+                    continue
+                if index_key == key:
+                    if searchable:
+                        index.upsert_meeting(meeting_id, embeddings_data)
+                    else:
+                        index.remove_meeting(meeting_id)
+                # Only advance if nothing else changed in between; otherwise the next sync catches up
+                if generation == index.generation + 1:
+                    index.generation = generation
+                if index_key == key:
+                    index.schedule_snapshot_save()
+    
+    @staticmethod
+    def _encode_embedding(embedding) -> bytes:
+        """Serialize a vector as raw little-endian float32 bytes"""
+        return np.asarray(embedding, dtype='<f4').tobytes()
+    
+    @staticmethod
+    def _decode_embedding(value) -> np.ndarray:
+        """Read a stored vector, zero-copy for binary rows and via JSON for legacy rows"""
+        if isinstance(value, bytes):
+            return np.frombuffer(value, dtype='<f4')
+        return np.asarray(json.loads(value), dtype=np.float32)
+    
+    def migrate_embeddings_to_blob(self, batch_size: int = 500, pause: float = 0.05,
+                                   vacuum: bool = False) -> int:
+        """Convert legacy JSON embeddings to float32 BLOBs in small batches, returning the row count"""
+        converted = 0
+        last_id = 0
+        
+        while True:
+            conn = self._connect()
+            cursor = conn.cursor()
+            
             cursor.execute('''
-                INSERT INTO embeddings (meeting_id, text_chunk, embedding, chunk_index)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                meeting_id,
-                item['text'],
-                json.dumps(item['embedding']),
-                item.get('chunk_index', 0)
-            ))
+                SELECT id, embedding FROM embeddings
+                WHERE id > ? AND typeof(embedding) = 'text'
+                ORDER BY id LIMIT ?
+            ''', (last_id, batch_size))
+            rows = cursor.fetchall()
+            
+            if rows:
+                # Skip rows rewritten since they were read; each batch is its own short transaction
+                cursor.executemany('''
+                    UPDATE embeddings SET embedding = ? WHERE id = ? AND typeof(embedding) = 'text'
+                ''', [(self._encode_embedding(json.loads(value)), row_id) for row_id, value in rows])
+                conn.commit()
+            
+            conn.close()
+            
+            if not rows:
+                break
+            
+            converted += len(rows)
+            last_id = rows[-1][0]
+            time.sleep(pause)  # Let request handlers take the write lock between batches
+        
+        if vacuum and converted:
+            conn = self._connect()
+            conn.execute('VACUUM')
+            conn.close()
+        
+        return converted
+    
+    def run_background_migrations(self, **kwargs):
+        """Convert legacy embeddings and backfill derived tables"""
+        self.migrate_embeddings_to_blob(**kwargs)
+        self.backfill_meeting_centroids()
+    
+    def start_background_migrations(self, **kwargs) -> Optional[threading.Thread]:
+        """Run the embedding migrations in a background thread if there is anything to do"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT 1 FROM embeddings WHERE typeof(embedding) = 'text' LIMIT 1")
+        pending = cursor.fetchone() is not None
+        if not pending:
+            cursor.execute('''
+                SELECT 1 FROM embeddings e
+                LEFT JOIN meeting_centroids c ON e.meeting_id = c.meeting_id
+                WHERE c.meeting_id IS NULL LIMIT 1
+            ''')
+            pending = cursor.fetchone() is not None
+        
+        conn.close()
+        
+        if not pending:
+            return None
+        
+        thread = threading.Thread(target=self.run_background_migrations, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+    
+    def _record_embedding_change(self, cursor, meeting_id: int) -> int:
+        """Append to the embedding change log and return the new generation"""
+        cursor.execute('INSERT INTO embedding_changes (meeting_id) VALUES (?)', (meeting_id,))
+        return cursor.lastrowid
+    
+    def get_embedding_generation(self) -> int:
+        """Get the latest embedding generation"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT COALESCE(MAX(generation), 0) FROM embedding_changes')
+        generation = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        return generation
+    
+    def get_embedding_changes(self, since_generation: int) -> Tuple[List[int], int]:
+        """Get the meetings whose embeddings changed after a generation, and the latest generation"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT meeting_id, generation FROM embedding_changes
+            WHERE generation > ?
+            ORDER BY generation
+        ''', (since_generation,))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        meeting_ids = list(dict.fromkeys(row[0] for row in results))
+        latest = results[-1][1] if results else since_generation
+        
+        return meeting_ids, latest
+    
+    def _index_key(self, model: str = DEFAULT_EMBEDDING_MODEL) -> Tuple[str, str]:
+        return os.path.abspath(self.db_path), model
+    
+    def get_embedding_index(self, quantization: Optional[str] = None, dimensions: Optional[int] = None,
+                            model: str = DEFAULT_EMBEDDING_MODEL, snapshot_dir: Optional[str] = None) -> VectorIndex:
+        """Get the process-wide embedding index, loading it once and syncing changes since
+        
+        quantization ('float16' or 'int8') and dimensions (a vector prefix length) apply when the
+        index is first loaded; searches then re-rank their shortlist with the full vectors
+        stored in this database. With snapshot_dir, unquantized indexes start from a
+        memory-mapped snapshot shared by every worker, which the writing process keeps current.
+        """
+        key = self._index_key(model)
+        
+        with _embedding_indexes_lock:
+            index = _embedding_indexes.get(key)
+            if index is None:
+                options = dict(quantization=quantization, dimensions=dimensions,
+                               full_vectors=lambda keys: self.get_chunk_vectors(keys, model))
+                snapshot_path = None
+                if snapshot_dir and not quantization:
+                    snapshot_path = os.path.join(snapshot_dir, f"{os.path.basename(self.db_path)}.{model}."
+                                                               f"{dimensions or 'full'}")
+                    index = VectorIndex.load_snapshot(snapshot_path, **options)
+                    if index is not None and index.generation > self.get_embedding_generation():
+                        index = None  # Written for a different database with the same name
+                
+                if index is None:
+                    generation = self.get_embedding_generation()
+                    index = VectorIndex(self.get_all_embeddings(model), generation=generation, **options)
+                    _embedding_indexes[key] = index
+                    if snapshot_path:
+                        index.snapshot_path = snapshot_path
+                        index.schedule_snapshot_save()
+                    return index
+                _embedding_indexes[key] = index
+            
+            self.sync_embedding_index(index, model)
+        
+        return index
+    
+    def sync_embedding_index(self, index: VectorIndex, model: str = DEFAULT_EMBEDDING_MODEL,
+                             shard: Optional[Tuple[int, int]] = None):
+        """Reload only the meetings other processes changed since the index's generation
+        
+        With shard=(shard_id, n_shards), changes to meetings of other shards are skipped.
+        """
+        changed_meeting_ids, latest = self.get_embedding_changes(index.generation)
+        for meeting_id in changed_meeting_ids:
+            if shard is not None and meeting_id % shard[1] != shard[0]:
+                continue
+            meeting = self.get_meeting(meeting_id)
+            if meeting and meeting['status'] == 'transcribed':
+                index.upsert_meeting(meeting_id, self.get_meeting_embeddings(meeting_id, model))
+            else:
+                index.remove_meeting(meeting_id)
+        index.generation = latest
+    
+    def save_embedding_model(self, name: str, state: bytes, document_count: int):
+        """Store a fitted local embedding model"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO embedding_models (name, state, document_count)
+            VALUES (?, ?, ?)
+        ''', (name, state, document_count))
         
         conn.commit()
         conn.close()
     
-    def get_all_embeddings(self) -> List[Dict]:
-        """Get all embeddings from database"""
-        conn = sqlite3.connect(self.db_path)
+    def get_latest_embedding_model_name(self, prefix: str) -> Optional[str]:
+        """Get the name of the most recently fitted embedding model whose name starts with prefix"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT name FROM embedding_models WHERE name LIKE ? || '%'
+            ORDER BY created_at DESC, rowid DESC LIMIT 1
+        ''', (prefix,))
+        result = cursor.fetchone()
+        
+        conn.close()
+        
+        return result[0] if result else None
+    
+    def get_embedding_model(self, name: str) -> Optional[Dict]:
+        """Get a stored embedding model by name"""
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
+        cursor.execute('SELECT * FROM embedding_models WHERE name = ?', (name,))
+        result = cursor.fetchone()
+        
+        conn.close()
+        
+        return dict(result) if result else None
+    
+    def count_embeddings(self, model: str = DEFAULT_EMBEDDING_MODEL) -> int:
+        """Count the stored chunk embeddings of a model"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT COUNT(*) FROM embeddings WHERE model = ?', (model,))
+        count = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        return count
+    
+    def delete_embedding_models(self, prefix: str, keep: str):
+        """Delete the fitted models with the given prefix stored before keep, and the embeddings they produced
+        
+        Models stored after keep (by a concurrent fit) are left alone. The deleted models' indexes
+        are dropped from this process once the deletion commits.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT rowid FROM embedding_models WHERE name = ?', (keep,))
+        row = cursor.fetchone()
+        if row is None:
+            conn.close()
+            return  # Deleted by a newer fit already
+        
         cursor.execute('''
-            SELECT e.*, m.title 
-            FROM embeddings e
-            JOIN meetings m ON e.meeting_id = m.id
+            SELECT name FROM embedding_models WHERE name LIKE ? || '%' AND rowid < ?
+        ''', (prefix, row[0]))
+        names = [name for name, in cursor.fetchall()]
+        # Vectors of models no longer stored go as well; those of keep and newer models stay
+        cursor.execute('''
+            DELETE FROM embeddings WHERE model LIKE ? || '%' AND model NOT IN (
+                SELECT name FROM embedding_models WHERE rowid >= ?
+            )
+        ''', (prefix, row[0]))
+        cursor.executemany('DELETE FROM embedding_models WHERE name = ?', [(name,) for name in names])
+        
+        conn.commit()
+        conn.after_commit(lambda: [self.drop_embedding_index(name) for name in names])
+        conn.close()
+    
+    def drop_embedding_index(self, model: str):
+        """Forget this process's index of a model, e.g. one whose vectors were deleted"""
+        with _embedding_indexes_lock:
+            _embedding_indexes.pop(self._index_key(model), None)
+    
+    def claim_embedding_model_fit(self, prefix: str, timeout: int = EMBEDDING_FIT_CLAIM_SECONDS) -> bool:
+        """Claim the fit of a new model with the given prefix, False if another worker holds the claim
+        
+        Claims expire after timeout seconds in case their worker died; release_embedding_model_fit
+        gives one up.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        # One statement, so two workers can never both find the claim free
+        cursor.execute('''
+            INSERT INTO embedding_model_fits (prefix) VALUES (?)
+            ON CONFLICT (prefix) DO UPDATE SET claimed_at = CURRENT_TIMESTAMP
+            WHERE claimed_at < datetime('now', ?)
+        ''', (prefix, f'-{timeout} seconds'))
+        claimed = cursor.rowcount == 1
+        
+        conn.commit()
+        conn.close()
+        
+        return claimed
+    
+    def release_embedding_model_fit(self, prefix: str):
+        """Give up a claim taken with claim_embedding_model_fit"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM embedding_model_fits WHERE prefix = ?', (prefix,))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_searchable_meetings(self) -> List[Dict]:
+        """Get the title, latest transcript and latest summary of every transcribed meeting"""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT m.id, m.title, s.transcript AS full_text, s.summary
+            FROM meeting_search s
+            JOIN meetings m ON m.id = s.rowid
             WHERE m.status = 'transcribed'
+            ORDER BY m.id
         ''')
         
         results = cursor.fetchall()
         conn.close()
         
+        return [dict(row) for row in results]
+    
+    def get_all_embeddings(self, model: str = DEFAULT_EMBEDDING_MODEL,
+                           shard: Optional[Tuple[int, int]] = None) -> List[Dict]:
+        """Get all embeddings of a model from database
+        
+        shard=(shard_id, n_shards) keeps only the meetings with meeting_id % n_shards == shard_id.
+        """
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        shard_id, n_shards = shard or (0, 1)
+        cursor.execute('''
+            SELECT e.*, m.title, m.uploaded_at AS meeting_date
+            FROM embeddings e
+            JOIN meetings m ON e.meeting_id = m.id
+            WHERE m.status = 'transcribed' AND e.model = ? AND e.meeting_id % ? = ?
+            ORDER BY e.id
+        ''', (model, n_shards, shard_id))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
         embeddings = []
         for row in results:
             data = dict(row)
-            data['embedding'] = json.loads(data['embedding'])
-            data['metadata'] = {'title': data['title'], 'type': 'transcription'}
+            data['embedding'] = self._decode_embedding(data['embedding'])
+            data['metadata'] = {'title': data['title'], 'type': data['chunk_type']}
             embeddings.append(data)
         
         return embeddings
     
-    def get_meeting_embeddings(self, meeting_id: int) -> List[Dict]:
-        """Get embeddings for a specific meeting"""
-        conn = sqlite3.connect(self.db_path)
+    def get_meeting_embeddings(self, meeting_id: int, model: str = DEFAULT_EMBEDDING_MODEL) -> List[Dict]:
+        """Get embeddings of a model for a specific meeting"""
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT e.*, m.title 
+            SELECT e.*, m.title, m.uploaded_at AS meeting_date
             FROM embeddings e
             JOIN meetings m ON e.meeting_id = m.id
-            WHERE e.meeting_id = ?
-        ''', (meeting_id,))
+            WHERE e.meeting_id = ? AND e.model = ?
+            ORDER BY e.id
+        ''', (meeting_id, model))
         
         results = cursor.fetchall()
         conn.close()
@@ -468,27 +1480,484 @@ class DatabaseManager:
         embeddings = []
         for row in results:
             data = dict(row)
-            data['embedding'] = json.loads(data['embedding'])
-            data['metadata'] = {'title': data['title'], 'type': 'transcription'}
+            data['embedding'] = self._decode_embedding(data['embedding'])
+            data['metadata'] = {'title': data['title'], 'type': data['chunk_type']}
             embeddings.append(data)
         
         return embeddings
     
-    def search_meetings_by_text(self, search_query: str) -> List[Dict]:
-        """Basic text search as fallback"""
-        conn = sqlite3.connect(self.db_path)
+    def get_chunk_vectors(self, keys: List[Tuple[int, str, int]],
+                          model: str = DEFAULT_EMBEDDING_MODEL) -> List[Optional[np.ndarray]]:
+        """Full-precision embeddings of the given (meeting_id, chunk_type, chunk_index) chunks, in key order
+        
+        Only the requested rows are read, in one query per CHUNK_VECTOR_BATCH keys; chunks that
+        no longer exist come back as None.
+        """
+        found = {}
+        conn = self._connect()
+        cursor = conn.cursor()
+        for start in range(0, len(keys), CHUNK_VECTOR_BATCH):
+            batch = keys[start:start + CHUNK_VECTOR_BATCH]
+            # Joining from the keys lets each one use the (model, meeting_id) index
+            cursor.execute(f'''
+                WITH chunk_keys (meeting_id, chunk_type, chunk_index) AS (VALUES {', '.join(['(?, ?, ?)'] * len(batch))})
+                SELECT e.meeting_id, e.chunk_type, e.chunk_index, e.embedding
+                FROM chunk_keys k
+                JOIN embeddings e ON e.model = ? AND e.meeting_id = k.meeting_id
+                    AND e.chunk_type = k.chunk_type AND e.chunk_index = k.chunk_index
+            ''', [value for key in batch for value in key] + [model])
+            for meeting_id, chunk_type, chunk_index, embedding in cursor.fetchall():
+                found[(meeting_id, chunk_type, chunk_index)] = embedding
+        conn.close()
+        
+        return [self._decode_embedding(found[key]) if key in found else None for key in keys]
+    
+    def _save_meeting_theme_chunks(self, cursor, meeting_id: int, embeddings_data: List[Dict],
+                                   model: str = DEFAULT_EMBEDDING_MODEL):
+        """Score one meeting's chunks against the stored themes and replace its theme rows"""
+        cursor.execute('DELETE FROM meeting_theme_chunks WHERE meeting_id = ?', (meeting_id,))
+        
+        cursor.execute('SELECT theme, embedding FROM theme_embeddings WHERE model = ? ORDER BY position', (model,))
+        themes = cursor.fetchall()
+        if not themes or not embeddings_data:
+            return
+        
+        theme_matrix = VectorIndex.normalize([self._decode_embedding(row[1]) for row in themes])
+        chunk_matrix = VectorIndex.normalize([item['embedding'] for item in embeddings_data])
+        similarities = chunk_matrix @ theme_matrix.T
+        chunks = [VectorIndex.row_info(item) for item in embeddings_data]
+        
+        rows = []
+        for theme_position, (theme, _) in enumerate(themes):
+            theme_scores = similarities[:, theme_position]
+            top = VectorIndex.top_k_indices(theme_scores, THEME_CHUNKS_PER_MEETING, THEME_SIMILARITY_THRESHOLD)
+            for i in top:
+                text = chunks[i]['text']
+                rows.append((
+                    meeting_id,
+                    theme,
+                    chunks[i]['chunk_type'],
+                    chunks[i]['chunk_index'],
+                    text[:200] + "..." if len(text) > 200 else text,
+                    float(theme_scores[i])
+                ))
+        
+        cursor.executemany('''
+            INSERT INTO meeting_theme_chunks (meeting_id, theme, chunk_type, chunk_index, text, similarity)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+    
+    def _save_meeting_centroid(self, cursor, meeting_id: int, embeddings_data: List[Dict]):
+        """Store a meeting's centroid and update the neighbour lists it affects"""
+        cursor.execute('DELETE FROM meeting_centroids WHERE meeting_id = ?', (meeting_id,))
+        
+        if embeddings_data:
+            vectors = np.asarray([item['embedding'] for item in embeddings_data], dtype=np.float32)
+            centroid = VectorIndex.normalize(vectors.mean(axis=0))[0]
+            mean_direction = VectorIndex.normalize(vectors).mean(axis=0)
+            cursor.execute('''
+                INSERT INTO meeting_centroids (meeting_id, centroid, mean_direction, chunk_count)
+                VALUES (?, ?, ?, ?)
+            ''', (meeting_id, self._encode_embedding(centroid), self._encode_embedding(mean_direction),
+                  len(embeddings_data)))
+        
+        self._update_meeting_neighbors(cursor, meeting_id)
+    
+    def _update_meeting_neighbors(self, cursor, meeting_id: int):
+        """Refresh neighbour lists after one meeting's centroid changed
+        
+        The similarity of meeting A to meeting B is the average cosine similarity between A's
+        mean vector and each chunk of B, which equals centroid(A) . mean_direction(B).
+        """
+        cursor.execute('SELECT meeting_id, centroid, mean_direction FROM meeting_centroids')
+        rows = cursor.fetchall()
+        cursor.execute('SELECT length(centroid) FROM meeting_centroids WHERE meeting_id = ?', (meeting_id,))
+        own = cursor.fetchone()
+        # Lists that contained this meeting may now rank a different meeting in its place
+        cursor.execute('SELECT meeting_id FROM meeting_neighbors WHERE neighbor_id = ?', (meeting_id,))
+        stale = {row[0] for row in cursor.fetchall()}
+        
+        # Centroids left over from another embedding model are not comparable. Without a centroid of
+        # its own (no vectors left) the meeting's former list owners decide, as they share its model
+        size = own[0] if own is not None else next((len(row[1]) for row in rows if row[0] in stale), None)
+        rows = [row for row in rows if len(row[1]) == size]
+        ids = [row[0] for row in rows]
+        positions = {mid: i for i, mid in enumerate(ids)}
+        if rows:
+            centroids = np.vstack([self._decode_embedding(row[1]) for row in rows])
+            directions = np.vstack([self._decode_embedding(row[2]) for row in rows])
+        
+        def save_list(position: int):
+            scores = directions @ centroids[position]
+            scores[position] = -np.inf
+            top = VectorIndex.top_k_indices(scores, MEETING_NEIGHBORS, threshold=-1.0)
+            cursor.executemany('''
+                INSERT INTO meeting_neighbors (meeting_id, neighbor_id, similarity) VALUES (?, ?, ?)
+            ''', [(ids[position], ids[i], float(scores[i])) for i in top])
+        
+        cursor.execute('''
+            DELETE FROM meeting_neighbors WHERE meeting_id = ? OR neighbor_id = ?
+        ''', (meeting_id, meeting_id))
+        for other_id in stale:
+            cursor.execute('DELETE FROM meeting_neighbors WHERE meeting_id = ?', (other_id,))
+            if other_id in positions:
+                save_list(positions[other_id])
+        
+        if meeting_id not in positions:
+            return
+        position = positions[meeting_id]
+        save_list(position)
+        
+        # Insert this meeting into the other lists it now ranks in
+        cursor.execute('''
+            SELECT meeting_id, COUNT(*), MIN(similarity) FROM meeting_neighbors GROUP BY meeting_id
+        ''')
+        list_stats = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        incoming = centroids @ directions[position]
+        for other_id, other_position in positions.items():
+            if other_id == meeting_id or other_id in stale:
+                continue
+            similarity = float(incoming[other_position])
+            count, lowest = list_stats.get(other_id, (0, None))
+            if count < MEETING_NEIGHBORS or similarity > lowest:
+                cursor.execute('''
+                    INSERT INTO meeting_neighbors (meeting_id, neighbor_id, similarity) VALUES (?, ?, ?)
+                ''', (other_id, meeting_id, similarity))
+                if count >= MEETING_NEIGHBORS:
+                    cursor.execute('''
+                        DELETE FROM meeting_neighbors WHERE rowid = (
+                            SELECT rowid FROM meeting_neighbors WHERE meeting_id = ?
+                            ORDER BY similarity ASC LIMIT 1
+                        )
+                    ''', (other_id,))
+    
+    def _update_meeting_topic(self, cursor, meeting_id: int, embeddings_data: List[Dict], model: str):
+        """Fold a meeting's chunks into the topic clusters and store the meeting's cluster
+        
+        The first fit waits until the model has at least TOPIC_CLUSTERS chunks, then takes all of
+        them and assigns every meeting; after that each save is one partial_fit on the new chunks.
+        Earlier assignments are kept as the centroids drift.
+        """
+        cursor.execute('DELETE FROM meeting_topics WHERE meeting_id = ? AND model = ?', (meeting_id, model))
+        cursor.execute('SELECT state FROM topic_models WHERE model = ?', (model,))
+        row = cursor.fetchone()
+        topics = TopicModel.from_bytes(row[0]) if row else TopicModel(n_clusters=TOPIC_CLUSTERS)
+        
+        if topics.ready:
+            meetings = {meeting_id: [item['embedding'] for item in embeddings_data]} if embeddings_data else {}
+        else:
+            cursor.execute('SELECT meeting_id, embedding FROM embeddings WHERE model = ? ORDER BY id', (model,))
+            meetings = {}
+            for other_id, embedding in cursor.fetchall():
+                meetings.setdefault(other_id, []).append(self._decode_embedding(embedding))
+        
+        if meetings and topics.partial_fit([vector for vectors in meetings.values() for vector in vectors]):
+            for other_id, vectors in meetings.items():
+                assignment = topics.assign(vectors)
+                cursor.execute('''
+                    INSERT OR REPLACE INTO meeting_topics (meeting_id, model, cluster, similarity)
+                    VALUES (?, ?, ?, ?)
+                ''', (other_id, model, assignment['cluster'], assignment['similarity']))
+            cursor.execute('''
+                INSERT OR REPLACE INTO topic_models (model, state, labels_stale, updated_at)
+                VALUES (?, ?, 1, CURRENT_TIMESTAMP)
+            ''', (model, topics.to_bytes()))
+        elif row:
+            cursor.execute('UPDATE topic_models SET labels_stale = 1 WHERE model = ?', (model,))
+    
+    def get_topics(self, model: str = DEFAULT_EMBEDDING_MODEL) -> List[Dict]:
+        """Topic clusters with their labels and transcribed meetings, largest first
+        
+        Labels are recomputed only when assignments changed since they were last stored.
+        """
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
+        cursor.execute('SELECT labels_stale FROM topic_models WHERE model = ?', (model,))
+        row = cursor.fetchone()
+        if row is None:
+            conn.close()
+            return []
+        
+        if row['labels_stale']:
+            cursor.execute('''
+                SELECT t.cluster, s.title, s.summary, s.transcript
+                FROM meeting_topics t
+                JOIN meeting_search s ON s.rowid = t.meeting_id
+                WHERE t.model = ?
+            ''', (model,))
+            documents = {}
+            for result in cursor.fetchall():
+                documents.setdefault(result['cluster'], []).append(
+                    ' '.join(result[column] or '' for column in ('title', 'summary', 'transcript')))
+            labels = TopicModel.label_clusters(documents, TOPIC_LABEL_TERMS)
+            cursor.execute('DELETE FROM topic_labels WHERE model = ?', (model,))
+            cursor.executemany('INSERT INTO topic_labels (model, cluster, label) VALUES (?, ?, ?)',
+                               [(model, cluster, label) for cluster, label in labels.items()])
+            cursor.execute('UPDATE topic_models SET labels_stale = 0 WHERE model = ?', (model,))
+            conn.commit()
+        
         cursor.execute('''
-            SELECT DISTINCT m.*, t.full_text, s.summary
-            FROM meetings m
-            LEFT JOIN transcriptions t ON m.id = t.meeting_id
-            LEFT JOIN meeting_summaries s ON m.id = s.meeting_id
-            WHERE m.status = 'transcribed' 
-            AND (m.title LIKE ? OR t.full_text LIKE ? OR s.summary LIKE ?)
-            ORDER BY m.uploaded_at DESC
-        ''', (f'%{search_query}%', f'%{search_query}%', f'%{search_query}%'))
+            SELECT t.cluster, COALESCE(l.label, '') AS label, t.meeting_id, t.similarity,
+                   m.title, m.uploaded_at
+            FROM meeting_topics t
+            JOIN meetings m ON m.id = t.meeting_id
+            LEFT JOIN topic_labels l ON l.model = t.model AND l.cluster = t.cluster
+            WHERE t.model = ? AND m.status = 'transcribed'
+            ORDER BY t.cluster, t.similarity DESC
+        ''', (model,))
+        
+        topics = {}
+        for result in cursor.fetchall():
+            topic = topics.setdefault(result['cluster'], {
+                'cluster': result['cluster'], 'label': result['label'], 'meetings': []
+            })
+            topic['meetings'].append({
+                'id': result['meeting_id'], 'title': result['title'],
+                'uploaded_at': result['uploaded_at'], 'similarity': result['similarity']
+            })
+        
+        conn.close()
+        
+        return sorted(topics.values(), key=lambda topic: (-len(topic['meetings']), topic['cluster']))
+    
+    def backfill_meeting_centroids(self) -> int:
+        """Compute centroids and neighbour lists for meetings embedded before they existed"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT DISTINCT e.meeting_id FROM embeddings e
+            LEFT JOIN meeting_centroids c ON e.meeting_id = c.meeting_id
+            WHERE c.meeting_id IS NULL AND e.model = ?
+        ''', (DEFAULT_EMBEDDING_MODEL,))
+        missing = [row[0] for row in cursor.fetchall()]
+        
+        for meeting_id in missing:
+            cursor.execute('''
+                SELECT embedding FROM embeddings WHERE meeting_id = ? AND model = ?
+            ''', (meeting_id, DEFAULT_EMBEDDING_MODEL))
+            embeddings_data = [{'embedding': self._decode_embedding(row[0])} for row in cursor.fetchall()]
+            self._save_meeting_centroid(cursor, meeting_id, embeddings_data)
+            conn.commit()
+        
+        conn.close()
+        
+        return len(missing)
+    
+    def get_meeting_centroid(self, meeting_id: int) -> Optional[Dict]:
+        """Get the stored meeting-level vectors for a meeting"""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM meeting_centroids WHERE meeting_id = ?', (meeting_id,))
+        result = cursor.fetchone()
+        
+        conn.close()
+        
+        if result:
+            data = dict(result)
+            data['centroid'] = self._decode_embedding(data['centroid'])
+            data['mean_direction'] = self._decode_embedding(data['mean_direction'])
+            return data
+        return None
+    
+    def get_similar_meetings(self, meeting_id: int, top_k: int = 5) -> List[Dict]:
+        """Get the precomputed most similar transcribed meetings"""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT n.neighbor_id AS meeting_id, n.similarity, c.chunk_count AS match_count
+            FROM meeting_neighbors n
+            JOIN meetings m ON n.neighbor_id = m.id
+            JOIN meeting_centroids c ON n.neighbor_id = c.meeting_id
+            WHERE n.meeting_id = ? AND m.status = 'transcribed'
+            ORDER BY n.similarity DESC
+            LIMIT ?
+        ''', (meeting_id, top_k))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return [dict(row) for row in results]
+    
+    def save_theme_embeddings(self, model: str, themes: List[str], embeddings: List):
+        """Replace the stored theme vectors and rescore every meeting against them"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM theme_embeddings')
+        cursor.executemany('''
+            INSERT INTO theme_embeddings (theme, model, embedding, position)
+            VALUES (?, ?, ?, ?)
+        ''', [(theme, model, self._encode_embedding(embedding), position)
+              for position, (theme, embedding) in enumerate(zip(themes, embeddings))])
+        
+        # Backfill the materialized scores, one meeting at a time
+        cursor.execute('DELETE FROM meeting_theme_chunks')
+        cursor.execute('SELECT DISTINCT meeting_id FROM embeddings WHERE model = ?', (model,))
+        for (meeting_id,) in cursor.fetchall():
+            cursor.execute('''
+                SELECT text_chunk, embedding, chunk_index, chunk_type FROM embeddings
+                WHERE meeting_id = ? AND model = ?
+            ''', (meeting_id, model))
+            embeddings_data = [
+                {'meeting_id': meeting_id, 'text': text, 'embedding': self._decode_embedding(embedding),
+                 'chunk_index': chunk_index, 'chunk_type': chunk_type}
+                for text, embedding, chunk_index, chunk_type in cursor.fetchall()
+            ]
+            self._save_meeting_theme_chunks(cursor, meeting_id, embeddings_data, model)
+        
+        conn.commit()
+        conn.close()
+    
+    def get_theme_models(self) -> Dict[str, str]:
+        """Get the stored themes in order, mapped to the model that embedded them"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT theme, model FROM theme_embeddings ORDER BY position')
+        results = cursor.fetchall()
+        
+        conn.close()
+        
+        return dict(results)
+    
+    def get_top_theme_chunks(self, theme: str, limit: int = 15) -> List[Dict]:
+        """Get the best matching chunks for a theme across all transcribed meetings"""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT c.meeting_id, c.chunk_type, c.chunk_index, c.text, c.similarity, m.title
+            FROM meeting_theme_chunks c
+            JOIN meetings m ON c.meeting_id = m.id
+            WHERE c.theme = ? AND m.status = 'transcribed'
+            ORDER BY c.similarity DESC, c.id
+            LIMIT ?
+        ''', (theme, limit))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        chunks = []
+        for row in results:
+            data = dict(row)
+            data['metadata'] = {'title': data.pop('title')}
+            chunks.append(data)
+        
+        return chunks
+    
+    def get_query_embedding(self, model: str, query: str) -> Optional[np.ndarray]:
+        """Get a cached query embedding, marking it as recently used"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT embedding FROM query_embeddings WHERE model = ? AND query = ?
+        ''', (model, query))
+        result = cursor.fetchone()
+        
+        if result:
+            cursor.execute('''
+                UPDATE query_embeddings SET last_used_at = CURRENT_TIMESTAMP
+                WHERE model = ? AND query = ?
+            ''', (model, query))
+            conn.commit()
+        
+        conn.close()
+        
+        if result:
+            return self._decode_embedding(result[0])
+        return None
+    
+    def save_query_embedding(self, model: str, query: str, embedding, max_entries: int = None):
+        """Cache a query embedding, evicting the least recently used entries beyond max_entries"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO query_embeddings (model, query, embedding)
+            VALUES (?, ?, ?)
+        ''', (model, query, self._encode_embedding(embedding)))
+        
+        if max_entries is not None:
+            cursor.execute('''
+                DELETE FROM query_embeddings WHERE rowid IN (
+                    SELECT rowid FROM query_embeddings
+                    ORDER BY last_used_at DESC, rowid DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_chunk_embeddings(self, model: str, content_hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Get stored chunk embeddings by content hash"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        found = {}
+        unique_hashes = list(dict.fromkeys(content_hashes))
+        for start in range(0, len(unique_hashes), 500):  # Stay under SQLite's parameter limit
+            batch = unique_hashes[start:start + 500]
+            cursor.execute(f'''
+                SELECT content_hash, embedding FROM chunk_embeddings
+                WHERE model = ? AND content_hash IN ({','.join('?' * len(batch))})
+            ''', [model] + batch)
+            for content_hash, embedding in cursor.fetchall():
+                found[content_hash] = self._decode_embedding(embedding)
+        
+        conn.close()
+        
+        return found
+    
+    def save_chunk_embeddings(self, model: str, embeddings: Dict[str, List[float]]):
+        """Store chunk embeddings by content hash"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.executemany('''
+            INSERT OR IGNORE INTO chunk_embeddings (model, content_hash, embedding)
+            VALUES (?, ?, ?)
+        ''', [(model, content_hash, self._encode_embedding(embedding))
+              for content_hash, embedding in embeddings.items()])
+        
+        conn.commit()
+        conn.close()
+    
+    @staticmethod
+    def _fts_query(search_query: str) -> str:
+        """Turn free text into an FTS5 query matching every word as a prefix"""
+        return ' '.join(f'"{term}"*' for term in re.findall(r'\w+', search_query))
+    
+    def search_meetings_by_text(self, search_query: str, limit: int = 50) -> List[Dict]:
+        """Full-text search as fallback, ranked by BM25 with a matching snippet"""
+        fts_query = self._fts_query(search_query)
+        if not fts_query:
+            return []
+        
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # Title matches weigh most, then summaries, then transcripts
+        cursor.execute('''
+            SELECT m.*, s.transcript AS full_text, s.summary,
+                   snippet(meeting_search, -1, '', '', '...', 24) AS snippet,
+                   bm25(meeting_search, 10.0, 1.0, 3.0) AS rank
+            FROM meeting_search s
+            JOIN meetings m ON m.id = s.rowid
+            WHERE meeting_search MATCH ? AND m.status = 'transcribed'
+            ORDER BY rank
+            LIMIT ?
+        ''', (fts_query, limit))
         
         results = cursor.fetchall()
         conn.close()
@@ -498,7 +1967,7 @@ class DatabaseManager:
     def save_translation(self, meeting_id: int, content_type: str, original_text: str, 
                         translation_data: Dict) -> int:
         """Save a translation for a meeting"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -527,7 +1996,7 @@ class DatabaseManager:
     
     def get_meeting_translations(self, meeting_id: int, target_language: str = None) -> List[Dict]:
         """Get translations for a meeting, optionally filtered by language"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -551,7 +2020,7 @@ class DatabaseManager:
     
     def get_translation_by_id(self, translation_id: int) -> Optional[Dict]:
         """Get a specific translation by ID"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -568,10 +2037,16 @@ class DatabaseManager:
     
     def get_available_translation_languages(self, meeting_id: int) -> List[Dict]:
         """Get list of languages that a meeting has been translated to"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
+        results = self._translation_languages(cursor, meeting_id)
+        conn.close()
+        
+        return results
+    
+    def _translation_languages(self, cursor, meeting_id: int) -> List[Dict]:
         cursor.execute('''
             SELECT DISTINCT target_language, language_name, language_code, native_name,
                    COUNT(*) as content_count
@@ -580,15 +2055,19 @@ class DatabaseManager:
             GROUP BY target_language, language_name, language_code, native_name
             ORDER BY language_name
         ''', (meeting_id,))
-        
-        results = cursor.fetchall()
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def delete_translation(self, translation_id: int):
+        """Delete a single translation"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM translations WHERE id = ?', (translation_id,))
+        conn.commit()
         conn.close()
-        
-        return [dict(row) for row in results]
     
     def delete_meeting_translations(self, meeting_id: int, target_language: str = None):
         """Delete translations for a meeting, optionally filtered by language"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         if target_language:
@@ -606,7 +2085,7 @@ class DatabaseManager:
     
     def search_translations(self, search_query: str, target_language: str = None) -> List[Dict]:
         """Search within translated content"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -0,0 +1,98 @@
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+from database import DatabaseManager
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache for query embeddings: an in-process LRU backed by a SQLite table"""
+
+    def __init__(self, db: DatabaseManager, max_memory_entries: int = 1024, max_disk_entries: int = 50000):
+        self.db = db
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Collapse case and whitespace so trivially different queries share an entry"""
+        return re.sub(r'\s+', ' ', query.strip().lower())
+
+    def get(self, model: str, query: str):
+        """Return the cached embedding for a query, or None on a miss"""
+        key = (model, self.normalize_query(query))
+
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return embedding
+
+        embedding = self.db.get_query_embedding(*key)
+        with self._lock:
+            if embedding is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, embedding)
+        return embedding
+
+    def put(self, model: str, query: str, embedding):
+        """Store a query embedding in both tiers"""
+        key = (model, self.normalize_query(query))
+        with self._lock:
+            self._remember(key, embedding)
+        self.db.save_query_embedding(*key, embedding, max_entries=self.max_disk_entries)
+
+    def _remember(self, key, embedding):
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """Hit and miss counters for both tiers"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_entries': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+
+class ChunkEmbeddingStore:
+    """Content-addressed store of chunk embeddings keyed by (model, sha256 of the text)"""
+
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        """Return the stored embeddings for whichever texts have been embedded before"""
+        hashes = {text: self.content_hash(text) for text in texts}
+        stored = self.db.get_chunk_embeddings(model, list(hashes.values()))
+        found = {text: stored[content_hash] for text, content_hash in hashes.items() if content_hash in stored}
+        self.hits += len(found)
+        self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]):
+        """Store freshly generated embeddings"""
+        self.db.save_chunk_embeddings(model, {
+            self.content_hash(text): embedding for text, embedding in zip(texts, embeddings)
+        })
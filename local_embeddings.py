@@ -0,0 +1,100 @@
+import io
+import hashlib
+import numpy as np
+import scipy.sparse as sp
+from typing import List, Optional
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+
+class LocalEmbeddingProvider:
+    """Offline CPU embeddings: TF-IDF weighted hashed word and bigram counts projected with a truncated SVD
+
+    The projection is fitted on our own meetings, so embedding a query needs no API call. Every fit
+    gets its own model name, which keeps its vectors apart from OpenAI's and from earlier fits.
+    """
+
+    MODEL_PREFIX = 'local-hashing-svd'
+
+    def __init__(self, n_components: int = 256, n_features: int = 2 ** 15):
+        self.n_components = n_components
+        self.vectorizer = HashingVectorizer(n_features=n_features, ngram_range=(1, 2),
+                                            alternate_sign=False, norm=None, dtype=np.float32)
+        self.idf: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self._projection: Optional[np.ndarray] = None  # components.T, contiguous for fast products
+        self.document_count = 0
+        self.model_name: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.components is not None
+
+    def _weighted_counts(self, texts: List[str]) -> sp.csr_matrix:
+        """Sublinear term frequencies scaled by idf"""
+        counts = self.vectorizer.transform(texts)
+        counts.data = (1 + np.log(counts.data)) * self.idf[counts.indices]
+        return counts
+
+    def fit(self, texts: List[str]) -> 'LocalEmbeddingProvider':
+        """Fit the idf weights and the SVD projection on a corpus of chunk texts"""
+        counts = self.vectorizer.transform(texts)
+        doc_freqs = np.bincount(counts.indices, minlength=self.vectorizer.n_features)
+        self.idf = (np.log((1 + len(texts)) / (1 + doc_freqs)) + 1).astype(np.float32)
+
+        # A tiny corpus cannot support more components than it has documents
+        n_components = max(1, min(self.n_components, len(texts) - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=0)
+        svd.fit(normalize(self._weighted_counts(texts)))
+        self.components = svd.components_.astype(np.float32)
+
+        # Keep the precision the model is stored at, so the fitting worker embeds like every worker that loads it
+        stored = self.from_bytes(self.to_bytes(), len(texts))
+        self.idf, self.components, self._projection = stored.idf, stored.components, stored._projection
+        self.document_count = stored.document_count
+        self.model_name = stored.model_name
+        return self
+
+    def _version_name(self) -> str:
+        digest = hashlib.sha1(self.idf.tobytes() + self.components.tobytes()).hexdigest()[:12]
+        return f"{self.MODEL_PREFIX}-{len(self.components)}-{digest}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Unit-length embeddings for the texts (all zero for text with no known terms)"""
+        if not self.ready:
+            raise Exception("Local embedding model has not been fitted")
+        # Row scaling does not change the direction, so only the projected vectors are normalized
+        vectors = np.asarray(self._weighted_counts(texts) @ self._projection, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, idf=self.idf, components=self.components.astype(np.float16))
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, state: bytes, document_count: int = 0) -> 'LocalEmbeddingProvider':
+        arrays = np.load(io.BytesIO(state))
+        provider = cls(n_components=len(arrays['components']), n_features=len(arrays['idf']))
+        provider.idf = arrays['idf']
+        provider.components = arrays['components'].astype(np.float32)
+        provider._projection = np.ascontiguousarray(provider.components.T)
+        provider.document_count = document_count
+        provider.model_name = provider._version_name()
+        return provider
+
+    @classmethod
+    def load(cls, db, name: str) -> Optional['LocalEmbeddingProvider']:
+        """A fitted model stored in the database, or None if it no longer exists"""
+        stored = db.get_embedding_model(name)
+        if stored is None:
+            return None
+        provider = cls.from_bytes(stored['state'], stored['document_count'])
+        provider.model_name = stored['name']
+        return provider
+
+    def save(self, db):
+        db.save_embedding_model(self.model_name, self.to_bytes(), self.document_count)
@@ -1,15 +1,59 @@
 import openai
 import numpy as np
 import json
-from typing import Dict, List, Tuple, Optional
-from sklearn.metrics.pairwise import cosine_similarity
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional, Union
 import re
+from vector_index import VectorIndex
+from local_embeddings import LocalEmbeddingProvider
+from shard_search import ShardedIndex
+
+try:
+    import tiktoken
+except ImportError:  # Optional: token counts fall back to a character-based estimate
+    tiktoken = None
 
 class SemanticSearchEngine:
-    def __init__(self, api_key: str):
-        self.client = openai.OpenAI(api_key=api_key)
-        self.embedding_model = "text-embedding-3-small"  # Latest OpenAI embedding model
+    DEFAULT_THEMES = [
+        "action items and follow-ups",
+        "key decisions and outcomes", 
+        "challenges and problems discussed",
+        "project updates and status",
+        "team collaboration and communication"
+    ]
+    THEME_SIMILARITY_THRESHOLD = 0.6
+    THEME_TOP_CHUNKS = 15  # Chunks considered per theme
+    THEME_TOP_MEETINGS = 8  # Meetings listed per theme
+    
+    # Embeddings API request limits
+    MAX_BATCH_ITEMS = 2048  # Inputs per request
+    MAX_BATCH_TOKENS = 250000  # Tokens per request, kept under the 300k API limit
+    MAX_INPUT_TOKENS = 8191  # Tokens per input
+    EMBEDDING_WORKERS = 4  # Concurrent requests
+    EMBEDDING_RETRIES = 3  # Extra attempts for failed batches
+    EMBEDDING_RETRY_DELAY = 1.0  # Seconds before the first retry, doubled after each round
+    
+    def __init__(self, api_key: str, query_cache=None, chunk_store=None, provider: str = 'openai',
+                 local_provider: Optional[LocalEmbeddingProvider] = None):
+        self.client = openai.OpenAI(api_key=api_key) if api_key else None
+        self.openai_model = "text-embedding-3-small"  # Latest OpenAI embedding model
         self.chunk_size = 1000  # Characters per chunk for better granularity
+        self.query_cache = query_cache  # Optional QueryEmbeddingCache shared across requests
+        self.chunk_store = chunk_store  # Optional ChunkEmbeddingStore so unchanged chunks are free
+        self.provider = provider  # 'openai' or 'local'
+        self.local_provider = local_provider  # Fitted local model: the 'local' provider, or the fallback
+        
+        # Name the stored vectors are versioned under
+        if provider == 'local':
+            self.embedding_model = local_provider.model_name if local_provider else LocalEmbeddingProvider.MODEL_PREFIX
+        else:
+            self.embedding_model = self.openai_model
+    
+    @property
+    def local_fallback_available(self) -> bool:
+        """Whether a local model can stand in when the OpenAI API fails"""
+        return self.provider != 'local' and self.local_provider is not None and self.local_provider.ready
         
     def chunk_text(self, text: str, chunk_size: int = None) -> List[str]:
         """Split text into overlapping chunks for better semantic coverage"""
@@ -39,25 +83,148 @@ class SemanticSearchEngine:
             
         return chunks
     
+    def _token_encoder(self):
+        if tiktoken is None:
+            return None
+        if not hasattr(self, '_encoder'):
+            try:
+                self._encoder = tiktoken.encoding_for_model(self.openai_model)
+            except Exception:
+                self._encoder = None
+        return self._encoder
+    
+    def _prepare_input(self, text: str) -> Tuple[str, int]:
+        """Return the text truncated to the per-input token limit, and its token count"""
+        encoder = self._token_encoder()
+        if encoder is not None:
+            tokens = encoder.encode(text)
+            if len(tokens) > self.MAX_INPUT_TOKENS:
+                tokens = tokens[:self.MAX_INPUT_TOKENS]
+                text = encoder.decode(tokens)
+            return text, len(tokens)
+        
+        # Without a tokenizer, assume a conservative 3 characters per token
+        max_chars = self.MAX_INPUT_TOKENS * 3
+        if len(text) > max_chars:
+            text = text[:max_chars]
+        return text, len(text) // 3 + 1
+    
+    def _batch_inputs(self, token_counts: List[int]) -> List[List[int]]:
+        """Group input positions into batches within the item and token limits"""
+        batches = []
+        current = []
+        current_tokens = 0
+        for i, tokens in enumerate(token_counts):
+            if current and (len(current) >= self.MAX_BATCH_ITEMS or
+                            current_tokens + tokens > self.MAX_BATCH_TOKENS):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Send one embeddings request"""
+        if self.client is None:
+            raise Exception("OpenAI API key not configured")
+        response = self.client.embeddings.create(
+            model=self.openai_model,
+            input=texts,
+            encoding_format="float"
+        )
+        return [item.embedding for item in response.data]
+    
+    def embed_locally(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed texts in-process with the local model"""
+        if self.local_provider is None or not self.local_provider.ready:
+            raise Exception("Local embedding model has not been fitted")
+        return list(self.local_provider.embed(texts))
+    
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts using OpenAI API"""
+        """Generate embeddings for a list of texts using OpenAI API (or the local model)"""
+        if self.provider == 'local':
+            return self.embed_locally(texts)
+        
         try:
-            # OpenAI embeddings API can handle multiple texts at once
-            response = self.client.embeddings.create(
-                model=self.embedding_model,
-                input=texts,
-                encoding_format="float"
-            )
+            prepared = [self._prepare_input(text) for text in texts]
+            inputs = [text for text, _ in prepared]
+            batches = self._batch_inputs([tokens for _, tokens in prepared])
+            
+            embeddings = [None] * len(texts)
+            pending = batches
+            error = None
+            
+            for attempt in range(self.EMBEDDING_RETRIES + 1):
+                if attempt:
+                    time.sleep(self.EMBEDDING_RETRY_DELAY * 2 ** (attempt - 1))
+                
+                failed = []
+                with ThreadPoolExecutor(max_workers=max(1, min(self.EMBEDDING_WORKERS, len(pending)))) as executor:
+                    futures = [
+                        (batch, executor.submit(self._embed_batch, [inputs[i] for i in batch]))
+                        for batch in pending
+                    ]
+                    for batch, future in futures:
+                        try:
+                            for i, embedding in zip(batch, future.result()):
+                                embeddings[i] = embedding
+                        except Exception as e:
+                            error = e
+                            failed.append(batch)
+                
+                if not failed:
+                    return embeddings
+                pending = failed
             
-            embeddings = [item.embedding for item in response.data]
-            return embeddings
+            raise error
             
         except Exception as e:
             raise Exception(f"Error generating embeddings: {str(e)}")
     
-    def process_meeting_for_search(self, meeting_id: int, transcription_text: str, 
-                                 meeting_title: str = "", summary: str = "") -> List[Dict]:
-        """Process a meeting to create searchable chunks with embeddings"""
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a search query, skipping the API when the query is cached"""
+        return self.embed_queries([query])[0]
+    
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed several queries with at most one API call for the uncached ones"""
+        if self.provider == 'local':
+            return self.embed_locally(queries)  # Cheaper than a cache lookup
+        
+        embeddings = [None] * len(queries)
+        if self.query_cache is not None:
+            for i, query in enumerate(queries):
+                embeddings[i] = self.query_cache.get(self.embedding_model, query)
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            generated = self.generate_embeddings([queries[i] for i in missing])
+            for i, embedding in zip(missing, generated):
+                embeddings[i] = embedding
+                if self.query_cache is not None:
+                    self.query_cache.put(self.embedding_model, queries[i], embedding)
+        
+        return embeddings
+    
+    def embed_chunks(self, texts: List[str]) -> List[List[float]]:
+        """Embed chunk texts, calling the API only for text the chunk store has not seen"""
+        if self.chunk_store is None or self.provider == 'local':
+            return self.generate_embeddings(texts)
+        
+        stored = self.chunk_store.get_many(self.embedding_model, texts)
+        missing = list(dict.fromkeys(text for text in texts if text not in stored))
+        if missing:
+            generated = self.generate_embeddings(missing)
+            self.chunk_store.put_many(self.embedding_model, missing, generated)
+            stored.update(zip(missing, generated))
+        
+        return [stored[text] for text in texts]
+    
+    def build_search_chunks(self, meeting_id: int, transcription_text: str,
+                            meeting_title: str = "", summary: str = "") -> List[Dict]:
+        """Split a meeting into searchable chunks, each with the text to embed"""
         
         # Create enhanced text combining different sources
         enhanced_texts = []
@@ -87,11 +254,18 @@ class SemanticSearchEngine:
                 'metadata': {'title': meeting_title, 'type': 'summary'}
             })
         
+        return enhanced_texts
+    
+    def process_meeting_for_search(self, meeting_id: int, transcription_text: str, 
+                                 meeting_title: str = "", summary: str = "") -> List[Dict]:
+        """Process a meeting to create searchable chunks with embeddings"""
+        enhanced_texts = self.build_search_chunks(meeting_id, transcription_text, meeting_title, summary)
+        
         # Generate embeddings for all enhanced texts
         texts_for_embedding = [item['enhanced_text'] for item in enhanced_texts]
         
         try:
-            embeddings = self.generate_embeddings(texts_for_embedding)
+            embeddings = self.embed_chunks(texts_for_embedding)
             
             # Combine text data with embeddings
             for i, item in enumerate(enhanced_texts):
@@ -103,42 +277,151 @@ class SemanticSearchEngine:
             print(f"Warning: Could not generate embeddings for meeting {meeting_id}: {e}")
             return []
     
-    def search_meetings(self, query: str, all_embeddings: List[Dict], 
-                       top_k: int = 10, similarity_threshold: float = 0.7) -> List[Dict]:
-        """Search across all meetings using semantic similarity"""
+    def embed_meeting(self, meeting_id: int, transcription_text: str, meeting_title: str = "",
+                      summary: str = "") -> Dict[str, List[Dict]]:
+        """Embed a meeting's chunks, plus local-model vectors when that is the fallback
+        
+        Returns the chunks with their vectors by model. If the API fails but the local fallback
+        works, only the local vectors are returned.
+        """
+        chunks = self.build_search_chunks(meeting_id, transcription_text, meeting_title, summary)
+        texts = [item['enhanced_text'] for item in chunks]
+        if not texts:
+            return {}
         
+        embedded = {}
         try:
+            embeddings = self.embed_chunks(texts)
+            embedded[self.embedding_model] = [dict(item, embedding=embedding)
+                                              for item, embedding in zip(chunks, embeddings)]
+        except Exception as e:
+            if not self.local_fallback_available:
+                raise
+            print(f"Warning: Could not generate embeddings for meeting {meeting_id}, storing local ones only: {e}")
+        
+        if self.local_fallback_available:
+            vectors = self.local_provider.embed(texts)
+            embedded[self.local_provider.model_name] = [dict(item, embedding=vector)
+                                                        for item, vector in zip(chunks, vectors)]
+        
+        return embedded
+    
+    def store_meeting_embeddings(self, db, meeting_id: int, embedded: Dict[str, List[Dict]]) -> int:
+        """Store the output of embed_meeting in one transaction and return the number of chunks"""
+        with db.transaction():
+            for model, embeddings_data in embedded.items():
+                db.save_embeddings(meeting_id, embeddings_data, model=model,
+                                   update_derived=model == self.embedding_model)
+        return max((len(embeddings_data) for embeddings_data in embedded.values()), default=0)
+    
+    def save_meeting_embeddings(self, db, meeting_id: int, transcription_text: str,
+                                meeting_title: str = "", summary: str = "") -> int:
+        """Embed a meeting and store its vectors, returning the number of chunks stored"""
+        embedded = self.embed_meeting(meeting_id, transcription_text, meeting_title, summary)
+        return self.store_meeting_embeddings(db, meeting_id, embedded)
+    
+    def fit_local_embeddings(self, db) -> Optional[LocalEmbeddingProvider]:
+        """Fit a new local model on every transcribed meeting and store its vectors for all of them
+        
+        Vectors of earlier local fits are deleted. Returns None when there is nothing to fit on.
+        """
+        meetings = db.get_searchable_meetings()
+        chunks = {
+            meeting['id']: self.build_search_chunks(meeting['id'], meeting['full_text'],
+                                                    meeting['title'], meeting['summary'])
+            for meeting in meetings
+        }
+        texts = [item['enhanced_text'] for meeting_chunks in chunks.values() for item in meeting_chunks]
+        if not texts:
+            return None
+        
+        provider = LocalEmbeddingProvider().fit(texts)
+        provider.save(db)
+        primary = self.provider == 'local'
+        for meeting_id, meeting_chunks in chunks.items():
+            vectors = provider.embed([item['enhanced_text'] for item in meeting_chunks])
+            db.save_embeddings(meeting_id, [dict(item, embedding=vector)
+                                            for item, vector in zip(meeting_chunks, vectors)],
+                               model=provider.model_name, update_derived=primary)
+        db.delete_embedding_models(LocalEmbeddingProvider.MODEL_PREFIX, keep=provider.model_name)
+        
+        self.local_provider = provider
+        if primary:
+            self.embedding_model = provider.model_name
+        return provider
+    
+    @staticmethod
+    def build_index(all_embeddings: Union[List[Dict], VectorIndex]) -> VectorIndex:
+        """Return a vector index for the given embeddings, reusing it (or a sharded index) if one is passed in"""
+        if isinstance(all_embeddings, (VectorIndex, ShardedIndex)):
+            return all_embeddings
+        return VectorIndex(all_embeddings)
+    
+    def search_meetings(self, query: str, all_embeddings: Union[List[Dict], VectorIndex], 
+                       top_k: int = 10, similarity_threshold: float = 0.7,
+                       exact: bool = False, hybrid: bool = False,
+                       fallback_embeddings: Union[List[Dict], VectorIndex] = None,
+                       filters: Optional[Dict] = None) -> List[Dict]:
+        """Search across all meetings using semantic similarity
+        
+        filters (chunk_types, date_from, date_to) restrict the chunks before they are scored.
+        With hybrid=True the vector ranking is fused with a BM25 keyword ranking (reciprocal
+        rank fusion), so exact names and ticket ids rank even when their cosine score is low.
+        If the query cannot be embedded and fallback_embeddings holds the local model's vectors,
+        the search runs against those instead.
+        """
+        
+        try:
+            index = self.build_index(all_embeddings)
+            
             # Generate embedding for the search query
-            query_embedding = self.generate_embeddings([query])[0]
+            try:
+                query_embedding = self.embed_query(query)
+            except Exception:
+                if fallback_embeddings is None or not self.local_fallback_available:
+                    raise
+                index = self.build_index(fallback_embeddings)
+                query_embedding = self.local_provider.embed([query])[0]
             
-            # Calculate similarities
-            results = []
-            for item in all_embeddings:
-                # Calculate cosine similarity
-                similarity = cosine_similarity(
-                    [query_embedding], 
-                    [item['embedding']]
-                )[0][0]
-                
-                if similarity >= similarity_threshold:
-                    results.append({
-                        'meeting_id': item['meeting_id'],
-                        'chunk_type': item['chunk_type'],
-                        'chunk_index': item['chunk_index'],
-                        'text': item['text'],
-                        'similarity': float(similarity),
-                        'metadata': item['metadata']
-                    })
+            if hybrid:
+                return index.hybrid_search(query_embedding, query, top_k=top_k,
+                                           threshold=similarity_threshold, exact=exact, filters=filters)
+            
+            # Score the chunks with one matrix-vector product and keep the top_k
+            # (only the probed lists when the index has a trained ANN, unless exact is requested)
+            return index.search(query_embedding, top_k=top_k, threshold=similarity_threshold,
+                                exact=exact, filters=filters)
+            
+        except Exception as e:
+            raise Exception(f"Error during semantic search: {str(e)}")
+    
+    def search_many(self, queries: List[str], all_embeddings: Union[List[Dict], VectorIndex],
+                    top_k: int = 10, similarity_threshold: float = 0.7, exact: bool = False,
+                    fallback_embeddings: Union[List[Dict], VectorIndex] = None,
+                    filters: Optional[Dict] = None) -> List[List[Dict]]:
+        """Search for several queries at once: one embedding call and one matrix-matrix product
+        
+        Returns the top_k results of each query, in the order of the queries.
+        """
+        try:
+            index = self.build_index(all_embeddings)
+            
+            try:
+                query_embeddings = self.embed_queries(queries)
+            except Exception:
+                if fallback_embeddings is None or not self.local_fallback_available:
+                    raise
+                index = self.build_index(fallback_embeddings)
+                query_embeddings = self.local_provider.embed(queries)
             
-            # Sort by similarity (highest first) and return top_k
-            results.sort(key=lambda x: x['similarity'], reverse=True)
-            return results[:top_k]
+            return index.search_many(query_embeddings, top_k=top_k, threshold=similarity_threshold,
+                                     exact=exact, filters=filters)
             
         except Exception as e:
             raise Exception(f"Error during semantic search: {str(e)}")
     
     def find_similar_meetings(self, meeting_id: int, meeting_embeddings: List[Dict],
-                            all_embeddings: List[Dict], top_k: int = 5) -> List[Dict]:
+                            all_embeddings: Union[List[Dict], VectorIndex], top_k: int = 5) -> List[Dict]:
         """Find meetings similar to a given meeting"""
         
         # Get embeddings for the target meeting
@@ -151,81 +434,37 @@ class SemanticSearchEngine:
         target_vectors = [item['embedding'] for item in target_embeddings]
         avg_target_embedding = np.mean(target_vectors, axis=0)
         
-        # Find similar meetings
-        meeting_similarities = {}
-        for item in all_embeddings:
-            if item['meeting_id'] != meeting_id:  # Exclude the target meeting itself
-                similarity = cosine_similarity(
-                    [avg_target_embedding], 
-                    [item['embedding']]
-                )[0][0]
-                
-                if item['meeting_id'] not in meeting_similarities:
-                    meeting_similarities[item['meeting_id']] = []
-                meeting_similarities[item['meeting_id']].append(similarity)
-        
-        # Calculate average similarity for each meeting
-        meeting_scores = []
-        for mid, similarities in meeting_similarities.items():
-            avg_similarity = np.mean(similarities)
-            meeting_scores.append({
-                'meeting_id': mid,
-                'similarity': float(avg_similarity),
-                'match_count': len(similarities)
-            })
-        
-        # Sort by similarity and return top results
-        meeting_scores.sort(key=lambda x: x['similarity'], reverse=True)
+        # Average chunk similarity per meeting, excluding the target meeting itself
+        index = self.build_index(all_embeddings)
+        meeting_scores = index.meeting_scores(avg_target_embedding, exclude_meeting_id=meeting_id)
         return meeting_scores[:top_k]
     
-    def discover_cross_meeting_insights(self, all_embeddings: List[Dict], 
+    def discover_cross_meeting_insights(self, all_embeddings: Union[List[Dict], VectorIndex], 
                                        themes: List[str] = None) -> Dict[str, List[Dict]]:
         """Discover insights across meetings for specific themes"""
         
         if themes is None:
-            themes = [
-                "action items and follow-ups",
-                "key decisions and outcomes", 
-                "challenges and problems discussed",
-                "project updates and status",
-                "team collaboration and communication"
-            ]
+            themes = self.DEFAULT_THEMES
         
         insights = {}
+        index = self.build_index(all_embeddings)
+        
+        try:
+            # Embed all themes in a single request
+            theme_embeddings = self.embed_queries(themes)
+        except Exception as e:
+            print(f"Warning: Could not embed insight themes: {e}")
+            return {theme: [] for theme in themes}
         
-        for theme in themes:
+        for theme, theme_embedding in zip(themes, theme_embeddings):
             try:
                 # Search for each theme across all meetings
-                theme_results = self.search_meetings(
-                    theme, 
-                    all_embeddings, 
-                    top_k=15, 
-                    similarity_threshold=0.6
+                theme_results = index.search(
+                    theme_embedding, 
+                    top_k=self.THEME_TOP_CHUNKS, 
+                    threshold=self.THEME_SIMILARITY_THRESHOLD
                 )
-                
-                # Group by meeting and aggregate
-                meeting_groups = {}
-                for result in theme_results:
-                    mid = result['meeting_id']
-                    if mid not in meeting_groups:
-                        meeting_groups[mid] = {
-                            'meeting_id': mid,
-                            'total_similarity': 0,
-                            'relevant_chunks': [],
-                            'title': result['metadata'].get('title', 'Unknown Meeting')
-                        }
-                    
-                    meeting_groups[mid]['total_similarity'] += result['similarity']
-                    meeting_groups[mid]['relevant_chunks'].append({
-                        'text': result['text'][:200] + "..." if len(result['text']) > 200 else result['text'],
-                        'similarity': result['similarity'],
-                        'type': result['chunk_type']
-                    })
-                
-                # Sort and format results
-                theme_insights = list(meeting_groups.values())
-                theme_insights.sort(key=lambda x: x['total_similarity'], reverse=True)
-                insights[theme] = theme_insights[:8]  # Top 8 meetings per theme
+                insights[theme] = self._group_theme_results(theme_results)
                 
             except Exception as e:
                 print(f"Warning: Could not analyze theme '{theme}': {e}")
@@ -233,6 +472,54 @@ class SemanticSearchEngine:
         
         return insights
     
+    def _group_theme_results(self, theme_results: List[Dict]) -> List[Dict]:
+        """Group a theme's best chunks by meeting, ranked by total similarity"""
+        meeting_groups = {}
+        for result in theme_results:
+            mid = result['meeting_id']
+            if mid not in meeting_groups:
+                meeting_groups[mid] = {
+                    'meeting_id': mid,
+                    'total_similarity': 0,
+                    'relevant_chunks': [],
+                    'title': result['metadata'].get('title', 'Unknown Meeting')
+                }
+            
+            meeting_groups[mid]['total_similarity'] += result['similarity']
+            meeting_groups[mid]['relevant_chunks'].append({
+                'text': result['text'][:200] + "..." if len(result['text']) > 200 else result['text'],
+                'similarity': result['similarity'],
+                'type': result['chunk_type']
+            })
+        
+        # Sort and format results
+        theme_insights = list(meeting_groups.values())
+        theme_insights.sort(key=lambda x: x['total_similarity'], reverse=True)
+        return theme_insights[:self.THEME_TOP_MEETINGS]
+    
+    def ensure_theme_embeddings(self, db) -> bool:
+        """Embed and store the default themes if they are missing or from another model"""
+        stored = db.get_theme_models()
+        if list(stored) == self.DEFAULT_THEMES and set(stored.values()) == {self.embedding_model}:
+            return False
+        
+        theme_embeddings = self.embed_queries(self.DEFAULT_THEMES)
+        db.save_theme_embeddings(self.embedding_model, self.DEFAULT_THEMES, theme_embeddings)
+        return True
+    
+    def get_materialized_insights(self, db) -> Dict[str, List[Dict]]:
+        """Cross-meeting insights for the default themes, read from the precomputed theme scores"""
+        try:
+            self.ensure_theme_embeddings(db)
+        except Exception as e:
+            print(f"Warning: Could not embed insight themes: {e}")
+            return {theme: [] for theme in self.DEFAULT_THEMES}
+        
+        return {
+            theme: self._group_theme_results(db.get_top_theme_chunks(theme, limit=self.THEME_TOP_CHUNKS))
+            for theme in self.DEFAULT_THEMES
+        }
+    
     def generate_meeting_recommendations(self, meeting_id: int, meeting_title: str,
                                        similar_meetings: List[Dict], 
                                        cross_insights: Dict) -> Dict:
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Sharded search: the embedding index partitioned by meeting id across worker processes
+
+Meetings go to shard meeting_id % n_shards. Each shard is served by a ShardServer over a
+multiprocessing.connection socket (TCP, so shards can live on other machines sharing the
+database); ShardedIndex queries all shards in parallel and merges their top results.
+
+Requests are pickled, so whoever can connect can run code in the shard: every shard and the app
+must share a secret SEARCH_SHARD_AUTHKEY, and shards should only listen on a private network.
+
+Usage: SEARCH_SHARD_AUTHKEY=... python shard_search.py --shard 0 --shards 4 --port 6100 [--host 10.0.0.5]
+       [--db meeting_assistant.db]
+"""
+
+import argparse
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener, AuthenticationError
+from typing import Dict, List, Optional, Tuple
+from database import DatabaseManager, DEFAULT_EMBEDDING_MODEL
+from vector_index import VectorIndex
+
+
+def parse_address(address: str):
+    """'host:port' as a TCP address, anything else as a Unix socket path"""
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return host, int(port)
+    return address
+
+
+class ShardServer:
+    """Serves one shard of the embedding index, kept in sync with the database before every request"""
+
+    def __init__(self, db_path: str, shard_id: int, n_shards: int, model: str = DEFAULT_EMBEDDING_MODEL,
+                 **index_options):
+        self.db = DatabaseManager(db_path)
+        self.shard = (shard_id, n_shards)
+        self.model = model
+        generation = self.db.get_embedding_generation()
+        self.index = VectorIndex(self.db.get_all_embeddings(model, shard=self.shard), generation=generation,
+                                 full_vectors=lambda keys: self.db.get_chunk_vectors(keys, model),
+                                 **index_options)
+        self._sync_lock = threading.Lock()
+
+    def handle(self, request: Dict) -> Dict:
+        with self._sync_lock:
+            self.db.sync_embedding_index(self.index, self.model, shard=self.shard)
+
+        op = request['op']
+        if op == 'search':
+            return {'results': self.index.search_many(request['queries'], **request['options'])}
+        if op == 'hybrid':
+            return {'rankings': self.index.hybrid_rankings(request['query'], request['text'], **request['options'])}
+        if op == 'meeting_scores':
+            return {'scores': self.index.meeting_scores(request['query'], request.get('exclude_meeting_id'))}
+        if op == 'stats':
+            return {'chunks': len(self.index), 'generation': self.index.generation}
+        raise ValueError(f"Unknown operation: {op}")
+
+    def serve(self, address, authkey: bytes, ready=None):
+        """Accept clients forever, one thread per connection; ready receives the bound address"""
+        if not authkey:
+            raise ValueError("A shard needs an authkey: clients can otherwise run arbitrary code in it")
+        with Listener(address, authkey=authkey) as listener:
+            if ready is not None:
+                ready.send(listener.address)
+                ready.close()
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, OSError) as e:
+                    print(f"Warning: Rejected shard client: {e}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = self.handle(request)
+                except Exception as e:
+                    reply = {'error': str(e)}
+                conn.send(reply)
+
+
+def _run_shard(db_path: str, shard_id: int, n_shards: int, address, authkey: bytes, model: str,
+               index_options: Dict, ready):
+    ShardServer(db_path, shard_id, n_shards, model, **index_options).serve(address, authkey, ready)
+
+
+def start_local_shards(db_path: str, n_shards: int, authkey: bytes, model: str = DEFAULT_EMBEDDING_MODEL,
+                       host: str = '127.0.0.1', **index_options) -> Tuple[List[multiprocessing.Process], List]:
+    """Start one worker process per shard on this machine and return them with their addresses"""
+    processes, pipes = [], []
+    for shard_id in range(n_shards):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(
+            target=_run_shard, daemon=True,
+            args=(db_path, shard_id, n_shards, (host, 0), authkey, model, index_options, sender)
+        )
+        process.start()
+        processes.append(process)
+        pipes.append(receiver)
+    return processes, [receiver.recv() for receiver in pipes]
+
+
+class ShardedIndex:
+    """Client for a set of ShardServers, usable wherever a VectorIndex is searched
+
+    Queries go to every shard in parallel and the per-shard top results are merged, which gives
+    the single-process results (ties aside). For hybrid search each shard's BM25 statistics cover
+    only its own chunks, so keyword scores are close to, not identical with, the single index.
+    """
+
+    def __init__(self, addresses: List, authkey: bytes):
+        if not authkey:
+            raise ValueError("Search shards need an authkey")
+        self.addresses = [parse_address(a) if isinstance(a, str) else a for a in addresses]
+        self.authkey = authkey
+        self._connections: List = [None] * len(self.addresses)
+        self._locks = [threading.Lock() for _ in self.addresses]
+        self._pool = ThreadPoolExecutor(max_workers=len(self.addresses))
+
+    def _request(self, shard: int, request: Dict) -> Dict:
+        with self._locks[shard]:
+            for attempt in range(2):
+                try:
+                    if self._connections[shard] is None:
+                        self._connections[shard] = Client(self.addresses[shard], authkey=self.authkey)
+                    self._connections[shard].send(request)
+                    reply = self._connections[shard].recv()
+                    break
+                except (EOFError, OSError):
+                    # The worker restarted or dropped us; requests are read-only, so retry once
+                    self._connections[shard] = None
+                    if attempt:
+                        raise
+        if 'error' in reply:
+            raise Exception(f"Search shard {shard} failed: {reply['error']}")
+        return reply
+
+    def _scatter(self, request: Dict) -> List[Dict]:
+        return list(self._pool.map(lambda shard: self._request(shard, request), range(len(self.addresses))))
+
+    @staticmethod
+    def merge(result_lists: List[List[Dict]], top_k: Optional[int], score: str = 'similarity') -> List[Dict]:
+        """The top_k results of several ranked lists, by score"""
+        merged = sorted((result for results in result_lists for result in results),
+                        key=lambda r: (-r[score], r['meeting_id'], r['chunk_type'], r['chunk_index']))
+        return merged[:top_k]
+
+    def __len__(self) -> int:
+        return sum(reply['chunks'] for reply in self._scatter({'op': 'stats'}))
+
+    def search_many(self, query_vectors, top_k: int = 10, threshold: Optional[float] = None,
+                    exact: bool = False, filters: Optional[Dict] = None) -> List[List[Dict]]:
+        queries = [np.asarray(query_vector, dtype=np.float32) for query_vector in query_vectors]
+        options = {'top_k': top_k, 'threshold': threshold, 'exact': exact, 'filters': filters}
+        replies = self._scatter({'op': 'search', 'queries': queries, 'options': options})
+        return [self.merge([reply['results'][i] for reply in replies], top_k) for i in range(len(queries))]
+
+    def search(self, query_vector, top_k: int = 10, threshold: Optional[float] = None,
+               exact: bool = False, filters: Optional[Dict] = None) -> List[Dict]:
+        return self.search_many([query_vector], top_k, threshold, exact, filters)[0]
+
+    def hybrid_search(self, query_vector, query_text: str, top_k: int = 10,
+                      threshold: Optional[float] = None, exact: bool = False,
+                      depth: int = 100, rrf_k: int = 60, filters: Optional[Dict] = None) -> List[Dict]:
+        """Merge the shards' vector and BM25 rankings to depth, then fuse them like VectorIndex.hybrid_search"""
+        options = {'top_k': top_k, 'depth': depth, 'threshold': threshold, 'exact': exact, 'filters': filters}
+        replies = self._scatter({'op': 'hybrid', 'query': np.asarray(query_vector, dtype=np.float32),
+                                 'text': query_text, 'options': options})
+        vector_results = self.merge([reply['rankings'][0] for reply in replies], depth)
+        lexical_results = self.merge([reply['rankings'][1] for reply in replies], depth, score='lexical_score')
+        return VectorIndex.fuse_rankings(vector_results, lexical_results, top_k, rrf_k)
+
+    def meeting_scores(self, query_vector, exclude_meeting_id: int = None) -> List[Dict]:
+        """Every meeting lives on one shard, so the per-shard averages only need sorting"""
+        replies = self._scatter({'op': 'meeting_scores', 'query': np.asarray(query_vector, dtype=np.float32),
+                                 'exclude_meeting_id': exclude_meeting_id})
+        scores = [score for reply in replies for score in reply['scores']]
+        scores.sort(key=lambda x: x['similarity'], reverse=True)
+        return scores
+
+    def close(self):
+        for shard, conn in enumerate(self._connections):
+            if conn is not None:
+                conn.close()
+                self._connections[shard] = None
+        self._pool.shutdown(wait=False)
+
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Serve one shard of the meeting search index")
+    parser.add_argument('--shard', type=int, required=True, help="Shard number, from 0")
+    parser.add_argument('--shards', type=int, required=True, help="Total number of shards")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--db', default='meeting_assistant.db')
+    parser.add_argument('--model', default=Config.SEARCH_SHARD_MODEL)
+    args = parser.parse_args()
+    if not Config.SEARCH_SHARD_AUTHKEY:
+        parser.error("set SEARCH_SHARD_AUTHKEY to the secret shared with the app")
+
+    index_options = {'quantization': Config.INDEX_QUANTIZATION, 'dimensions': Config.INDEX_DIMENSIONS,
+                     'coarse_meetings': Config.COARSE_SEARCH_MEETINGS or None}
+    server = ShardServer(args.db, args.shard, args.shards, args.model, **index_options)
+    print(f"🔍 Serving shard {args.shard}/{args.shards} ({len(server.index)} chunks) on {args.host}:{args.port}")
+    server.serve((args.host, args.port), Config.SEARCH_SHARD_AUTHKEY)
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,7 @@ def test_database():
         print("✅ Database tests passed!")
         
         # Cleanup
+        db.close()
         os.remove('test_meeting_assistant.db')
         
     except Exception as e:
@@ -46,6 +47,318 @@ def test_database():
     
     return True
 
+def test_connection_manager():
+    """Test persistent per-thread connections and their pragmas"""
+    print("🔍 Testing connection manager...")
+    
+    try:
+        import threading
+        db = DatabaseManager('test_connections.db')
+        
+        # The same connection is reused by a thread, with the pragmas applied
+        conn = db._connect()
+        holder = conn._holder
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1
+        assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+        conn.close()
+        db.get_all_meetings()
+        assert db._connect()._holder is holder
+        
+        # Other threads and other DatabaseManagers of the same file
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db._connect()._holder))
+        thread.start()
+        thread.join()
+        assert other[0] is not holder
+        assert DatabaseManager('test_connections.db')._connect()._holder is holder
+        
+        # Uncommitted changes are rolled back once the outermost handle is released
+        outer = db._connect()
+        inner = db._connect()
+        inner.execute("INSERT INTO meetings (title, filename, file_path) VALUES ('Draft', 'a.wav', '/a.wav')")
+        inner.close()
+        assert outer.execute('SELECT COUNT(*) FROM meetings').fetchone()[0] == 1
+        outer.close()
+        assert db.get_all_meetings() == []
+        
+        # Rows come back as configured on each handle
+        meeting_id = db.create_meeting("Kept", "b.wav", "/b.wav")
+        assert db.get_meeting(meeting_id)['title'] == "Kept"
+        assert isinstance(db._connect().cursor().execute('SELECT id FROM meetings').fetchone(), tuple)
+        
+        print("✅ Connection manager tests passed!")
+        
+        # Cleanup
+        db.close()
+        os.remove('test_connections.db')
+        
+    except Exception as e:
+        print(f"❌ Connection manager tests failed: {e}")
+        return False
+    
+    return True
+
+def test_transactions():
+    """Test that a transaction block commits its writes together or not at all"""
+    print("🔍 Testing transactions...")
+    
+    try:
+        import database
+        
+        db = DatabaseManager('test_transactions.db')
+        meeting_id = db.create_meeting("Planning", "p.mp3", "/path/p.mp3")
+        db.save_transcription(meeting_id, "We planned the release.", [])
+        index = db.get_embedding_index()
+        generation = index.generation
+        embeddings = [{'text': f'chunk {i}', 'embedding': [1.0, float(i)], 'chunk_index': i} for i in range(3)]
+        
+        # A failure partway through leaves no summary, insights or embeddings, in the database or the index
+        try:
+            with db.transaction():
+                db.save_meeting_summary(meeting_id, "Release planned", [], [], [])
+                db.save_meeting_insights(meeting_id, {'effectiveness_score': 7})
+                db.save_embeddings(meeting_id, embeddings)
+                raise RuntimeError("analysis failed")
+        except RuntimeError:
+            pass
+        assert db.get_meeting_summary(meeting_id) is None
+        assert db.get_meeting_insights(meeting_id) is None
+        assert db.get_meeting_embeddings(meeting_id) == []
+        assert len(index) == 0 and index.generation == generation
+        
+        # On success everything is committed at once and the index is updated after the commit
+        with db.transaction():
+            db.save_meeting_summary(meeting_id, "Release planned", [], [], [])
+            with db.transaction():
+                db.save_meeting_insights(meeting_id, {'effectiveness_score': 7})
+            db.save_embeddings(meeting_id, embeddings)
+            assert len(index) == 0
+        assert db.get_meeting_summary(meeting_id)['summary'] == "Release planned"
+        assert db.get_meeting_insights(meeting_id)['effectiveness_score'] == 7
+        assert [e['chunk_index'] for e in db.get_meeting_embeddings(meeting_id)] == [0, 1, 2]
+        assert len(index) == 3 and index.generation == db.get_embedding_generation()
+        
+        print("✅ Transaction tests passed!")
+        
+        # Cleanup
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_transactions.db')
+        
+    except Exception as e:
+        print(f"❌ Transaction tests failed: {e}")
+        return False
+    
+    return True
+
+def test_schema_migrations():
+    """Test versioned schema migrations and the per-meeting lookup indexes"""
+    print("🔍 Testing schema migrations...")
+    
+    try:
+        import sqlite3
+        from database import SCHEMA_MIGRATIONS
+        
+        # A database from before embeddings had a model or chunk type
+        conn = sqlite3.connect('test_migrations.db')
+        conn.execute("CREATE TABLE meetings (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+                     "filename TEXT NOT NULL, file_path TEXT NOT NULL, duration REAL, "
+                     "uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, transcribed_at TIMESTAMP, "
+                     "status TEXT DEFAULT 'uploaded')")
+        conn.execute("CREATE TABLE meeting_summaries (id INTEGER PRIMARY KEY AUTOINCREMENT, meeting_id INTEGER NOT NULL, "
+                     "summary TEXT NOT NULL, action_items TEXT, decisions TEXT, key_topics TEXT, "
+                     "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("CREATE TABLE embeddings (id INTEGER PRIMARY KEY AUTOINCREMENT, meeting_id INTEGER NOT NULL, "
+                     "text_chunk TEXT NOT NULL, embedding TEXT NOT NULL, chunk_index INTEGER, "
+                     "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO meetings (title, filename, file_path) VALUES ('Old', 'o.mp3', '/o.mp3')")
+        conn.execute("INSERT INTO meeting_summaries (meeting_id, summary) VALUES (1, 'Old summary')")
+        conn.execute("INSERT INTO embeddings (meeting_id, text_chunk, embedding, chunk_index) VALUES "
+                     "(1, 'Old transcript', '[1.0, 0.0]', 0), (1, 'Old summary', '[0.0, 1.0]', 1)")
+        conn.commit()
+        conn.close()
+        
+        db = DatabaseManager('test_migrations.db')
+        conn = sqlite3.connect(db.db_path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == len(SCHEMA_MIGRATIONS)
+        assert [row[0] for row in conn.execute('SELECT chunk_type FROM embeddings ORDER BY id')] == \
+            ['transcription', 'summary']
+        
+        # Latest-row lookups seek the (meeting_id, created_at) indexes instead of scanning
+        for table in ('transcriptions', 'meeting_summaries', 'meeting_insights', 'visual_assets'):
+            plan = conn.execute(f'EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE meeting_id = 1 '
+                                'ORDER BY created_at DESC LIMIT 1').fetchall()
+            assert f'USING INDEX idx_{table}_meeting' in plan[0][3] and len(plan) == 1, plan
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM translations WHERE meeting_id = 1 "
+                            "AND target_language = 'georgian' ORDER BY content_type, created_at DESC").fetchall()
+        assert 'USING INDEX idx_translations_meeting' in plan[0][3] and len(plan) == 1, plan
+        conn.close()
+        
+        # Already migrated databases are left as they are
+        DatabaseManager('test_migrations.db')
+        assert db.get_meeting(1)['title'] == 'Old'
+        
+        print("✅ Schema migration tests passed!")
+        
+        # Cleanup
+        db.close()
+        os.remove('test_migrations.db')
+        
+    except Exception as e:
+        print(f"❌ Schema migration tests failed: {e}")
+        return False
+    
+    return True
+
+def test_meeting_bundle():
+    """Test loading a meeting's detail page data in one call"""
+    print("🔍 Testing meeting bundle...")
+    
+    try:
+        import json
+        import app as app_module
+        from database import LazyJSONDict
+        
+        db = DatabaseManager('test_meeting_bundle.db')
+        meeting_id = db.create_meeting("Kickoff", "k.mp3", "/path/k.mp3", 60.0)
+        db.save_transcription(meeting_id, "Hello team. Let us begin.", [
+            {'speaker': 'Ana', 'start': 0.0, 'end': 1.5, 'text': 'Hello team.'}
+        ], language='en')
+        db.save_meeting_summary(meeting_id, "Old summary", [], [], [])
+        db.save_meeting_summary(meeting_id, "Kickoff held", [
+            {'task': 'Plan sprint', 'owner': 'Ana', 'deadline': '2026-11-01', 'priority': 'high'}
+        ], [], ['planning'])
+        db.save_meeting_insights(meeting_id, {'effectiveness_score': 8, 'recommendations': ['Shorter']})
+        db.save_visual_asset(meeting_id, {'image_type': 'summary', 'title': 'Overview', 'image_url': 'http://x'})
+        db.save_translation(meeting_id, 'summary', "Kickoff held", {
+            'translated_text': 'Kickoff', 'target_language': 'georgian', 'language_name': 'Georgian',
+            'language_code': 'ka', 'native_name': 'ქართული'
+        })
+        
+        # The same data as the separate getters
+        bundle = db.get_meeting_bundle(meeting_id)
+        assert bundle['meeting'] == db.get_meeting(meeting_id)
+        assert dict(bundle['transcription']) == db.get_transcription(meeting_id)
+        assert bundle['summary']['summary'] == "Kickoff held"
+        assert dict(bundle['summary']) == db.get_meeting_summary(meeting_id)
+        assert dict(bundle['insights']) == db.get_meeting_insights(meeting_id)
+        assert bundle['visuals'] == db.get_meeting_visuals(meeting_id)
+        assert bundle['translations'] == db.get_available_translation_languages(meeting_id)
+        
+        # JSON columns are decoded when first read
+        transcription = db.get_meeting_bundle(meeting_id, parts=('transcription',))['transcription']
+        assert isinstance(transcription, LazyJSONDict) and 'segments' in transcription._pending
+        assert transcription['segments'][0]['speaker'] == 'Ana' and not transcription._pending
+        assert json.loads(json.dumps(db.get_meeting_bundle(meeting_id)['summary']))['key_topics'] == ['planning']
+        
+        # Only the requested parts, and nothing for missing meetings or rows
+        assert set(db.get_meeting_bundle(meeting_id, parts=('summary',))) == {'meeting', 'summary'}
+        assert db.get_meeting_bundle(meeting_id + 1) is None
+        other_id = db.create_meeting("Empty", "e.mp3", "/path/e.mp3")
+        empty = db.get_meeting_bundle(other_id)
+        assert empty['transcription'] is None and empty['summary'] is None and empty['visuals'] == []
+        
+        # The detail page renders from it
+        app_db = app_module.db
+        app_module.db = db
+        try:
+            with app_module.app.test_client() as client:
+                response = client.get(f'/meeting/{meeting_id}')
+                assert response.status_code == 200
+                assert 'Hello team.' in response.get_data(as_text=True)
+                assert client.get(f'/meeting/{other_id + 1}').status_code == 302
+        finally:
+            app_module.db = app_db
+        
+        print("✅ Meeting bundle tests passed!")
+        
+        # Cleanup
+        db.close()
+        os.remove('test_meeting_bundle.db')
+        
+    except Exception as e:
+        print(f"❌ Meeting bundle tests failed: {e}")
+        return False
+    
+    return True
+
+def test_meeting_pagination():
+    """Test keyset pagination, field projection and status totals of meeting listings"""
+    print("🔍 Testing meeting pagination...")
+    
+    try:
+        import sqlite3
+        import app as app_module
+        
+        db = DatabaseManager('test_meeting_pagination.db')
+        ids = [db.create_meeting(f"Meeting {i}", f"{i}.mp3", f"/path/{i}.mp3", 60.0) for i in range(7)]
+        # Several meetings uploaded in the same second are ordered by id
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("UPDATE meetings SET uploaded_at = '2026-01-01 09:00:00' WHERE id <= ?", (ids[4],))
+        conn.commit()
+        conn.close()
+        db.update_meeting_status(ids[0], 'transcribed')
+        db.update_meeting_status(ids[1], 'processing')
+        
+        # Pages cover every meeting once, newest first, like the full listing
+        pages, after = [], None
+        while True:
+            page, after = db.get_meetings_page(3, after=after)
+            pages.append(page)
+            if after is None:
+                break
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [m['id'] for page in pages for m in page] == [ids[6], ids[5], ids[4], ids[3], ids[2], ids[1], ids[0]]
+        assert pages[0][0] == dict(db.get_meeting(ids[6]))
+        
+        # Projection and bad input
+        page, _ = db.get_meetings_page(2, fields=('title', 'status'))
+        assert page == [{'title': 'Meeting 6', 'status': 'uploaded'}, {'title': 'Meeting 5', 'status': 'uploaded'}]
+        for kwargs in ({'fields': ('title', 'secret')}, {'after': 'not a cursor'}):
+            try:
+                db.get_meetings_page(2, **kwargs)
+                assert False, kwargs
+            except ValueError:
+                pass
+        
+        stats = db.get_meeting_stats()
+        assert stats['total'] == 7 and stats['total_duration'] == 420.0
+        assert stats['by_status'] == {'uploaded': 5, 'transcribed': 1, 'processing': 1}
+        
+        # The API and the dashboard page through the same listing
+        app_db, page_size = app_module.db, app_module.MEETINGS_PAGE_SIZE
+        app_module.db, app_module.MEETINGS_PAGE_SIZE = db, 4
+        try:
+            with app_module.app.test_client() as client:
+                first = client.get('/api/meetings?limit=4&fields=id,title').get_json()
+                assert [m['id'] for m in first['meetings']] == [ids[6], ids[5], ids[4], ids[3]]
+                assert set(first['meetings'][0]) == {'id', 'title'}
+                second = client.get(f"/api/meetings?limit=4&after={first['next_cursor']}").get_json()
+                assert [m['id'] for m in second['meetings']] == [ids[2], ids[1], ids[0]]
+                assert second['next_cursor'] is None
+                assert client.get('/api/meetings?limit=0').status_code == 400
+                assert client.get('/api/meetings?fields=nope').status_code == 400
+                
+                html = client.get('/').get_data(as_text=True)
+                assert 'Meeting 3' in html and 'Meeting 2' not in html and 'Older' in html
+                html = client.get(f"/?after={first['next_cursor']}").get_data(as_text=True)
+                assert 'Meeting 2' in html and 'Meeting 3' not in html and 'Newest' in html
+        finally:
+            app_module.db, app_module.MEETINGS_PAGE_SIZE = app_db, page_size
+        
+        print("✅ Meeting pagination tests passed!")
+        
+        # Cleanup
+        db.close()
+        os.remove('test_meeting_pagination.db')
+        
+    except Exception as e:
+        print(f"❌ Meeting pagination tests failed: {e}")
+        return False
+    
+    return True
+
 def test_config():
     """Test configuration loading"""
     print("🔍 Testing configuration...")
@@ -181,6 +494,1174 @@ def test_semantic_search():
     
     return True
 
+def test_vector_index():
+    """Test vectorized index matches per-chunk cosine similarity"""
+    print("🔍 Testing vector index...")
+    
+    try:
+        import numpy as np
+        from sklearn.metrics.pairwise import cosine_similarity
+        from vector_index import VectorIndex
+        
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(40, 16))
+        rows = [
+            {'meeting_id': i % 5, 'chunk_index': i, 'text_chunk': f'chunk {i}',
+             'embedding': list(vectors[i]), 'metadata': {'title': f'Meeting {i % 5}', 'type': 'transcription'}}
+            for i in range(40)
+        ]
+        query = rng.normal(size=16)
+        
+        index = VectorIndex(rows)
+        expected = cosine_similarity([query], vectors)[0]
+        
+        # Top-k with threshold matches a brute-force sort
+        results = index.search(query, top_k=5, threshold=0.0)
+        expected_order = [i for i in np.argsort(-expected) if expected[i] >= 0.0][:5]
+        assert [r['chunk_index'] for r in results] == expected_order
+        assert np.allclose([r['similarity'] for r in results], expected[expected_order], atol=1e-5)
+        assert results[0]['chunk_type'] == 'transcription'
+        assert results[0]['text'] == f'chunk {expected_order[0]}'
+        
+        # Per-meeting averages exclude the target meeting
+        meeting_scores = index.meeting_scores(query, exclude_meeting_id=0)
+        assert {m['meeting_id'] for m in meeting_scores} == {1, 2, 3, 4}
+        for m in meeting_scores:
+            assert np.isclose(m['similarity'], expected[m['meeting_id']::5].mean(), atol=1e-5)
+            assert m['match_count'] == 8
+        
+        print("✅ Vector index tests passed!")
+        
+    except Exception as e:
+        print(f"❌ Vector index tests failed: {e}")
+        return False
+    
+    return True
+
+def test_embedding_index_sync():
+    """Test the shared embedding index stays in sync with saved embeddings"""
+    print("🔍 Testing embedding index sync...")
+    
+    try:
+        import database
+        
+        db = DatabaseManager('test_embedding_index.db')
+        meeting_a = db.create_meeting("Meeting A", "a.mp3", "/path/a.mp3")
+        meeting_b = db.create_meeting("Meeting B", "b.mp3", "/path/b.mp3")
+        db.save_transcription(meeting_a, "Text A", [])
+        db.save_transcription(meeting_b, "Text B", [])
+        db.save_embeddings(meeting_a, [{'text': 'a0', 'embedding': [1.0, 0.0], 'chunk_index': 0}])
+        
+        index = db.get_embedding_index()
+        assert len(index) == 1
+        assert db.get_embedding_index() is index
+        
+        # Writes through the same process update the loaded index in place
+        db.save_embeddings(meeting_b, [
+            {'text': 'b0', 'embedding': [0.0, 1.0], 'chunk_index': 0, 'metadata': {'title': 'Meeting B'}},
+            {'text': 'b1', 'embedding': [1.0, 1.0], 'chunk_index': 1, 'metadata': {'title': 'Meeting B'}}
+        ])
+        assert len(index) == 3
+        assert index.generation == db.get_embedding_generation()
+        
+        # Changes made by another process are picked up on the next sync
+        import sqlite3
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("UPDATE meetings SET status = 'error' WHERE id = ?", (meeting_a,))
+        conn.execute('INSERT INTO embedding_changes (meeting_id) VALUES (?)', (meeting_a,))
+        conn.commit()
+        conn.close()
+        assert meeting_a in index
+        assert db.get_embedding_index() is index
+        assert meeting_a not in index
+        assert len(index) == 2
+        
+        print("✅ Embedding index sync tests passed!")
+        
+        # Cleanup
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_embedding_index.db')
+        
+    except Exception as e:
+        print(f"❌ Embedding index sync tests failed: {e}")
+        return False
+    
+    return True
+
+def test_embedding_storage():
+    """Test binary embedding storage and migration of legacy JSON rows"""
+    print("🔍 Testing embedding storage...")
+    
+    try:
+        import sqlite3
+        import numpy as np
+        
+        db = DatabaseManager('test_embedding_storage.db')
+        meeting_id = db.create_meeting("Storage Meeting", "s.mp3", "/path/s.mp3")
+        db.save_transcription(meeting_id, "Text", [])
+        
+        vector = [0.25, -1.5, 3.0]
+        db.save_embeddings(meeting_id, [{'text': 'chunk', 'embedding': vector, 'chunk_index': 0}])
+        
+        # Insert a legacy JSON row as older versions did
+        conn = sqlite3.connect(db.db_path)
+        conn.execute('''
+            INSERT INTO embeddings (meeting_id, text_chunk, embedding, chunk_index)
+            VALUES (?, ?, ?, ?)
+        ''', (meeting_id, 'legacy', json.dumps(vector), 1))
+        conn.commit()
+        conn.close()
+        
+        # Both formats decode transparently
+        stored = db.get_meeting_embeddings(meeting_id)
+        assert len(stored) == 2
+        assert all(np.allclose(item['embedding'], vector) for item in stored)
+        
+        assert db.migrate_embeddings_to_blob(batch_size=1, pause=0) == 1
+        assert db.migrate_embeddings_to_blob(pause=0) == 0
+        
+        conn = sqlite3.connect(db.db_path)
+        types = {row[0] for row in conn.execute('SELECT typeof(embedding) FROM embeddings')}
+        conn.close()
+        assert types == {'blob'}
+        assert all(np.allclose(item['embedding'], vector) for item in db.get_all_embeddings())
+        
+        print("✅ Embedding storage tests passed!")
+        
+        # Cleanup
+        db.close()
+        os.remove('test_embedding_storage.db')
+        
+    except Exception as e:
+        print(f"❌ Embedding storage tests failed: {e}")
+        return False
+    
+    return True
+
+def test_quantized_index():
+    """Test quantized index vectors and full-precision re-ranking"""
+    print("🔍 Testing quantized index...")
+    
+    try:
+        import numpy as np
+        import database
+        from vector_index import VectorIndex
+        
+        rng = np.random.default_rng(2)
+        vectors = rng.normal(size=(60, 32)).astype(np.float32)
+        rows = [
+            {'meeting_id': i // 10, 'chunk_index': i % 10, 'text': f'chunk {i}',
+             'embedding': vectors[i], 'metadata': {'title': f'Meeting {i // 10}'}}
+            for i in range(60)
+        ]
+        full = {(i // 10, 'transcription', i % 10): vectors[i] for i in range(60)}
+        requested = []
+        
+        def full_vectors(keys):
+            requested.append(len(keys))
+            return [full.get(key) for key in keys]
+        
+        query = rng.normal(size=32)
+        exact = VectorIndex(rows)
+        expected = exact.search(query, top_k=5)
+        
+        for quantization, bytes_per_value in (('float16', 2), ('int8', 1)):
+            approximate = VectorIndex(rows, quantization=quantization)
+            assert approximate.matrix.nbytes <= 60 * 32 * bytes_per_value + 60 * 4
+            assert np.allclose(approximate.scores(query), exact.scores(query), atol=0.02)
+            
+            # Re-ranked results carry the exact similarities
+            reranked = VectorIndex(rows, quantization=quantization, full_vectors=full_vectors)
+            results = reranked.search(query, top_k=5)
+            assert [(r['meeting_id'], r['chunk_index']) for r in results] == \
+                [(r['meeting_id'], r['chunk_index']) for r in expected]
+            assert np.allclose([r['similarity'] for r in results], [r['similarity'] for r in expected], atol=1e-5)
+        
+        # One batched lookup per query, shortlisted by top_k even when hybrid search fuses to a larger depth
+        requested.clear()
+        reranked = VectorIndex(rows, quantization='int8', full_vectors=full_vectors, rerank_factor=1)
+        reranked.hybrid_search(query, 'chunk', top_k=5, depth=55)
+        assert requested == [50]
+        
+        # The database supplies full vectors for a quantized shared index
+        db = DatabaseManager('test_quantized_index.db')
+        meeting_id = db.create_meeting("Quantized", "q.mp3", "/path/q.mp3")
+        db.save_transcription(meeting_id, "Text", [])
+        db.save_embeddings(meeting_id, rows[:10])
+        index = db.get_embedding_index(quantization='int8')
+        assert index.quantization == 'int8'
+        keys = [(meeting_id, 'transcription', 3), (meeting_id, 'summary', 0), (meeting_id, 'transcription', 0)]
+        found = db.get_chunk_vectors(keys)
+        assert np.allclose(found[0], vectors[3]) and found[1] is None and np.allclose(found[2], vectors[0])
+        result = index.search(vectors[3], top_k=1)[0]
+        assert result['chunk_index'] == 3 and np.isclose(result['similarity'], 1.0, atol=1e-5)
+        
+        print("✅ Quantized index tests passed!")
+        
+        # Cleanup
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_quantized_index.db')
+        
+    except Exception as e:
+        print(f"❌ Quantized index tests failed: {e}")
+        return False
+    
+    return True
+
+def test_prefix_dimensions():
+    """Test truncated first-pass vectors re-ranked against the full vectors"""
+    print("🔍 Testing prefix dimensions...")
+    
+    try:
+        import numpy as np
+        import database
+        from vector_index import VectorIndex
+        
+        rng = np.random.default_rng(3)
+        vectors = rng.normal(size=(40, 32)).astype(np.float32)
+        rows = [
+            {'meeting_id': i // 8, 'chunk_index': i % 8, 'text': f'chunk {i}',
+             'embedding': vectors[i], 'metadata': {'title': f'Meeting {i // 8}'}}
+            for i in range(40)
+        ]
+        full = {(i // 8, 'transcription', i % 8): vectors[i] for i in range(40)}
+        query = vectors[17] + rng.normal(scale=0.1, size=32)
+        
+        # The first pass scores the renormalized prefix only
+        prefix = VectorIndex(rows, dimensions=8)
+        assert prefix.matrix.shape == (40, 8)
+        expected_prefix = VectorIndex.normalize(vectors[:, :8]) @ VectorIndex.normalize(query[:8])[0]
+        assert np.allclose(prefix.scores(query), expected_prefix, atol=1e-5)
+        
+        # Re-ranking restores the full-vector order and similarities
+        expected = VectorIndex(rows).search(query, top_k=3)
+        results = VectorIndex(rows, dimensions=8, full_vectors=lambda keys: [full.get(key) for key in keys]).search(
+            query, top_k=3)
+        assert [(r['meeting_id'], r['chunk_index']) for r in results] == \
+            [(r['meeting_id'], r['chunk_index']) for r in expected]
+        assert np.allclose([r['similarity'] for r in results], [r['similarity'] for r in expected], atol=1e-5)
+        
+        # A truncated shared index re-ranks from the database, one batched read per query
+        db = DatabaseManager('test_prefix_dimensions.db')
+        for mid in range(5):
+            meeting_id = db.create_meeting(f"Prefix {mid}", "p.mp3", "/path/p.mp3")
+            db.save_transcription(meeting_id, "Text", [])
+            db.save_embeddings(meeting_id, [dict(row, meeting_id=meeting_id) for row in rows[mid * 8:(mid + 1) * 8]])
+        index = db.get_embedding_index(dimensions=8)
+        assert index.matrix.shape == (40, 8)
+        lookups = []
+        read_chunks = db.get_chunk_vectors
+        db.get_chunk_vectors = lambda keys, model: lookups.append(len(keys)) or read_chunks(keys, model)
+        results = index.search(query, top_k=3)
+        assert lookups == [40]
+        assert [(r['meeting_id'] - 1, r['chunk_index']) for r in results] == \
+            [(r['meeting_id'], r['chunk_index']) for r in expected]
+        assert np.allclose([r['similarity'] for r in results], [r['similarity'] for r in expected], atol=1e-5)
+        
+        print("✅ Prefix dimensions tests passed!")
+        
+        # Cleanup
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_prefix_dimensions.db')
+        
+    except Exception as e:
+        print(f"❌ Prefix dimensions tests failed: {e}")
+        return False
+    
+    return True
+
+def test_index_snapshot():
+    """Test memory-mapped index snapshots and syncing them with later changes"""
+    print("🔍 Testing index snapshots...")
+    
+    try:
+        import shutil
+        import numpy as np
+        import database
+        from vector_index import VectorIndex, SegmentedMatrix
+        
+        rng = np.random.default_rng(4)
+        vectors = rng.normal(size=(30, 8))
+        rows = [
+            {'meeting_id': i // 5, 'chunk_index': i % 5, 'text': f'chunk {i}',
+             'embedding': vectors[i], 'metadata': {'title': f'Meeting {i // 5}'}}
+            for i in range(30)
+        ]
+        query = rng.normal(size=8)
+        
+        def keys(results):
+            return [(r['meeting_id'], r['chunk_index'], round(r['similarity'], 5)) for r in results]
+        
+        index = VectorIndex(rows, generation=7)
+        index.save_snapshot('test_snapshots/index')
+        loaded = VectorIndex.load_snapshot('test_snapshots/index')
+        assert loaded.generation == 7
+        assert isinstance(loaded.matrix, np.memmap)
+        assert keys(loaded.search(query, top_k=5)) == keys(index.search(query, top_k=5))
+        
+        # Changed meetings are held privately; untouched runs stay mapped
+        replacement = [dict(row, embedding=-row['embedding']) for row in rows[10:15]]
+        for target in (index, loaded):
+            target.upsert_meeting(2, replacement)
+            target.remove_meeting(4)
+        assert isinstance(loaded.matrix, SegmentedMatrix)
+        assert all(isinstance(part, np.memmap) for part in loaded.matrix.parts[::2])
+        assert keys(loaded.search(query, top_k=10)) == keys(index.search(query, top_k=10))
+        assert np.allclose(loaded.matrix[[0, 12, 20]], index.matrix[[0, 12, 20]])
+        assert np.allclose(loaded.matrix[3:18], index.matrix[3:18])
+        
+        # Rewrites replace the sidecar atomically and drop older matrices
+        loaded.generation = 8
+        loaded.save_snapshot('test_snapshots/index')
+        assert sorted(os.listdir('test_snapshots')) == ['index.8.%d.npy' % os.getpid(), 'index.json']
+        assert len(VectorIndex.load_snapshot('test_snapshots/index')) == 25
+        
+        # The database opens the snapshot and syncs changes made after it was written
+        db = DatabaseManager('test_index_snapshot.db')
+        meeting_a = db.create_meeting("Meeting A", "a.mp3", "/path/a.mp3")
+        meeting_b = db.create_meeting("Meeting B", "b.mp3", "/path/b.mp3")
+        db.save_transcription(meeting_a, "Text A", [])
+        db.save_transcription(meeting_b, "Text B", [])
+        db.save_embeddings(meeting_a, rows[:5])
+        
+        built = db.get_embedding_index(snapshot_dir='test_snapshots')
+        built._snapshot_writer.join()
+        database._embedding_indexes.clear()
+        db.save_embeddings(meeting_b, rows[5:10])
+        
+        shared = db.get_embedding_index(snapshot_dir='test_snapshots')
+        assert shared is not built and isinstance(shared._base, np.memmap)
+        assert len(shared) == 10 and meeting_b in shared
+        
+        print("✅ Index snapshot tests passed!")
+        
+        # Cleanup
+        database._embedding_indexes.clear()
+        shutil.rmtree('test_snapshots')
+        db.close()
+        os.remove('test_index_snapshot.db')
+        
+    except Exception as e:
+        print(f"❌ Index snapshot tests failed: {e}")
+        return False
+    
+    return True
+
+def test_ivf_index():
+    """Test approximate IVF search against exact search"""
+    print("🔍 Testing IVF index...")
+    
+    try:
+        import numpy as np
+        from vector_index import VectorIndex, IVFIndex
+        
+        rng = np.random.default_rng(1)
+        centers = rng.normal(size=(20, 32))
+        vectors = centers[rng.integers(0, 20, 2000)] + 0.1 * rng.normal(size=(2000, 32))
+        rows = [{'meeting_id': i // 10, 'chunk_index': i % 10, 'text': f'chunk {i}',
+                 'embedding': vectors[i]} for i in range(2000)]
+        
+        index = VectorIndex(rows)
+        ann = IVFIndex(n_lists=20, n_probe=20, min_rows=100)
+        index.ann = ann
+        ann.rebuild(index)
+        assert ann.ready
+        
+        # Probing every list is exact
+        query = centers[3] + 0.1 * rng.normal(size=32)
+        exact = index.search(query, top_k=10, exact=True)
+        approx = index.search(query, top_k=10)
+        assert [r['text'] for r in approx] == [r['text'] for r in exact]
+        
+        # A few probes still find the true neighbours of a clustered query
+        ann.n_probe = 2
+        approx = index.search(query, top_k=10)
+        recall = len({r['text'] for r in approx} & {r['text'] for r in exact}) / 10
+        assert recall >= 0.9
+        
+        # Meetings added after training are assigned incrementally
+        index.upsert_meeting(999, [{'meeting_id': 999, 'text': 'new chunk', 'embedding': query}])
+        assert index.search(query, top_k=1)[0]['text'] == 'new chunk'
+        
+        print("✅ IVF index tests passed!")
+        
+    except Exception as e:
+        print(f"❌ IVF index tests failed: {e}")
+        return False
+    
+    return True
+
+def test_query_embedding_cache():
+    """Test query embeddings are served from memory and from the database"""
+    print("🔍 Testing query embedding cache...")
+    
+    try:
+        import sqlite3
+        import numpy as np
+        from embedding_cache import QueryEmbeddingCache
+        
+        db = DatabaseManager('test_query_cache.db')
+        cache = QueryEmbeddingCache(db, max_memory_entries=2, max_disk_entries=3)
+        
+        assert cache.get('model', 'Action items') is None
+        cache.put('model', 'Action items', [0.5, 0.25])
+        
+        # Normalized text hits the memory tier
+        assert np.allclose(cache.get('model', '  action   ITEMS '), [0.5, 0.25])
+        assert cache.get('other-model', 'action items') is None
+        
+        # A fresh process reads from the database tier
+        restarted = QueryEmbeddingCache(db)
+        assert np.allclose(restarted.get('model', 'action items'), [0.5, 0.25])
+        assert restarted.stats()['disk_hits'] == 1
+        
+        # Both tiers respect their size limits
+        for i in range(5):
+            cache.put('model', f'query {i}', [float(i), 0.0])
+        assert cache.stats()['memory_entries'] == 2
+        conn = sqlite3.connect(db.db_path)
+        assert conn.execute('SELECT COUNT(*) FROM query_embeddings').fetchone()[0] == 3
+        conn.close()
+        
+        stats = cache.stats()
+        assert stats['memory_hits'] == 1 and stats['misses'] == 2
+        
+        print("✅ Query embedding cache tests passed!")
+        
+        # Cleanup
+        db.close()
+        os.remove('test_query_cache.db')
+        
+    except Exception as e:
+        print(f"❌ Query embedding cache tests failed: {e}")
+        return False
+    
+    return True
+
+def test_materialized_insights():
+    """Test precomputed theme scores match live cross-meeting insights"""
+    print("🔍 Testing materialized insights...")
+    
+    try:
+        import database
+        import numpy as np
+        from semantic_search import SemanticSearchEngine
+        
+        search_engine = SemanticSearchEngine("test-key")
+        themes = search_engine.DEFAULT_THEMES
+        theme_vectors = {theme: np.eye(8)[i] for i, theme in enumerate(themes)}
+        api_calls = []
+        
+        def fake_embeddings(texts):
+            api_calls.append(list(texts))
+            return [theme_vectors[text] for text in texts]
+        search_engine.generate_embeddings = fake_embeddings
+        
+        rng = np.random.default_rng(2)
+        db = DatabaseManager('test_materialized_insights.db')
+        
+        def add_meeting(title):
+            meeting_id = db.create_meeting(title, "m.mp3", "/path/m.mp3")
+            db.save_transcription(meeting_id, "Text", [])
+            vectors = np.eye(8)[rng.integers(0, 8, 6)] + 0.3 * rng.random((6, 8))
+            db.save_embeddings(meeting_id, [
+                {'text': f'{title} chunk {i} ' * 20, 'embedding': vectors[i], 'chunk_index': i,
+                 'chunk_type': 'transcription', 'metadata': {'title': title, 'type': 'transcription'}}
+                for i in range(6)
+            ])
+        
+        for i in range(3):
+            add_meeting(f"Meeting {i}")
+        
+        # First read embeds all themes in one batch and backfills the scores
+        materialized = search_engine.get_materialized_insights(db)
+        assert len(api_calls) == 1 and api_calls[0] == themes
+        assert materialized == search_engine.discover_cross_meeting_insights(db.get_embedding_index())
+        
+        # New meetings are scored on save, without further API calls
+        add_meeting("Meeting 3")
+        api_calls.clear()
+        materialized = search_engine.get_materialized_insights(db)
+        assert not api_calls
+        assert any(insight['title'] == 'Meeting 3' for insights in materialized.values() for insight in insights)
+        assert materialized == search_engine.discover_cross_meeting_insights(db.get_embedding_index())
+        
+        print("✅ Materialized insights tests passed!")
+        
+        # Cleanup
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_materialized_insights.db')
+        
+    except Exception as e:
+        print(f"❌ Materialized insights tests failed: {e}")
+        return False
+    
+    return True
+
+def test_meeting_neighbors():
+    """Test precomputed neighbour lists match live similar-meeting scoring"""
+    print("🔍 Testing meeting neighbour lists...")
+    
+    try:
+        import database
+        import numpy as np
+        from semantic_search import SemanticSearchEngine
+        
+        search_engine = SemanticSearchEngine("test-key")
+        rng = np.random.default_rng(3)
+        db = DatabaseManager('test_meeting_neighbors.db')
+        neighbors_size = database.MEETING_NEIGHBORS
+        database.MEETING_NEIGHBORS = 4  # Small lists so re-saves push meetings in and out
+        
+        def save(meeting_id):
+            count = int(rng.integers(1, 5))
+            db.save_embeddings(meeting_id, [
+                {'text': f'chunk {i}', 'embedding': rng.normal(size=6), 'chunk_index': i}
+                for i in range(count)
+            ])
+        
+        meeting_ids = []
+        for i in range(10):
+            meeting_id = db.create_meeting(f"Meeting {i}", "m.mp3", "/path/m.mp3")
+            db.save_transcription(meeting_id, "Text", [])
+            save(meeting_id)
+            meeting_ids.append(meeting_id)
+        
+        # Re-saving meetings must repair every list they appeared in
+        for meeting_id in meeting_ids[::3]:
+            save(meeting_id)
+        
+        index = db.get_embedding_index()
+        for meeting_id in meeting_ids:
+            expected = search_engine.find_similar_meetings(
+                meeting_id, db.get_meeting_embeddings(meeting_id), index, top_k=4)
+            actual = db.get_similar_meetings(meeting_id, top_k=4)
+            assert [m['meeting_id'] for m in actual] == [m['meeting_id'] for m in expected]
+            assert np.allclose([m['similarity'] for m in actual], [m['similarity'] for m in expected], atol=1e-5)
+            assert [m['match_count'] for m in actual] == [m['match_count'] for m in expected]
+        
+        # Centroids of other models (other sizes) coexist, also when a meeting's vectors are emptied
+        other_ids = [db.create_meeting(f"Other {i}", "o.mp3", "/path/o.mp3") for i in range(3)]
+        db.save_embeddings(other_ids[0], [{'text': 'a', 'embedding': rng.normal(size=8), 'chunk_index': 0}],
+                           model='m1')
+        db.save_embeddings(other_ids[1], [{'text': 'b', 'embedding': rng.normal(size=4), 'chunk_index': 0}],
+                           model='m2')
+        db.save_embeddings(other_ids[2], [], model='m2')
+        db.save_embeddings(meeting_ids[0], [])
+        assert all(m['meeting_id'] != meeting_ids[0]
+                   for other_id in meeting_ids[1:] for m in db.get_similar_meetings(other_id, top_k=4))
+        assert len(db.get_similar_meetings(meeting_ids[1], top_k=4)) == 4
+        
+        print("✅ Meeting neighbour list tests passed!")
+        
+        # Cleanup
+        database.MEETING_NEIGHBORS = neighbors_size
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_meeting_neighbors.db')
+        
+    except Exception as e:
+        print(f"❌ Meeting neighbour list tests failed: {e}")
+        return False
+    
+    return True
+
+def test_topic_clusters():
+    """Test meetings are clustered incrementally and clusters get TF-IDF labels"""
+    print("🔍 Testing topic clusters...")
+
+    try:
+        import database
+        import numpy as np
+
+        rng = np.random.default_rng(4)
+        db = DatabaseManager('test_topic_clusters.db')
+        clusters_size = database.TOPIC_CLUSTERS
+        database.TOPIC_CLUSTERS = 3
+        directions = np.eye(8)[:3] * 5
+        texts = ["The budget forecast and budget spending", "Hiring interviews and hiring candidates",
+                 "Product launch plan and launch marketing"]
+
+        def add_meeting(topic):
+            meeting_id = db.create_meeting(f"Meeting {topic}", "m.mp3", "/path/m.mp3")
+            db.save_transcription(meeting_id, texts[topic], [])
+            db.save_embeddings(meeting_id, [
+                {'text': texts[topic], 'embedding': directions[topic] + rng.normal(scale=0.3, size=8),
+                 'chunk_index': i}
+                for i in range(2)
+            ])
+            return meeting_id
+
+        # Not enough chunks for three clusters yet
+        first = add_meeting(0)
+        assert db.get_topics() == []
+
+        # The first fit assigns every meeting so far, later meetings are folded in one at a time
+        meeting_topics = {first: 0}
+        for topic in (1, 2, 0, 1, 2):
+            meeting_topics[add_meeting(topic)] = topic
+
+        topics = db.get_topics()
+        assert len(topics) == 3
+        for topic in topics:
+            assert len({meeting_topics[m['id']] for m in topic['meetings']}) == 1
+            assert ['budget', 'hiring', 'launch'][meeting_topics[topic['meetings'][0]['id']]] in topic['label']
+
+        # Labels are stored, and re-embedding a meeting keeps it in its cluster
+        assert db.get_topics() == topics
+        db.save_embeddings(first, [{'text': texts[0], 'embedding': directions[0], 'chunk_index': 0}])
+        assert any({m['id'] for m in topic['meetings']} >= {first} and 'budget' in topic['label']
+                   for topic in db.get_topics())
+
+        print("✅ Topic cluster tests passed!")
+
+        # Cleanup
+        database.TOPIC_CLUSTERS = clusters_size
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_topic_clusters.db')
+
+    except Exception as e:
+        print(f"❌ Topic cluster tests failed: {e}")
+        return False
+
+    return True
+
+def test_embedding_batching():
+    """Test embedding requests are split into batches and only failed batches are retried"""
+    print("🔍 Testing embedding batching...")
+    
+    try:
+        import threading
+        from semantic_search import SemanticSearchEngine
+        
+        search_engine = SemanticSearchEngine("test-key")
+        search_engine.MAX_BATCH_ITEMS = 3
+        search_engine.MAX_BATCH_TOKENS = 100
+        
+        texts = [f"text {i}" for i in range(10)] + ["x" * 600]
+        token_counts = [search_engine._prepare_input(text)[1] for text in texts]
+        batches = search_engine._batch_inputs(token_counts)
+        assert [i for batch in batches for i in batch] == list(range(len(texts)))
+        assert all(len(batch) <= 3 for batch in batches)
+        assert all(sum(token_counts[i] for i in batch) <= 100 or len(batch) == 1 for batch in batches)
+        
+        calls = []
+        lock = threading.Lock()
+        
+        def flaky_batch(batch_texts):
+            with lock:
+                calls.append(batch_texts)
+                first_attempt = calls.count(batch_texts) == 1
+            if batch_texts[0] == "text 3" and first_attempt:
+                raise Exception("rate limited")
+            return [[float(text.split()[-1]) if text.startswith("text") else -1.0] for text in batch_texts]
+        
+        search_engine._embed_batch = flaky_batch
+        search_engine.EMBEDDING_RETRIES = 1
+        search_engine.EMBEDDING_RETRY_DELAY = 0
+        embeddings = search_engine.generate_embeddings(texts)
+        
+        assert embeddings == [[float(i)] for i in range(10)] + [[-1.0]]
+        assert len(calls) == len(batches) + 1
+        
+        print("✅ Embedding batching tests passed!")
+        
+    except Exception as e:
+        print(f"❌ Embedding batching tests failed: {e}")
+        return False
+    
+    return True
+
+def test_chunk_embedding_store():
+    """Test unchanged chunks are served from the content-hash store"""
+    print("🔍 Testing chunk embedding store...")
+    
+    try:
+        from embedding_cache import ChunkEmbeddingStore
+        from semantic_search import SemanticSearchEngine
+        
+        db = DatabaseManager('test_chunk_store.db')
+        search_engine = SemanticSearchEngine("test-key", chunk_store=ChunkEmbeddingStore(db))
+        api_inputs = []
+        
+        def fake_embeddings(texts):
+            api_inputs.extend(texts)
+            return [[float(len(text)), 1.0] for text in texts]
+        search_engine.generate_embeddings = fake_embeddings
+        
+        transcript = "First topic was discussed. " * 60 + "Second topic came up. " * 60
+        first = search_engine.process_meeting_for_search(1, transcript, "Weekly", "Summary text")
+        assert len(api_inputs) == len(first)
+        
+        # Re-processing unchanged text makes no API calls
+        api_inputs.clear()
+        second = search_engine.process_meeting_for_search(1, transcript, "Weekly", "Summary text")
+        assert not api_inputs
+        assert [list(item['embedding']) for item in second] == [list(item['embedding']) for item in first]
+        
+        # Only the changed summary is embedded
+        search_engine.process_meeting_for_search(1, transcript, "Weekly", "New summary")
+        assert len(api_inputs) == 1 and "New summary" in api_inputs[0]
+        
+        print("✅ Chunk embedding store tests passed!")
+        
+        # Cleanup
+        db.close()
+        os.remove('test_chunk_store.db')
+        
+    except Exception as e:
+        print(f"❌ Chunk embedding store tests failed: {e}")
+        return False
+    
+    return True
+
+def test_full_text_search():
+    """Test the FTS5 fallback search stays in sync and ranks results"""
+    print("🔍 Testing full-text search...")
+    
+    try:
+        db = DatabaseManager('test_full_text_search.db')
+        
+        budget = db.create_meeting("Budget Review", "b.mp3", "/path/b.mp3")
+        db.save_transcription(budget, "We reviewed the quarterly numbers and ticket ABC-123.", [])
+        db.save_meeting_summary(budget, "Old summary", [], [], [])
+        db.save_meeting_summary(budget, "Budget approved for hiring", [], [], [])
+        
+        standup = db.create_meeting("Daily Standup", "s.mp3", "/path/s.mp3")
+        db.save_transcription(standup, "Someone mentioned the budget briefly.", [])
+        
+        pending = db.create_meeting("Budget Planning", "p.mp3", "/path/p.mp3")
+        
+        # Prefix match, title hits ranked first, one row per meeting, untranscribed excluded
+        results = db.search_meetings_by_text("budg")
+        assert [r['id'] for r in results] == [budget, standup]
+        assert results[0]['summary'] == "Budget approved for hiring"
+        assert results[0]['snippet']
+        
+        # Exact tokens such as ticket numbers match
+        assert [r['id'] for r in db.search_meetings_by_text("ABC-123")] == [budget]
+        assert db.search_meetings_by_text("old summary") == []
+        assert db.search_meetings_by_text("   ") == []
+        
+        print("✅ Full-text search tests passed!")
+        
+        # Cleanup
+        db.close()
+        os.remove('test_full_text_search.db')
+        
+    except Exception as e:
+        print(f"❌ Full-text search tests failed: {e}")
+        return False
+    
+    return True
+
+def test_hybrid_search():
+    """Test BM25 keyword matches are fused into the vector ranking"""
+    print("🔍 Testing hybrid search...")
+    
+    try:
+        import numpy as np
+        from vector_index import VectorIndex
+        
+        rng = np.random.default_rng(1)
+        query = rng.normal(size=16)
+        texts = ['quarterly budget review', 'hiring plan for the team', 'ticket ABC-123 is blocked',
+                 'lunch options', 'budget and ticket ABC-123 follow-up']
+        rows = [
+            {'meeting_id': i, 'chunk_index': 0, 'text_chunk': text,
+             'embedding': list(query + rng.normal(scale=0.1 if i < 2 else 5.0, size=16)),
+             'metadata': {'title': f'Meeting {i}'}}
+            for i, text in enumerate(texts)
+        ]
+        index = VectorIndex(rows)
+        
+        # Keyword-only matches fall below the threshold but still rank with hybrid search
+        assert {r['meeting_id'] for r in index.search(query, top_k=5, threshold=0.7)} == {0, 1}
+        results = index.hybrid_search(query, 'ABC-123', top_k=5, threshold=0.7)
+        assert {r['meeting_id'] for r in results} == {0, 1, 2, 4}
+        assert {r['meeting_id'] for r in results[:2]} == {1, 2}  # Best of each ranking tie
+        assert results[0]['fusion_score'] == results[1]['fusion_score']
+        assert all(r['lexical_score'] == 0 for r in results if r['meeting_id'] in (0, 1))
+        
+        # Shorter chunk wins on equal term counts; the lexical index follows upserts
+        lexical = index.lexical.scores(index._get_snapshot(), 'ABC-123')
+        assert lexical[2] > lexical[4] > 0 and lexical[0] == 0
+        index.upsert_meeting(3, [dict(rows[3], text_chunk='ABC-123 escalated')])
+        assert 3 in {r['meeting_id'] for r in index.hybrid_search(query, 'ABC-123', top_k=5, threshold=0.7)}
+        index.remove_meeting(2)
+        assert 2 not in {r['meeting_id'] for r in index.hybrid_search(query, 'ABC-123', top_k=5)}
+        
+        print("✅ Hybrid search tests passed!")
+        
+    except Exception as e:
+        print(f"❌ Hybrid search tests failed: {e}")
+        return False
+    
+    return True
+
+def test_search_filters():
+    """Test chunk type and meeting date filters applied before scoring"""
+    print("🔍 Testing search filters...")
+
+    try:
+        import sqlite3
+        import numpy as np
+        import database
+
+        db = DatabaseManager('test_search_filters.db')
+        rng = np.random.default_rng(2)
+        query = rng.normal(size=8)
+        meeting_ids = []
+        for day in ('2024-01-10', '2024-02-10', '2024-03-10'):
+            meeting_id = db.create_meeting(f"Meeting {day}", "m.mp3", "/path/m.mp3")
+            db.save_transcription(meeting_id, "Text", [])
+            conn = sqlite3.connect(db.db_path)
+            conn.execute('UPDATE meetings SET uploaded_at = ? WHERE id = ?', (f'{day} 09:30:00', meeting_id))
+            conn.commit()
+            conn.close()
+            db.save_embeddings(meeting_id, [
+                {'text': 'Summary', 'embedding': list(query + rng.normal(scale=0.1, size=8)),
+                 'chunk_index': 0, 'metadata': {'type': 'summary'}},
+                {'text': 'Transcript', 'embedding': list(query + rng.normal(scale=0.1, size=8)),
+                 'chunk_index': 0, 'metadata': {'type': 'transcription'}},
+            ])
+            meeting_ids.append(meeting_id)
+
+        # The chunk type is stored instead of being assumed on read
+        types = [row['metadata']['type'] for row in db.get_meeting_embeddings(meeting_ids[0])]
+        assert types == ['summary', 'transcription']
+
+        index = db.get_embedding_index()
+        assert len(index.search(query, top_k=10, threshold=0.0)) == 6
+        summaries = index.search(query, top_k=10, threshold=0.0, filters={'chunk_types': ['summary']})
+        assert len(summaries) == 3 and all(r['chunk_type'] == 'summary' for r in summaries)
+
+        february_on = index.search(query, top_k=10, threshold=0.0, filters={'date_from': '2024-02-10'})
+        assert {r['meeting_id'] for r in february_on} == set(meeting_ids[1:])
+        january = index.hybrid_search(query, 'Transcript', top_k=10, threshold=0.0,
+                                      filters={'date_to': '2024-01-31', 'chunk_types': ['transcription']})
+        assert [(r['meeting_id'], r['chunk_type']) for r in january] == [(meeting_ids[0], 'transcription')]
+        assert index.search(query, filters={'date_from': '2025-01-01'}) == []
+
+        # Only the rows passing the mask are scored
+        mask = index.filter_mask(index._get_snapshot(), chunk_types=['summary'], date_to='2024-02-28')
+        candidates, _ = index._vector_candidates(query, index._get_snapshot(), mask=mask)
+        assert len(candidates) == 2
+
+        # Request arguments are checked, an unknown chunk type included
+        from app import search_filters
+        assert search_filters({'type': 'summary', 'from': '2024-02-10'}) == \
+            {'chunk_types': ['summary'], 'date_from': '2024-02-10'}
+        assert search_filters({'type': ''}) == {}
+        for args in ({'type': 'slides'}, {'from': 'May 1'}):
+            try:
+                search_filters(args)
+                assert False, f"{args} accepted"
+            except ValueError:
+                pass
+
+        print("✅ Search filter tests passed!")
+
+        # Cleanup
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_search_filters.db')
+
+    except Exception as e:
+        print(f"❌ Search filter tests failed: {e}")
+        return False
+
+    return True
+
+def test_batch_search():
+    """Test batched multi-query search matches one search per query"""
+    print("🔍 Testing batch search...")
+
+    try:
+        import numpy as np
+        from vector_index import VectorIndex
+
+        rng = np.random.default_rng(3)
+        vectors = rng.normal(size=(60, 16)).astype(np.float32)
+        rows = [
+            {'meeting_id': i // 6, 'chunk_index': i % 6, 'text_chunk': f'chunk {i}', 'embedding': vectors[i],
+             'chunk_type': 'summary' if i % 6 == 0 else 'transcription',
+             'meeting_date': f'2024-01-{1 + i // 6:02d}', 'metadata': {'title': ''}}
+            for i in range(60)
+        ]
+        queries = rng.normal(size=(7, 16))
+        full = {(row['meeting_id'], row['chunk_type'], row['chunk_index']): row['embedding'] for row in rows}
+
+        def keys(results):
+            return [(r['meeting_id'], r['chunk_index'], round(r['similarity'], 5)) for r in results]
+
+        for options in ({}, {'quantization': 'int8', 'full_vectors': lambda keys: [full[key] for key in keys]}):
+            index = VectorIndex(rows, **options)
+            for filters in (None, {'chunk_types': ['transcription'], 'date_from': '2024-01-04'}):
+                batch = index.search_many(queries, top_k=5, threshold=0.0, filters=filters)
+                assert len(batch) == len(queries)
+                for query, results in zip(queries, batch):
+                    assert keys(results) == keys(index.search(query, top_k=5, threshold=0.0, filters=filters))
+
+        assert VectorIndex().search_many(queries) == [[] for _ in queries]
+
+        # The endpoint validates its payload before touching the API
+        from app import app
+        with app.test_client() as client:
+            assert client.post('/api/search', json={}).status_code == 400
+            assert client.post('/api/search', json={'queries': ['budget'], 'from': 'May 1'}).status_code == 400
+            for top_k in (0, 101, 'ten'):
+                assert client.post('/api/search', json={'queries': ['budget'], 'top_k': top_k}).status_code == 400
+            assert client.post('/api/search', json={'queries': ['budget'], 'type': 'slides'}).status_code == 400
+
+        print("✅ Batch search tests passed!")
+
+    except Exception as e:
+        print(f"❌ Batch search tests failed: {e}")
+        return False
+
+    return True
+
+def test_coarse_search():
+    """Test coarse-to-fine search scores only the chunks of the best matching meetings"""
+    print("🔍 Testing coarse-to-fine search...")
+
+    try:
+        import numpy as np
+        from vector_index import VectorIndex
+
+        rng = np.random.default_rng(5)
+        directions = rng.normal(size=(6, 16))
+        rows = [
+            {'meeting_id': mid, 'chunk_index': i, 'text_chunk': '', 'metadata': {'title': ''},
+             'chunk_type': 'summary' if i == 0 else 'transcription',
+             'embedding': directions[mid] + rng.normal(scale=0.3, size=16)}
+            for mid in range(6) for i in range(4)
+        ]
+        query = directions[2] + rng.normal(scale=0.3, size=16)
+        exact = VectorIndex(rows).search(query, top_k=3, threshold=0.0)
+
+        # The coarse stage keeps the two closest meetings; their 8 chunks are all that is scored
+        index = VectorIndex(rows, coarse_meetings=2)
+        snapshot = index._get_snapshot()
+        candidates, _ = index._vector_candidates(query, snapshot)
+        assert len(candidates) == 8 and 2 in set(index.meeting_ids[candidates])
+        assert index.search(query, top_k=3, threshold=0.0) == exact
+        assert index.search_many([query], top_k=3, threshold=0.0) == [exact]
+
+        # Filters apply inside the coarse stage's meetings
+        results = index.search(query, top_k=5, threshold=-1.0, filters={'chunk_types': ['summary']})
+        assert len(results) == 2 and all(r['chunk_type'] == 'summary' for r in results)
+
+        # Centroids follow upserts: meeting 5 moves next to the query
+        index.upsert_meeting(5, [dict(row, meeting_id=5, embedding=query) for row in rows[8:12]])
+        assert index.search(query, top_k=1)[0]['meeting_id'] == 5
+        assert len(index._vector_candidates(query, index._get_snapshot(), exact=True)[0]) == 24
+
+        print("✅ Coarse-to-fine search tests passed!")
+
+    except Exception as e:
+        print(f"❌ Coarse-to-fine search tests failed: {e}")
+        return False
+
+    return True
+
+def test_sharded_search():
+    """Test scatter-gather search over shard worker processes matches the single index"""
+    print("🔍 Testing sharded search...")
+
+    try:
+        import database
+        import numpy as np
+        from shard_search import ShardServer, ShardedIndex, start_local_shards
+
+        rng = np.random.default_rng(6)
+        db = DatabaseManager('test_sharded_search.db')
+        for i in range(9):
+            meeting_id = db.create_meeting(f"Meeting {i}", "m.mp3", "/path/m.mp3")
+            db.save_transcription(meeting_id, "Text", [])
+            db.save_embeddings(meeting_id, [
+                {'text': f'budget item {j}' if i % 3 == 0 else f'notes {j}',
+                 'embedding': rng.normal(size=12), 'chunk_index': j}
+                for j in range(3)
+            ])
+        queries = rng.normal(size=(4, 12))
+
+        # Shards never run without a shared secret
+        for authkey in (b'', None):
+            try:
+                ShardedIndex([('127.0.0.1', 1)], authkey)
+                assert False, authkey
+            except ValueError:
+                pass
+            try:
+                ShardServer('test_sharded_search.db', 0, 1).serve(('127.0.0.1', 0), authkey)
+                assert False, authkey
+            except ValueError:
+                pass
+
+        processes, addresses = start_local_shards('test_sharded_search.db', 3, b'test-key')
+        sharded = ShardedIndex(addresses, b'test-key')
+        try:
+            def keys(results):
+                return [(r['meeting_id'], r['chunk_index'], round(r['similarity'], 5)) for r in results]
+
+            index = db.get_embedding_index()
+            assert len(sharded) == len(index) == 27
+            for query, results in zip(queries, sharded.search_many(queries, top_k=5, threshold=0.0)):
+                assert keys(results) == keys(index.search(query, top_k=5, threshold=0.0))
+            assert keys(sharded.search(queries[0], top_k=4, filters={'chunk_types': ['transcription']})) == \
+                keys(index.search(queries[0], top_k=4, filters={'chunk_types': ['transcription']}))
+            assert [m['meeting_id'] for m in sharded.meeting_scores(queries[1], exclude_meeting_id=1)] == \
+                [m['meeting_id'] for m in index.meeting_scores(queries[1], exclude_meeting_id=1)]
+            hybrid = sharded.hybrid_search(queries[2], 'budget', top_k=6, threshold=0.5)
+            assert {r['meeting_id'] for r in hybrid if r['lexical_score'] > 0} <= {1, 4, 7}
+
+            # Shards pick up meetings saved after they started
+            db.save_embeddings(5, [{'text': 'new', 'embedding': queries[3], 'chunk_index': 0}])
+            assert sharded.search(queries[3], top_k=1)[0]['meeting_id'] == 5
+            assert len(sharded) == 25
+        finally:
+            sharded.close()
+            for process in processes:
+                process.terminate()
+                process.join()
+
+        print("✅ Sharded search tests passed!")
+
+        # Cleanup
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_sharded_search.db')
+
+    except Exception as e:
+        print(f"❌ Sharded search tests failed: {e}")
+        return False
+
+    return True
+
+def test_local_embeddings():
+    """Test the local embedding model, its versioned vectors and the search fallback"""
+    print("🔍 Testing local embeddings...")
+    
+    try:
+        import numpy as np
+        import database
+        from semantic_search import SemanticSearchEngine
+        from local_embeddings import LocalEmbeddingProvider
+        
+        db = DatabaseManager('test_local_embeddings.db')
+        budget = db.create_meeting("Budget Review", "b.mp3", "/path/b.mp3")
+        db.save_transcription(budget, "We reviewed the budget. The finance team approved the budget.", [])
+        hiring = db.create_meeting("Hiring Sync", "h.mp3", "/path/h.mp3")
+        db.save_transcription(hiring, "We discussed hiring engineers. Interviews start next week.", [])
+        for title, text in [("Office Move", "The office move happens in May. Movers are booked."),
+                            ("Launch Plan", "Marketing prepares the product launch. Press release drafted.")]:
+            other = db.create_meeting(title, "o.mp3", "/path/o.mp3")
+            db.save_transcription(other, text, [])
+        
+        # No API key: OpenAI embedding fails, the local model stands in
+        search_engine = SemanticSearchEngine(None)
+        search_engine.EMBEDDING_RETRIES = 0
+        provider = search_engine.fit_local_embeddings(db)
+        assert provider.model_name.startswith(LocalEmbeddingProvider.MODEL_PREFIX)
+        assert db.count_embeddings(provider.model_name) == 4
+        assert db.count_embeddings() == 0
+        
+        assert search_engine.save_meeting_embeddings(db, budget, "Budget approved.", "Budget Review") == 1
+        assert db.count_embeddings() == 0
+        
+        fallback = db.get_embedding_index(model=provider.model_name)
+        results = search_engine.search_meetings("finance budget", db.get_embedding_index(),
+                                                similarity_threshold=0.0, fallback_embeddings=fallback)
+        assert results[0]['meeting_id'] == budget
+        
+        # The stored model reloads, and a local-only engine never needs the API
+        reloaded = LocalEmbeddingProvider.load(db, provider.model_name)
+        assert np.array_equal(reloaded.embed(["budget"]), provider.embed(["budget"]))
+        assert LocalEmbeddingProvider.from_bytes(provider.to_bytes()).model_name == provider.model_name
+        local_engine = SemanticSearchEngine(None, provider='local', local_provider=reloaded)
+        assert local_engine.embedding_model == provider.model_name
+        assert len(local_engine.embed_query("hiring")) == len(provider.components)
+        
+        # Refitting replaces the vectors of the previous version
+        db.save_transcription(hiring, "We discussed hiring engineers and the interview budget.", [])
+        refitted = search_engine.fit_local_embeddings(db)
+        assert refitted.model_name != provider.model_name
+        assert db.count_embeddings(provider.model_name) == 0
+        assert db.get_latest_embedding_model_name(LocalEmbeddingProvider.MODEL_PREFIX) == refitted.model_name
+        assert db._index_key(provider.model_name) not in database._embedding_indexes
+        
+        # A fit only deletes older models, never one a concurrent fit stored after it
+        prefix = LocalEmbeddingProvider.MODEL_PREFIX
+        newer = LocalEmbeddingProvider(n_components=2).fit(["budget review", "hiring plan", "office move"])
+        newer.save(db)
+        db.save_embeddings(hiring, [{'text': 'hiring', 'embedding': newer.embed(["hiring"])[0], 'chunk_index': 0}],
+                           model=newer.model_name, update_derived=False)
+        db.delete_embedding_models(prefix, keep=refitted.model_name)
+        assert db.get_embedding_model(newer.model_name) is not None and db.count_embeddings(newer.model_name) == 1
+        assert db.count_embeddings(refitted.model_name) > 0
+        db.delete_embedding_models(prefix, keep=newer.model_name)
+        assert db.get_embedding_model(refitted.model_name) is None and db.count_embeddings(refitted.model_name) == 0
+        
+        # Only one worker at a time can claim a fit; stale claims expire
+        assert db.claim_embedding_model_fit(prefix)
+        assert not db.claim_embedding_model_fit(prefix)
+        conn = db._connect()
+        conn.execute("UPDATE embedding_model_fits SET claimed_at = datetime('now', '-2 hours')")
+        conn.commit()
+        conn.close()
+        assert db.claim_embedding_model_fit(prefix)
+        db.release_embedding_model_fit(prefix)
+        assert db.claim_embedding_model_fit(prefix)
+        db.release_embedding_model_fit(prefix)
+        
+        # The app fits its first model in the background and is unavailable until then
+        import app as app_module
+        app_db, app_provider = app_module.db, app_module.app.config['EMBEDDING_PROVIDER']
+        fresh = DatabaseManager('test_local_provider.db')
+        meeting = fresh.create_meeting("Budget Review", "b.mp3", "/path/b.mp3")
+        fresh.save_transcription(meeting, "We reviewed the budget. The finance team approved the budget.", [])
+        app_module.db, app_module.app.config['EMBEDDING_PROVIDER'] = fresh, 'local'
+        app_module.local_provider = app_module.local_provider_generation = None
+        try:
+            assert app_module.get_local_provider() is None
+            assert not app_module.semantic_search_available()
+            app_module.local_refit_thread.join()
+            provider = app_module.get_local_provider()
+            assert provider is not None and app_module.semantic_search_available()
+            
+            # Without embedding changes the vector count is not queried again
+            counts = []
+            count_embeddings = fresh.count_embeddings
+            fresh.count_embeddings = lambda *args: counts.append(args) or count_embeddings(*args)
+            for _ in range(3):
+                assert app_module.get_local_provider() is provider
+            assert counts == []
+        finally:
+            app_module.db, app_module.app.config['EMBEDDING_PROVIDER'] = app_db, app_provider
+            app_module.local_provider = app_module.local_provider_generation = None
+        
+        print("✅ Local embeddings tests passed!")
+        
+        # Cleanup
+        database._embedding_indexes.clear()
+        db.close()
+        os.remove('test_local_embeddings.db')
+        fresh.close()
+        os.remove('test_local_provider.db')
+        
+    except Exception as e:
+        print(f"❌ Local embeddings tests failed: {e}")
+        return False
+    
+    return True
+
 def test_visual_synthesis():
     """Test visual synthesis engine (without API calls)"""
     print("🔍 Testing visual synthesis engine...")
@@ -324,6 +1805,7 @@ def test_translation_database():
         print("✅ Translation database tests passed!")
         
         # Cleanup
+        db.close()
         os.remove('test_translation_db.db')
         
     except Exception as e:
@@ -389,9 +1871,34 @@ def main():
         check_environment,
         test_config,
         test_database,
+        test_connection_manager,
+        test_transactions,
+        test_schema_migrations,
+        test_meeting_bundle,
+        test_meeting_pagination,
         test_audio_processor,
         test_content_analyzer,
         test_semantic_search,
+        test_vector_index,
+        test_embedding_index_sync,
+        test_embedding_storage,
+        test_quantized_index,
+        test_prefix_dimensions,
+        test_index_snapshot,
+        test_ivf_index,
+        test_query_embedding_cache,
+        test_materialized_insights,
+        test_meeting_neighbors,
+        test_topic_clusters,
+        test_embedding_batching,
+        test_chunk_embedding_store,
+        test_full_text_search,
+        test_hybrid_search,
+        test_search_filters,
+        test_batch_search,
+        test_coarse_search,
+        test_sharded_search,
+        test_local_embeddings,
         test_visual_synthesis,
         test_translation_processor,
         test_translation_database,
@@ -0,0 +1,68 @@
+import pickle
+import numpy as np
+from typing import Dict, List
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+from vector_index import VectorIndex
+
+
+class TopicModel:
+    """Topic clusters over chunk embeddings, updated one meeting at a time with MiniBatchKMeans.partial_fit
+
+    Vectors are normalized first, so clusters group chunks by cosine similarity. A meeting belongs
+    to the cluster nearest to the mean of its chunks.
+    """
+
+    def __init__(self, n_clusters: int = 8, random_state: int = 0):
+        self.n_clusters = n_clusters
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3)
+
+    @property
+    def ready(self) -> bool:
+        return hasattr(self.kmeans, 'cluster_centers_')
+
+    def partial_fit(self, vectors) -> bool:
+        """Move the centroids towards the given vectors; False until enough have been seen to start"""
+        vectors = VectorIndex.normalize(vectors)
+        if not self.ready and len(vectors) < self.n_clusters:
+            return False
+        self.kmeans.partial_fit(vectors)
+        return True
+
+    def assign(self, vectors) -> Dict:
+        """The cluster of a meeting given its chunk vectors, and the cosine similarity to its centroid"""
+        mean = VectorIndex.normalize(VectorIndex.normalize(vectors).mean(axis=0))[0]
+        centroids = VectorIndex.normalize(self.kmeans.cluster_centers_)
+        scores = centroids @ mean
+        cluster = int(np.argmax(scores))
+        return {'cluster': cluster, 'similarity': float(scores[cluster])}
+
+    def to_bytes(self) -> bytes:
+        return pickle.dumps(self.kmeans)
+
+    @classmethod
+    def from_bytes(cls, state: bytes) -> 'TopicModel':
+        kmeans = pickle.loads(state)
+        model = cls(n_clusters=kmeans.n_clusters)
+        model.kmeans = kmeans
+        return model
+
+    @staticmethod
+    def label_clusters(documents: Dict[int, List[str]], n_terms: int = 4) -> Dict[int, str]:
+        """Label each cluster with the terms that best set its meetings' text apart (TF-IDF across clusters)"""
+        clusters = [cluster for cluster, texts in documents.items() if texts]
+        if not clusters:
+            return {}
+        vectorizer = TfidfVectorizer(stop_words='english', sublinear_tf=True, max_features=50000,
+                                     token_pattern=r'(?u)\b[a-zA-Z][a-zA-Z]+\b')
+        try:
+            weights = vectorizer.fit_transform([' '.join(documents[cluster]) for cluster in clusters]).toarray()
+        except ValueError:
+            return {cluster: '' for cluster in clusters}  # Only stop words
+        terms = vectorizer.get_feature_names_out()
+
+        labels = {}
+        for cluster, row in zip(clusters, weights):
+            top = [i for i in np.argsort(-row, kind='stable')[:n_terms] if row[i] > 0]
+            labels[cluster] = ', '.join(terms[i] for i in top)
+        return labels
@@ -0,0 +1,843 @@
+import os
+import json
+import threading
+import numpy as np
+import scipy.sparse as sp
+from typing import Callable, Dict, List, Optional, Tuple
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer
+
+
+class QuantizedMatrix:
+    """Row vectors stored as float16, or as int8 with a per-row scale, dequantized in chunks on use"""
+
+    CHUNK_ROWS = 256  # Rows dequantized at a time when scoring
+
+    def __init__(self, values: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.values = values
+        self.scales = scales  # Only for int8: the float32 value of one quantization step per row
+
+    @classmethod
+    def quantize(cls, matrix: np.ndarray, dtype: str) -> 'QuantizedMatrix':
+        if dtype == 'float16':
+            return cls(matrix.astype(np.float16))
+        if dtype == 'int8':
+            scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.zeros(0)
+            scales = scales.astype(np.float32)
+            scales[scales == 0] = 1.0
+            values = np.rint(matrix / scales[:, None]).astype(np.int8)
+            return cls(values, scales)
+        raise ValueError(f"Unsupported quantization: {dtype}")
+
+    @classmethod
+    def concat(cls, parts: List['QuantizedMatrix']) -> 'QuantizedMatrix':
+        scales = None
+        if parts[0].scales is not None:
+            scales = np.concatenate([part.scales for part in parts])
+        return cls(np.vstack([part.values for part in parts]), scales)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __getitem__(self, key) -> np.ndarray:
+        """Dequantized float32 rows"""
+        rows = self.values[key].astype(np.float32)
+        if self.scales is not None:
+            rows *= self.scales[key][..., None]
+        return rows
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        other = np.asarray(other, dtype=np.float32)
+        result = np.empty((len(self),) + other.shape[1:], dtype=np.float32)
+        for start in range(0, len(self), self.CHUNK_ROWS):
+            end = start + self.CHUNK_ROWS
+            chunk = self.values[start:end].astype(np.float32) @ other
+            if self.scales is not None:
+                # The per-row scale factors out of the dot product
+                chunk *= self.scales[start:end].reshape((-1,) + (1,) * (other.ndim - 1))
+            result[start:end] = chunk
+        return result
+
+
+class SegmentedMatrix:
+    """Rows of several matrices read as one, without copying them (e.g. memory-mapped runs plus new rows)"""
+
+    def __init__(self, parts: List[np.ndarray]):
+        self.parts = parts
+        self.offsets = np.cumsum([0] + [len(part) for part in parts])
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self), self.parts[0].shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(part.nbytes for part in self.parts)
+
+    def __getitem__(self, key) -> np.ndarray:
+        """Copies of the selected rows"""
+        if isinstance(key, slice) and key.step in (None, 1):
+            start, stop, _ = key.indices(len(self))
+            pieces = [
+                part[max(start - offset, 0):max(stop - offset, 0)]
+                for part, offset in zip(self.parts, self.offsets)
+            ]
+            return np.concatenate(pieces)
+
+        indices = np.arange(len(self))[key]
+        if np.ndim(indices) == 0:
+            part = np.searchsorted(self.offsets, indices, side='right') - 1
+            return np.array(self.parts[part][indices - self.offsets[part]])
+
+        part_ids = np.searchsorted(self.offsets, indices, side='right') - 1
+        rows = np.empty((len(indices), self.shape[1]), dtype=self.parts[0].dtype)
+        for part in np.unique(part_ids):
+            mask = part_ids == part
+            rows[mask] = self.parts[part][indices[mask] - self.offsets[part]]
+        return rows
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        return np.concatenate([part @ other for part in self.parts])
+
+
+class VectorIndex:
+    """In-memory matrix of pre-normalized chunk embeddings for fast cosine scoring
+    
+    With quantization ('float16' or 'int8') the vectors are held at reduced precision, and with
+    dimensions only that many leading components are kept (text-embedding-3 vectors stay useful
+    when truncated and renormalized). Searches score the reduced vectors first and re-score a
+    shortlist at full precision when full_vectors is given: it receives the shortlisted
+    (meeting_id, chunk_type, chunk_index) keys and returns their vectors in order (None if
+    gone). With coarse_meetings, a query first ranks one centroid per meeting and then scores
+    only the chunks of the top meetings.
+    """
+
+    def __init__(self, rows: List[Dict] = None, generation: int = 0, quantization: Optional[str] = None,
+                 dimensions: Optional[int] = None,
+                 full_vectors: Optional[Callable[[List[Tuple]], List[Optional[np.ndarray]]]] = None,
+                 rerank_factor: int = 4,
+                 coarse_meetings: Optional[int] = None):
+        self.generation = generation  # Last embedding change applied to this index
+        self.quantization = quantization
+        self.dimensions = dimensions  # Leading components kept in memory (None = all)
+        self.full_vectors = full_vectors
+        self.rerank_factor = rerank_factor  # Shortlist size per requested result when re-ranking
+        self.coarse_meetings = coarse_meetings  # Score only the chunks of this many best-matching meetings
+        self._lock = threading.Lock()
+        self._blocks: Dict[int, Tuple[List[Dict], np.ndarray]] = {}
+        self._snapshot = None
+        self._columns = None  # (snapshot, filter columns) built on the first filtered query
+        self._centroids = None  # (snapshot, meeting centroids, block starts, block ends) for coarse search
+        self._block_centroids: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}  # meeting_id -> (block, centroid)
+        self.ann: Optional['IVFIndex'] = None  # Optional approximate index over the same vectors
+        self.lexical = LexicalIndex()  # BM25 over the chunk text, built on first hybrid query
+        self._base: Optional[np.ndarray] = None  # Memory-mapped snapshot matrix, shared with other workers
+        self._base_ranges: Dict[int, Tuple[int, int, np.ndarray]] = {}  # meeting_id -> (start, end, view)
+        self.snapshot_path: Optional[str] = None  # Where save_snapshot writes, if snapshots are enabled
+        self._snapshot_writer: Optional[threading.Thread] = None
+        self._snapshot_dirty = False
+        if rows:
+            self.build(rows)
+
+    def __len__(self) -> int:
+        return sum(len(block_rows) for block_rows, _ in self._blocks.values())
+
+    def __contains__(self, meeting_id: int) -> bool:
+        return meeting_id in self._blocks
+
+    @staticmethod
+    def normalize(vectors) -> np.ndarray:
+        """Return float32 copies of the vectors scaled to unit length (zero vectors stay zero)"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @staticmethod
+    def row_info(item: Dict) -> Dict:
+        """Extract the display fields of a chunk, accepting both pipeline and database rows"""
+        metadata = item.get('metadata') or {}
+        return {
+            'meeting_id': item['meeting_id'],
+            'chunk_type': item.get('chunk_type') or metadata.get('type', 'transcription'),
+            'chunk_index': item.get('chunk_index', 0),
+            'text': item['text'] if 'text' in item else item.get('text_chunk', ''),
+            'meeting_date': item.get('meeting_date'),
+            'metadata': metadata
+        }
+
+    def build(self, rows: List[Dict]):
+        """Load chunk rows (each with an 'embedding') into the index, replacing its contents"""
+        grouped: Dict[int, List[Dict]] = {}
+        for item in rows:
+            grouped.setdefault(item['meeting_id'], []).append(item)
+
+        blocks = {mid: self._make_block(items) for mid, items in grouped.items()}
+        with self._lock:
+            self._blocks = blocks
+            self._base = None
+            self._base_ranges = {}
+            self._snapshot = None
+
+    def _make_block(self, items: List[Dict]) -> Tuple[List[Dict], np.ndarray]:
+        block_matrix = self.normalize([item['embedding'][:self.dimensions] for item in items])
+        if self.quantization:
+            block_matrix = QuantizedMatrix.quantize(block_matrix, self.quantization)
+        return [self.row_info(item) for item in items], block_matrix
+
+    def upsert_meeting(self, meeting_id: int, rows: List[Dict]):
+        """Replace the chunks of a single meeting without touching the rest of the index"""
+        if not rows:
+            self.remove_meeting(meeting_id)
+            return
+
+        block = self._make_block(rows)
+        with self._lock:
+            self._blocks[meeting_id] = block
+            self._snapshot = None
+
+    def remove_meeting(self, meeting_id: int):
+        """Drop all chunks of a meeting from the index"""
+        with self._lock:
+            if self._blocks.pop(meeting_id, None) is not None:
+                self._snapshot = None
+
+    def _get_snapshot(self) -> Tuple[List[Dict], np.ndarray, np.ndarray, List[Tuple[int, np.ndarray]]]:
+        """Consolidate the per-meeting blocks into one matrix, rebuilt only after a change"""
+        with self._lock:
+            if self._snapshot is None:
+                rows: List[Dict] = []
+                blocks = []
+                for meeting_id, (block_rows, block_matrix) in self._blocks.items():
+                    rows.extend(block_rows)
+                    blocks.append((meeting_id, block_matrix))
+                meeting_ids = np.array([row['meeting_id'] for row in rows], dtype=np.int64)
+                if blocks and self.quantization:
+                    matrix = QuantizedMatrix.concat([block_matrix for _, block_matrix in blocks])
+                elif blocks and self._base is not None:
+                    matrix = self._stack_over_base(blocks)
+                elif blocks:
+                    matrix = np.vstack([block_matrix for _, block_matrix in blocks])
+                else:
+                    matrix = np.zeros((0, 0), dtype=np.float32)
+                self._snapshot = (rows, meeting_ids, matrix, blocks)
+            return self._snapshot
+
+    def _stack_over_base(self, blocks: List[Tuple[int, np.ndarray]]):
+        """Stack blocks, reusing contiguous runs of the memory-mapped snapshot instead of copying them"""
+        parts = []  # ['base', start, end] or ['private', [block matrices]]
+        for meeting_id, block_matrix in blocks:
+            base_range = self._base_ranges.get(meeting_id)
+            if base_range is not None and base_range[2] is block_matrix:
+                if parts and parts[-1][0] == 'base' and parts[-1][2] == base_range[0]:
+                    parts[-1][2] = base_range[1]
+                else:
+                    parts.append(['base', base_range[0], base_range[1]])
+            elif parts and parts[-1][0] == 'private':
+                parts[-1][1].append(block_matrix)
+            else:
+                parts.append(['private', [block_matrix]])
+
+        arrays = [self._base[part[1]:part[2]] if part[0] == 'base' else np.vstack(part[1]) for part in parts]
+        return arrays[0] if len(arrays) == 1 else SegmentedMatrix(arrays)
+
+    def save_snapshot(self, path: str):
+        """Write the vectors to path.<generation>.npy and the rows to path.json
+        
+        The JSON sidecar names the matrix file and is replaced atomically, so readers always see
+        a complete snapshot. Quantized indexes are not snapshotted.
+        """
+        generation = self.generation  # Read first: the contents include at least this generation
+        rows, _, matrix, _ = self._get_snapshot()
+        if self.quantization or not rows:
+            return
+
+        directory = os.path.dirname(path) or '.'
+        prefix = os.path.basename(path)
+        os.makedirs(directory, exist_ok=True)
+        matrix_file = f"{prefix}.{generation}.{os.getpid()}.npy"
+        out = np.lib.format.open_memmap(os.path.join(directory, matrix_file), mode='w+',
+                                        dtype=np.float32, shape=matrix.shape)
+        for start in range(0, len(rows), 8192):
+            out[start:start + 8192] = matrix[start:start + 8192]
+        out.flush()
+        del out
+
+        metadata = {'generation': generation, 'matrix_file': matrix_file,
+                    'dimensions': self.dimensions, 'rows': rows}
+        temp_path = f"{path}.json.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(metadata, f)
+        os.replace(temp_path, f"{path}.json")
+
+        # Older matrices stay readable for workers that still map them (the inode lives on)
+        for name in os.listdir(directory):
+            parts = name[len(prefix) + 1:].split('.')
+            if (name.startswith(prefix + '.') and name.endswith('.npy') and name != matrix_file
+                    and parts[0].isdigit() and int(parts[0]) <= generation):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    def schedule_snapshot_save(self):
+        """Rewrite the snapshot in a background thread, coalescing changes made while it runs"""
+        if self.snapshot_path is None:
+            return
+        with self._lock:
+            self._snapshot_dirty = True
+            if self._snapshot_writer is not None and self._snapshot_writer.is_alive():
+                return
+            self._snapshot_writer = threading.Thread(target=self._write_snapshots, daemon=True)
+            self._snapshot_writer.start()
+
+    def _write_snapshots(self):
+        while True:
+            with self._lock:
+                if not self._snapshot_dirty:
+                    self._snapshot_writer = None
+                    return
+                self._snapshot_dirty = False
+            try:
+                self.save_snapshot(self.snapshot_path)
+            except Exception as e:
+                print(f"Warning: Could not write index snapshot: {e}")
+
+    @classmethod
+    def load_snapshot(cls, path: str, **kwargs) -> Optional['VectorIndex']:
+        """Open a snapshot written by save_snapshot with the matrix memory-mapped, or None if unusable"""
+        try:
+            with open(f"{path}.json") as f:
+                metadata = json.load(f)
+            matrix = np.load(os.path.join(os.path.dirname(path) or '.', metadata['matrix_file']), mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None
+        if metadata.get('dimensions') != kwargs.get('dimensions') or kwargs.get('quantization'):
+            return None
+        if metadata['rows'] and 'meeting_date' not in metadata['rows'][0]:
+            return None  # Written before rows carried the filter fields
+
+        index = cls(generation=metadata['generation'], **kwargs)
+        rows = metadata['rows']
+        blocks = {}
+        base_ranges = {}
+        start = 0
+        for end in range(1, len(rows) + 1):
+            if end == len(rows) or rows[end]['meeting_id'] != rows[start]['meeting_id']:
+                view = matrix[start:end]
+                blocks[rows[start]['meeting_id']] = (rows[start:end], view)
+                base_ranges[rows[start]['meeting_id']] = (start, end, view)
+                start = end
+
+        index._blocks = blocks
+        index._base = matrix
+        index._base_ranges = base_ranges
+        index.snapshot_path = path
+        return index
+
+    def enable_ann(self, ann: 'IVFIndex'):
+        """Attach an approximate index; it trains in the background once the corpus is large enough"""
+        self.ann = ann
+        ann.maybe_rebuild(self)
+
+    @property
+    def rows(self) -> List[Dict]:
+        return self._get_snapshot()[0]
+
+    @property
+    def meeting_ids(self) -> np.ndarray:
+        return self._get_snapshot()[1]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._get_snapshot()[2]
+
+    @property
+    def reduced(self) -> bool:
+        """Whether the in-memory vectors are an approximation of the stored ones"""
+        return bool(self.quantization or self.dimensions)
+
+    def prepare_query(self, query_vector) -> np.ndarray:
+        """Normalized query vector matching the in-memory vectors (truncated like them)"""
+        return self.normalize(np.asarray(query_vector)[:self.dimensions])[0]
+
+    def scores(self, query_vector, snapshot=None) -> np.ndarray:
+        """Cosine similarity of the query against every chunk"""
+        rows, _, matrix, _ = snapshot or self._get_snapshot()
+        if not rows:
+            return np.zeros(0, dtype=np.float32)
+        return matrix @ self.prepare_query(query_vector)
+
+    def _filter_columns(self, snapshot) -> Dict[str, np.ndarray]:
+        """Per-row chunk type and meeting date arrays, aligned with the snapshot matrix"""
+        cached = self._columns
+        if cached is not None and cached[0] is snapshot:
+            return cached[1]
+        rows = snapshot[0]
+        columns = {
+            'chunk_type': np.array([row['chunk_type'] for row in rows], dtype=str),
+            'meeting_date': np.array([(row.get('meeting_date') or 'NaT')[:10] for row in rows],
+                                     dtype='datetime64[D]'),
+        }
+        self._columns = (snapshot, columns)
+        return columns
+
+    def filter_mask(self, snapshot, chunk_types: Optional[List[str]] = None,
+                    date_from=None, date_to=None) -> Optional[np.ndarray]:
+        """Boolean mask of the rows passing the filters, or None when nothing is filtered
+        
+        Dates are inclusive and compared by day; chunks of undated meetings never match a date filter.
+        """
+        if not chunk_types and date_from is None and date_to is None:
+            return None
+        columns = self._filter_columns(snapshot)
+        mask = np.ones(len(snapshot[0]), dtype=bool)
+        if chunk_types:
+            mask &= np.isin(columns['chunk_type'], list(chunk_types))
+        if date_from is not None:
+            mask &= columns['meeting_date'] >= np.datetime64(str(date_from)[:10], 'D')
+        if date_to is not None:
+            mask &= columns['meeting_date'] <= np.datetime64(str(date_to)[:10], 'D')
+        return mask
+
+    def _meeting_centroids(self, snapshot) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """One unit vector per meeting (the mean chunk direction) and each meeting's row range
+        
+        Centroids are recomputed only for blocks that changed since the last call.
+        """
+        cached = self._centroids
+        if cached is not None and cached[0] is snapshot:
+            return cached[1], cached[2], cached[3]
+
+        blocks = snapshot[3]
+        block_centroids = {}
+        for meeting_id, block_matrix in blocks:
+            cached_block = self._block_centroids.get(meeting_id)
+            if cached_block is None or cached_block[0] is not block_matrix:
+                mean = np.asarray(block_matrix[:], dtype=np.float32).mean(axis=0)
+                cached_block = (block_matrix, self.normalize(mean)[0])
+            block_centroids[meeting_id] = cached_block
+        self._block_centroids = block_centroids
+
+        lengths = np.array([len(block_matrix) for _, block_matrix in blocks], dtype=np.int64)
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        if blocks:
+            centroids = np.vstack([block_centroids[meeting_id][1] for meeting_id, _ in blocks])
+        else:
+            centroids = np.zeros((0, 0), dtype=np.float32)
+        self._centroids = (snapshot, centroids, starts, ends)
+        return centroids, starts, ends
+
+    def _coarse_candidates(self, snapshot, query: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Rows of the coarse_meetings meetings whose centroids best match the query
+        
+        Meetings without a row passing the filter mask are skipped, so they do not take a place.
+        """
+        centroids, starts, ends = self._meeting_centroids(snapshot)
+        if not len(centroids):
+            return np.zeros(0, dtype=np.int64)
+        scores = centroids @ query
+        if mask is not None:
+            scores[np.add.reduceat(mask, starts) == 0] = -np.inf
+        top = self.top_k_indices(scores, self.coarse_meetings)
+        top = np.sort(top[np.isfinite(scores[top])])
+        if not len(top):
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(starts[i], ends[i]) for i in top])
+
+    @staticmethod
+    def top_k_indices(scores: np.ndarray, top_k: int, threshold: Optional[float] = None) -> np.ndarray:
+        """Indices of the top_k scores above the threshold, highest first (ties keep row order)"""
+        candidates = np.arange(len(scores))
+        if threshold is not None:
+            candidates = candidates[scores >= threshold]
+        if top_k is not None and len(candidates) > top_k:
+            partition = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+            candidates = np.sort(candidates[partition])
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order]
+
+    def _vector_candidates(self, query_vector, snapshot, exact: bool = False,
+                           top_k: Optional[int] = None,
+                           mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows to consider for a query and their cosine scores (only the probed lists with ANN)
+        
+        With coarse_meetings set, only the chunks of the best matching meetings are scored (this
+        takes the place of the ANN lists). Rows outside the filter mask are dropped before scoring,
+        so a selective filter scans proportionally fewer vectors. On a quantized or truncated index
+        with full vectors available, the best top_k * rerank_factor rows are re-scored at full
+        precision and only those are returned.
+        """
+        rows, _, matrix, _ = snapshot
+        query = self.prepare_query(query_vector)
+
+        candidates = None
+        if self.coarse_meetings and not exact:
+            candidates = self._coarse_candidates(snapshot, query, mask)
+        elif self.ann is not None and not exact:
+            self.ann.maybe_rebuild(self)
+            candidates = self.ann.candidates(snapshot, query)
+        if mask is not None:
+            candidates = np.flatnonzero(mask) if candidates is None else candidates[mask[candidates]]
+
+        if candidates is None:
+            # Exact search: score every chunk
+            candidates, scores = np.arange(len(rows)), self.scores(query_vector, snapshot)
+        else:
+            scores = np.zeros(len(rows), dtype=np.float32)
+            if len(candidates):
+                scores[candidates] = matrix[candidates] @ query
+
+        if self.reduced and self.full_vectors is not None and top_k is not None:
+            shortlist = max(top_k * self.rerank_factor, 50)
+            candidates = candidates[self.top_k_indices(scores[candidates], shortlist)]
+            self._rerank(snapshot, candidates, query_vector, scores)
+        return candidates, scores
+
+    def _rerank(self, snapshot, candidates: np.ndarray, query_vector, scores: np.ndarray):
+        """Overwrite the scores of the candidate rows with full-precision cosine similarity"""
+        rows = snapshot[0]
+        keys = [(int(rows[i]['meeting_id']), rows[i]['chunk_type'], int(rows[i]['chunk_index']))
+                for i in candidates]
+        vectors = self.full_vectors(keys) if keys else []
+        found = [i for i, vector in enumerate(vectors) if vector is not None]
+        if not found:
+            return  # Changed underneath us; keep the reduced scores until the next sync
+        query = self.normalize(query_vector)[0]
+        scores[candidates[found]] = self.normalize(np.stack([vectors[i] for i in found])) @ query
+
+    def search(self, query_vector, top_k: int = 10, threshold: Optional[float] = None,
+               exact: bool = False, filters: Optional[Dict] = None) -> List[Dict]:
+        """Return the best matching chunks for a query vector
+        
+        filters takes the keyword arguments of filter_mask (chunk_types, date_from, date_to).
+        """
+        snapshot = self._get_snapshot()
+        rows = snapshot[0]
+        mask = self.filter_mask(snapshot, **(filters or {}))
+        candidates, scores = self._vector_candidates(query_vector, snapshot, exact, top_k=top_k, mask=mask)
+
+        results = []
+        for i in candidates[self.top_k_indices(scores[candidates], top_k, threshold)]:
+            result = dict(rows[i])
+            result['similarity'] = float(scores[i])
+            results.append(result)
+        return results
+
+    def search_many(self, query_vectors, top_k: int = 10, threshold: Optional[float] = None,
+                    exact: bool = False, filters: Optional[Dict] = None) -> List[List[Dict]]:
+        """Best matching chunks for each of several query vectors, scored with one matrix-matrix product
+        
+        With coarse search or a trained ANN index (and exact=False) each query picks its own
+        candidates instead.
+        """
+        if (self.coarse_meetings or (self.ann is not None and self.ann.ready)) and not exact:
+            return [self.search(query_vector, top_k, threshold, filters=filters) for query_vector in query_vectors]
+
+        snapshot = self._get_snapshot()
+        rows, _, matrix, _ = snapshot
+        if not rows or not len(query_vectors):
+            return [[] for _ in query_vectors]
+
+        mask = self.filter_mask(snapshot, **(filters or {}))
+        candidates = np.arange(len(rows)) if mask is None else np.flatnonzero(mask)
+        queries = np.stack([self.prepare_query(query_vector) for query_vector in query_vectors])
+        candidate_matrix = matrix if mask is None else matrix[candidates]
+        batch_scores = np.ascontiguousarray((candidate_matrix @ queries.T).T)  # One row per query
+
+        rerank = self.reduced and self.full_vectors is not None
+        results = []
+        for query_vector, query_scores in zip(query_vectors, batch_scores):
+            if rerank:
+                positions = self.top_k_indices(query_scores, max(top_k * self.rerank_factor, 50))
+                shortlist = candidates[positions]
+                scores = np.zeros(len(rows), dtype=np.float32)
+                scores[shortlist] = query_scores[positions]
+                self._rerank(snapshot, shortlist, query_vector, scores)
+                best = shortlist[self.top_k_indices(scores[shortlist], top_k, threshold)]
+                best_scores = scores[best]
+            else:
+                positions = self.top_k_indices(query_scores, top_k, threshold)
+                best, best_scores = candidates[positions], query_scores[positions]
+
+            query_results = []
+            for i, score in zip(best, best_scores):
+                result = dict(rows[i])
+                result['similarity'] = float(score)
+                query_results.append(result)
+            results.append(query_results)
+        return results
+
+    def _hybrid_ranked(self, query_vector, query_text: str, top_k: int, depth: int, threshold: Optional[float],
+                       exact: bool, filters: Optional[Dict]):
+        """Row indices of the top `depth` vector and BM25 matches, with both score arrays
+        
+        A re-ranked vector ranking stops at the top_k shortlist, so the full vectors read per
+        query follow the results asked for rather than the fusion depth.
+        """
+        snapshot = self._get_snapshot()
+        mask = self.filter_mask(snapshot, **(filters or {}))
+        candidates, scores = self._vector_candidates(query_vector, snapshot, exact, top_k=top_k, mask=mask)
+        vector_ranked = candidates[self.top_k_indices(scores[candidates], depth, threshold)]
+
+        lexical_scores = self.lexical.scores(snapshot, query_text)
+        if mask is not None:
+            lexical_scores[~mask] = 0
+        lexical_ranked = self.top_k_indices(lexical_scores, depth, threshold=1e-9)
+        return snapshot[0], vector_ranked, lexical_ranked, scores, lexical_scores
+
+    def hybrid_search(self, query_vector, query_text: str, top_k: int = 10,
+                      threshold: Optional[float] = None, exact: bool = False,
+                      depth: int = 100, rrf_k: int = 60, filters: Optional[Dict] = None) -> List[Dict]:
+        """Fuse the vector and BM25 rankings with reciprocal rank fusion
+        
+        Each ranking contributes 1 / (rrf_k + rank) for its top `depth` rows. The similarity
+        threshold only gates the vector ranking, so exact keyword matches still come through.
+        """
+        rows, vector_ranked, lexical_ranked, scores, lexical_scores = self._hybrid_ranked(
+            query_vector, query_text, top_k, depth, threshold, exact, filters)
+
+        fused = np.zeros(len(rows))
+        for ranked in (vector_ranked, lexical_ranked):
+            fused[ranked] += 1.0 / (rrf_k + np.arange(1, len(ranked) + 1))
+
+        matched = np.union1d(vector_ranked, lexical_ranked)
+        results = []
+        for i in matched[self.top_k_indices(fused[matched], top_k)]:
+            result = dict(rows[i])
+            result['similarity'] = float(scores[i])
+            result['lexical_score'] = float(lexical_scores[i])
+            result['fusion_score'] = float(fused[i])
+            results.append(result)
+        return results
+
+    def hybrid_rankings(self, query_vector, query_text: str, top_k: int = 10, depth: int = 100,
+                        threshold: Optional[float] = None, exact: bool = False,
+                        filters: Optional[Dict] = None) -> Tuple[List[Dict], List[Dict]]:
+        """The vector and BM25 rankings that hybrid_search fuses, as result lists with both scores
+        
+        Lets a caller merge the rankings of several partial indexes before fusing them.
+        """
+        rows, vector_ranked, lexical_ranked, scores, lexical_scores = self._hybrid_ranked(
+            query_vector, query_text, top_k, depth, threshold, exact, filters)
+
+        def results(ranked):
+            ranking = []
+            for i in ranked:
+                result = dict(rows[i])
+                result['similarity'] = float(scores[i])
+                result['lexical_score'] = float(lexical_scores[i])
+                ranking.append(result)
+            return ranking
+        return results(vector_ranked), results(lexical_ranked)
+
+    @staticmethod
+    def fuse_rankings(vector_results: List[Dict], lexical_results: List[Dict], top_k: int = 10,
+                      rrf_k: int = 60) -> List[Dict]:
+        """Reciprocal rank fusion of two ranked result lists (chunks matched by meeting, type and index)"""
+        fused: Dict[Tuple, Dict] = {}
+        for ranking in (vector_results, lexical_results):
+            for rank, result in enumerate(ranking, start=1):
+                key = (result['meeting_id'], result['chunk_type'], result['chunk_index'])
+                entry = fused.setdefault(key, dict(result, fusion_score=0.0))
+                entry['fusion_score'] += 1.0 / (rrf_k + rank)
+        return sorted(fused.values(), key=lambda r: (-r['fusion_score'], r['meeting_id'],
+                                                     r['chunk_type'], r['chunk_index']))[:top_k]
+
+    def meeting_scores(self, query_vector, exclude_meeting_id: int = None) -> List[Dict]:
+        """Average chunk similarity per meeting, highest first"""
+        snapshot = self._get_snapshot()
+        meeting_ids = snapshot[1]
+        scores = self.scores(query_vector, snapshot)
+        mask = meeting_ids != exclude_meeting_id if exclude_meeting_id is not None else slice(None)
+        ids, inverse, counts = np.unique(meeting_ids[mask], return_inverse=True, return_counts=True)
+        if not len(ids):
+            return []
+        totals = np.bincount(inverse, weights=scores[mask], minlength=len(ids))
+        averages = totals / counts
+
+        meeting_scores = [
+            {'meeting_id': int(mid), 'similarity': float(avg), 'match_count': int(count)}
+            for mid, avg, count in zip(ids, averages, counts)
+        ]
+        meeting_scores.sort(key=lambda x: x['similarity'], reverse=True)
+        return meeting_scores
+
+
+class IVFIndex:
+    """Inverted-file approximate index: chunks are bucketed by nearest k-means centroid"""
+
+    def __init__(self, n_lists: int = 0, n_probe: int = 8, min_rows: int = 5000,
+                 retrain_growth: float = 0.5, sample_size: int = 50000):
+        self.n_lists = n_lists  # 0 picks about sqrt(rows) lists at training time
+        self.n_probe = n_probe  # Lists scanned per query: higher means better recall, more latency
+        self.min_rows = min_rows  # Below this the exact search is fast enough
+        self.retrain_growth = retrain_growth  # Retrain once the corpus grows by this fraction
+        self.sample_size = sample_size
+        self._state = None  # (centroids, trained_rows, {meeting_id: (block_matrix, assignments)})
+        self._lists_cache = None
+        self._lock = threading.Lock()
+        self._rebuild_thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None
+
+    def needs_rebuild(self, n_rows: int) -> bool:
+        if n_rows < self.min_rows:
+            return False
+        if self._state is None:
+            return True
+        return n_rows > self._state[1] * (1 + self.retrain_growth)
+
+    def maybe_rebuild(self, index: VectorIndex):
+        """Start a background retrain if the index has outgrown the current centroids"""
+        if not self.needs_rebuild(len(index)):
+            return
+        with self._lock:
+            if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                return
+            self._rebuild_thread = threading.Thread(target=self.rebuild, args=(index,), daemon=True)
+            self._rebuild_thread.start()
+
+    def rebuild(self, index: VectorIndex):
+        """Train centroids on a sample of the index and assign every chunk to its nearest list"""
+        _, _, matrix, blocks = index._get_snapshot()
+        n_rows = len(matrix)
+        if n_rows == 0:
+            return
+
+        n_lists = self.n_lists or int(np.sqrt(n_rows))
+        n_lists = max(1, min(n_lists, n_rows))
+        sample = matrix[:]
+        if n_rows > self.sample_size:
+            rng = np.random.default_rng(0)
+            sample = matrix[rng.choice(n_rows, self.sample_size, replace=False)]
+
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, n_init=3, random_state=0,
+                                 batch_size=max(1024, n_lists * 4))
+        kmeans.fit(sample)
+        centroids = VectorIndex.normalize(kmeans.cluster_centers_)
+
+        assignments = {
+            meeting_id: (block_matrix, self._assign(centroids, block_matrix))
+            for meeting_id, block_matrix in blocks
+        }
+        self._state = (centroids, n_rows, assignments)
+
+    @staticmethod
+    def _assign(centroids: np.ndarray, block_matrix: np.ndarray) -> np.ndarray:
+        return np.argmax(block_matrix @ centroids.T, axis=1)
+
+    def _posting_lists(self, snapshot, state) -> Tuple[np.ndarray, np.ndarray]:
+        """Row indices grouped by list, assigning only meetings added since training"""
+        cache = self._lists_cache
+        if cache is not None and cache[0] is snapshot and cache[1] is state:
+            return cache[2], cache[3]
+
+        centroids, _, assignments = state
+        parts = []
+        for meeting_id, block_matrix in snapshot[3]:
+            cached = assignments.get(meeting_id)
+            if cached is None or cached[0] is not block_matrix:
+                cached = (block_matrix, self._assign(centroids, block_matrix))
+                assignments[meeting_id] = cached
+            parts.append(cached[1])
+
+        row_lists = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        order = np.argsort(row_lists, kind='stable')
+        offsets = np.searchsorted(row_lists[order], np.arange(len(centroids) + 1))
+        self._lists_cache = (snapshot, state, order, offsets)
+        return order, offsets
+
+    def candidates(self, snapshot, query_vector, n_probe: int = None) -> Optional[np.ndarray]:
+        """Row indices in the lists closest to the query, or None if the index is not trained"""
+        state = self._state
+        if state is None:
+            return None
+
+        centroids = state[0]
+        n_probe = min(n_probe or self.n_probe, len(centroids))
+        order, offsets = self._posting_lists(snapshot, state)
+
+        centroid_scores = centroids @ VectorIndex.normalize(query_vector)[0]
+        probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        return np.sort(np.concatenate([order[offsets[p]:offsets[p + 1]] for p in probes]))
+
+
+class LexicalIndex:
+    """BM25 keyword index over chunk text, built per meeting with a stateless hashing vectorizer"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, n_features: int = 2 ** 20):
+        self.k1 = k1
+        self.b = b
+        self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False,
+                                            norm=None, dtype=np.float32)
+        self._block_terms: Dict[int, Tuple[np.ndarray, sp.csr_matrix]] = {}
+        self._cache = None
+
+    @staticmethod
+    def document_text(row: Dict) -> str:
+        return f"{row['metadata'].get('title', '')} {row['text']}"
+
+    def _term_matrix(self, snapshot) -> Tuple[sp.csc_matrix, np.ndarray, np.ndarray]:
+        """Term counts for every chunk, vectorizing only meetings changed since the last call"""
+        cache = self._cache
+        if cache is not None and cache[0] is snapshot:
+            return cache[1], cache[2], cache[3]
+
+        rows, _, _, blocks = snapshot
+        block_terms = {}
+        parts = []
+        offset = 0
+        for meeting_id, block_matrix in blocks:
+            cached = self._block_terms.get(meeting_id)
+            if cached is None or cached[0] is not block_matrix:
+                texts = [self.document_text(row) for row in rows[offset:offset + len(block_matrix)]]
+                cached = (block_matrix, self.vectorizer.transform(texts))
+            block_terms[meeting_id] = cached
+            parts.append(cached[1])
+            offset += len(block_matrix)
+        self._block_terms = block_terms
+
+        if parts:
+            terms = sp.vstack(parts).tocsc()
+        else:
+            terms = sp.csc_matrix((0, self.vectorizer.n_features), dtype=np.float32)
+        doc_lengths = np.asarray(terms.sum(axis=1)).ravel()
+        doc_freqs = np.diff(terms.indptr)
+        self._cache = (snapshot, terms, doc_lengths, doc_freqs)
+        return terms, doc_lengths, doc_freqs
+
+    def scores(self, snapshot, query_text: str) -> np.ndarray:
+        """BM25 score of the query against every chunk"""
+        terms, doc_lengths, doc_freqs = self._term_matrix(snapshot)
+        n_docs = terms.shape[0]
+        scores = np.zeros(n_docs)
+        if n_docs == 0:
+            return scores
+
+        length_norm = self.k1 * (1 - self.b + self.b * doc_lengths / max(doc_lengths.mean(), 1e-9))
+        for term in np.unique(self.vectorizer.transform([query_text]).indices):
+            start, end = terms.indptr[term], terms.indptr[term + 1]
+            if start == end:
+                continue
+            doc_ids = terms.indices[start:end]
+            tf = terms.data[start:end]
+            idf = np.log(1 + (n_docs - doc_freqs[term] + 0.5) / (doc_freqs[term] + 0.5))
+            scores[doc_ids] += idf * tf * (self.k1 + 1) / (tf + length_norm[doc_ids])
+        return scores